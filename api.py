@@ -0,0 +1,142 @@
+# api.py
+# Read-only JSON API over the same SQLite data and filters as the app sidebar (Tornado, installed with Streamlit)
+import abc
+import sys
+import json
+import sqlite3
+import datetime
+import logging
+import tornado.web
+import tornado.ioloop
+import db
+import dataset
+import queries
+
+DEFAULT_PORT = 8502
+MAX_LIMIT = 5000
+
+# Helper to parse an optional YYYY-MM-DD query argument
+def _date_argument(handler, name):
+    value = handler.get_argument(name, None)
+    if not value:
+        return None
+    try:
+        return datetime.date.fromisoformat(value)
+    except ValueError:
+        raise tornado.web.HTTPError(400, reason=f"{name} must be a date (YYYY-MM-DD)")
+
+class ApiHandler(tornado.web.RequestHandler, metaclass=abc.ABCMeta):
+    """
+    Base handler: queries run on the pool's read-only connections in the IO loop's thread pool.
+
+    The ETag is the data version plus the request URI, so a client's If-None-Match is
+    answered with 304 before any query runs, until the scraper writes a new version.
+    """
+
+    def initialize(self, pool):
+        self.pool = pool
+
+    def compute_etag(self):
+        return None  # set explicitly from the data version, not from a hash of the body
+
+    async def run(self, function, *args):
+        def call():
+            with self.pool.connection() as conn:
+                return function(conn, *args)
+        return await tornado.ioloop.IOLoop.current().run_in_executor(None, call)
+
+    async def get(self):
+        if not self.pool.exists():
+            raise tornado.web.HTTPError(503, reason="No data available yet")
+        version = await tornado.ioloop.IOLoop.current().run_in_executor(None, dataset.read_data_version, self.pool)
+        self.set_header("Etag", f'"{version}|{self.request.uri}"')
+        self.set_header("Cache-Control", "no-cache")  # revalidate with If-None-Match
+        if self.check_etag_header():
+            self.set_status(304)
+            return
+        try:
+            result = await self.respond()
+        except sqlite3.OperationalError as e:
+            logging.error(f"API query failed: {e}")
+            raise tornado.web.HTTPError(503, reason="Data not available")
+        self.set_header("Content-Type", "application/json; charset=utf-8")
+        self.finish(json.dumps(dict(result, version=version), ensure_ascii=False, default=str))
+
+    @abc.abstractmethod
+    async def respond(self):
+        """Run the endpoint's queries and return the JSON body as a dict (the version is added)."""
+
+    def write_error(self, status_code, **kwargs):
+        self.set_header("Content-Type", "application/json; charset=utf-8")
+        error = kwargs.get("exc_info", (None, None, None))[1]
+        message = getattr(error, "log_message", None) or self._reason  # e.g. "Missing argument language"
+        self.finish(json.dumps({"error": message, "status": status_code}))
+
+# Languages with data
+class LanguagesHandler(ApiHandler):
+    async def respond(self):
+        return {"languages": await self.run(queries.query_languages)}
+
+# Troops/schools of a language, optionally narrowed by the search text (same search as the sidebar)
+class TroopsHandler(ApiHandler):
+    async def respond(self):
+        language = self.get_argument("language")
+        search = self.get_argument("search", "").strip()
+        troops = await self.run(queries.query_troops, language)
+        if search:
+            troops = sorted(set(troops) & set(await self.run(search_matches, language, search, troops)))
+        return {"language": language, "troops": troops}
+
+# Filtered service dates: language, start/end date, troop list (repeated troop=...) and search text
+class ServiceDatesHandler(ApiHandler):
+    async def respond(self):
+        language = self.get_argument("language")
+        date_start = _date_argument(self, "start")
+        date_end = _date_argument(self, "end")
+        troops = self.get_arguments("troop") or None
+        search = self.get_argument("search", "").strip()
+        try:
+            limit = int(self.get_argument("limit", MAX_LIMIT))
+            offset = int(self.get_argument("offset", 0))
+        except ValueError:
+            raise tornado.web.HTTPError(400, reason="limit and offset must be integers")
+        if limit < 1 or offset < 0:
+            raise tornado.web.HTTPError(400, reason="limit must be at least 1 and offset not negative")
+        limit = min(limit, MAX_LIMIT)
+
+        if search:
+            # Like "Select All" during a search in the app: all matches, or the selected troops among them
+            all_troops = await self.run(queries.query_troops, language)
+            matches = set(await self.run(search_matches, language, search, all_troops))
+            troops = [troop for troop in (troops or all_troops) if troop in matches]
+
+        df = await self.run(queries.query_service_dates, language, date_start, date_end, troops)
+        page = df.iloc[offset:offset + limit]
+        return {"language": language, "count": len(df), "offset": offset, "limit": limit,
+                "records": page.astype(object).where(page.notna(), None).to_dict("records")}
+
+# Helper: troops matching the search text (FTS5 index, substring match if the index is missing)
+def search_matches(conn, language, text, troops):
+    try:
+        return queries.search_troops(conn, language, text)
+    except sqlite3.OperationalError:
+        return [troop for troop in troops if text.lower() in troop.lower()]
+
+#%%
+# Build the API application (also for tornado.testing.AsyncHTTPTestCase.get_app)
+def create_app(db_path=db.DB_PATH, pool=None):
+    pool = pool or db.ReadOnlyPool(db_path)
+    handlers = [
+        (r"/api/languages", LanguagesHandler, {"pool": pool}),
+        (r"/api/troops", TroopsHandler, {"pool": pool}),
+        (r"/api/service-dates", ServiceDatesHandler, {"pool": pool}),
+    ]
+    return tornado.web.Application(handlers, compress_response=True)  # gzip if the client accepts it
+
+# Usage: python api.py [port]
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+    port = int(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_PORT
+    create_app().listen(port)
+    print(f"Serving the JSON API on http://localhost:{port}/api/service-dates?language=DE")
+    tornado.ioloop.IOLoop.current().start()
@@ -2,31 +2,108 @@
 import sqlite3
 import pandas as pd
 import streamlit as st
+import db
+import dataset
+import intervals
+import metrics
+import queries
+import result_cache
 
-DB_PATH = "data/service_dates.db"
+DB_PATH = db.DB_PATH
 
-# Helper to load data from DB
-@st.cache_data
-def load_data():
+# Display labels and formats for the result table
+DISPLAY_COLUMNS = {
+    "language": "Language",
+    "troopSchool": "Troop/School",
+    "startDate": st.column_config.DateColumn("Start Date", format="YYYY-MM-DD"),
+    "endDate": st.column_config.DateColumn("End Date", format="YYYY-MM-DD"),
+}
+
+# Result pages: rows per page and the sort options (column -> label)
+PAGE_SIZES = [25, 50, 100, 250]
+SORT_OPTIONS = {"startDate": "Start Date", "endDate": "End Date", "troopSchool": "Troop/School"}
+
+# Most troop search matches offered as options (a language has thousands of names)
+MAX_TROOP_OPTIONS = 200
+
+# One pool of read-only connections per process (WAL readers are never blocked by the scraper)
+@st.cache_resource
+def get_pool():
+    return db.ReadOnlyPool(DB_PATH)
+
+# One metrics recorder per process (logs/app_metrics.jsonl and logs/app_<host>-<pid>.prom, written every 15 s)
+@st.cache_resource
+def get_metrics():
+    recorder = metrics.MetricsRecorder("app", per_process=True)
+    recorder.start_prometheus_writer()
+    return recorder
+
+# Helper to load and type a data version (timed, runs once per version)
+def load_dataset(pool, version):
+    with get_metrics().timer("app_dataset_build_seconds"):
+        return dataset.load_active_dataset(pool, version)
+
+# One store per process: the active data is loaded and typed once per data version,
+# sessions keep the old snapshot while a new version loads in the background
+@st.cache_resource
+def get_store():
+    pool = get_pool()
+    return dataset.DatasetStore(lambda version: load_dataset(pool, version),
+                                lambda: dataset.read_data_version(pool))
+
+# Helper to search troops/schools in the FTS5 index (cached per data version)
+@st.cache_data(max_entries=1024)
+def search_troops(version, language, text):
+    try:
+        with get_pool().connection() as conn:
+            return queries.search_troops(conn, language, text)
+    except sqlite3.OperationalError:
+        return None  # no search index (FTS5 missing or DB not updated yet)
+
+# One filter result cache per process, shared by all sessions (LRU, bounded by memory)
+@st.cache_resource
+def get_result_cache():
+    return result_cache.ResultCache()
+
+# Sorted row positions of a partition, computed once per data version, language and sort
+# (the partition is not hashed, it is identified by version and language)
+@st.cache_resource(max_entries=32)
+def get_sort_order(version, language, sort_by, descending, _partition):
+    return dataset.sort_order(_partition, sort_by, descending)
+
+# Helpers for the history view (validity intervals, cached per data version; None if the DB has no history yet)
+@st.cache_data(max_entries=64)
+def history_as_of(version, language, as_of):
     try:
-        conn = sqlite3.connect(DB_PATH)
-        df = pd.read_sql("SELECT * FROM activeServiceDates", conn)
-        conn.close()
-        return df
-    except (sqlite3.OperationalError, pd.errors.DatabaseError) as e:
-        # Database or table doesn't exist yet
-        st.warning("No data available yet. Please run the scraper first to populate the database.")
-        return pd.DataFrame(columns=["language", "troopSchool", "startDate", "endDate", "scrapeDate"])
+        with get_pool().connection() as conn:
+            return queries.query_as_of(conn, as_of, language)
+    except (sqlite3.OperationalError, pd.errors.DatabaseError):
+        return None
+
+@st.cache_data(max_entries=64)
+def history_changes(version, language, date_start, date_end):
+    try:
+        with get_pool().connection() as conn:
+            return queries.query_changes(conn, date_start, date_end, language)
+    except (sqlite3.OperationalError, pd.errors.DatabaseError):
+        return None
 
 # App layout
 st.set_page_config(page_title="Swiss Army Service Dates", layout="wide")
 st.title("Swiss Army Service Dates Lookup")
 
-# Load data
-df = load_data()
+# Load the current data snapshot (typed per-language partitions)
+app_metrics = get_metrics()
+with app_metrics.timer("app_load_data_seconds"):
+    snapshot = get_store().get()
+data = snapshot.data if snapshot else {"last_updated": None, "partitions": {}}
+partitions, last_updated = data["partitions"], data["last_updated"]
+languages = list(partitions)
+if not languages:
+    st.warning("No data available yet. Please run the scraper first to populate the database.")
 
 # Last updated info and data source caption
-last_updated = pd.to_datetime(df["scrapeDate"]).max().strftime('%a, %d %b %Y')
+last_updated = pd.to_datetime(last_updated).strftime('%a, %d %b %Y') if last_updated else "-"
 st.caption(f"**Last Updated:** {last_updated} |  **Data Sources:** [Schweizer Armee](https://www.armee.ch/de/aufgebotsdaten), [Armée Suisse](https://www.armee.ch/fr/dates-de-convocation), &amp; [Esercito Svizzero](https://www.armee.ch/it/date-di-chiamata-in-servizio)")
 
 # Sidebar filters
@@ -35,14 +112,12 @@ st.sidebar.header("Filters")
 # Language filter (single select to hide duplicates)
 language = st.sidebar.selectbox(
     "Language",
-    options=sorted(df["language"].unique()),
+    options=languages,
     index=0,  # Default to first language
-    help="Select the language of the displayed Troop/School names"
+    format_func=lambda code: "All (one row per service)" if code == "ALL" else code,
+    help="Select the language of the displayed Troop/School names, or 'All' to see each service once with all its names"
 )
 
-# Apply language filter to the DataFrame
-filtered_by_language = df[df["language"] == language]
-
 # Date filters - Initialize session state for clearable date inputs
 if 'date_start' not in st.session_state:
     st.session_state.date_start = None
@@ -69,80 +144,151 @@ with col2:
         help="Leave empty for no upper date limit"
     )
 
-# Apply date filtering based on selected values
-filtered_df = filtered_by_language.copy()
-
-# Convert date columns to datetime first
-filtered_df["startDate"] = pd.to_datetime(filtered_df["startDate"], errors="coerce")
-filtered_df["endDate"] = pd.to_datetime(filtered_df["endDate"], errors="coerce")
+# Availability filters: free window (services must fit inside) and exam periods (services must not overlap)
+st.sidebar.subheader("Availability")
+free_window = st.sidebar.date_input(
+    "Free Window",
+    value=(),
+    format="YYYY-MM-DD",
+    help="Only show services that fit entirely inside this window. Leave empty for no limit."
+)
+exam_periods_text = st.sidebar.text_area(
+    "Exam Periods",
+    placeholder="2025-06-02 - 2025-06-20\n2026-01-12 - 2026-01-30",
+    help="One period per line (YYYY-MM-DD - YYYY-MM-DD). Services overlapping any period are hidden."
+)
+try:
+    exam_periods = intervals.parse_windows(exam_periods_text)
+except ValueError as e:
+    st.sidebar.error(str(e))
+    exam_periods = []
+free_window = tuple(free_window) if len(free_window) == 2 else None  # ignore half-selected ranges
 
-# Apply start date filter only if a date is selected
-if date_start is not None:
-    filtered_df = filtered_df[filtered_df["startDate"] >= pd.to_datetime(date_start)]
+# Partition of the selected language
+partition = partitions.get(language)
 
-# Apply end date filter only if a date is selected  
-if date_end is not None:
-    filtered_df = filtered_df[filtered_df["endDate"] <= pd.to_datetime(date_end)]
+# Troop search: the troop options are only filled from the index matches
+troop_search = st.sidebar.text_input(
+    "Search Troop/School",
+    placeholder="e.g. inf rs",
+    help="Matches the beginning of words, ignoring accents and case."
+)
+available_troops = []  # all matches ("Select All" during a search)
+search_options = []    # best matches sent to the browser
+if troop_search.strip() and partition:
+    matches = search_troops(snapshot.version, language, troop_search)
+    if matches is None:
+        # Fallback without search index
+        matches = [t for t in partition.troops if troop_search.strip().lower() in t.lower()]
+    available_troops = sorted(matches)
+    search_options = sorted(matches[:MAX_TROOP_OPTIONS])  # matches are in rank order
+    if len(matches) > MAX_TROOP_OPTIONS:
+        st.sidebar.caption(f"Showing the best {MAX_TROOP_OPTIONS} of {len(matches)} matches, refine the search to see more.")
 
-# Apply language filter to get available troops (without date filter)
-available_troops = sorted(filtered_by_language["troopSchool"].unique())
+language_total = len(partition.frame) if partition else 0
 
 # Initialize troops in session state if not exists
 if 'troops' not in st.session_state:
     st.session_state.troops = ["Select All"]
 
 # Reset to "Select All" if current selections are no longer valid
-current_selections = [t for t in st.session_state.troops if t in available_troops or t == "Select All"]
+current_selections = [t for t in st.session_state.troops if t in search_options or t == "Select All"]
 if not current_selections or (len(current_selections) == 0):
     st.session_state.troops = ["Select All"]
 else:
     st.session_state.troops = current_selections
 
-# Create options list with "Select All"
-options_with_select_all = ["Select All"] + available_troops
+# Create options list with "Select All" (and the search matches only, not every troop of the language)
+options_with_select_all = ["Select All"] + search_options
 
 # Troop filter with "Select All" option
 troops = st.sidebar.multiselect(
     "Troop/School",
     options=options_with_select_all,
     default=st.session_state.troops,
-    help="Select one or more Troops/Schools. Use 'Select All' to select all options."
+    help="Search above to find Troops/Schools, then select one or more. Use 'Select All' to select all (matching) options."
 )
 
-# Handle "Select All" logic
+# Handle "Select All" logic (None = no troop filter, with a search "all" means all matches)
 if "Select All" in troops:
-    troops = available_troops
+    troops = tuple(available_troops) if troop_search.strip() else None
 else:
-    troops = [t for t in troops if t != "Select All"]
+    troops = tuple(t for t in troops if t != "Select All")
+
+# Helper to compute the filter mask (date and troop filters, availability windows) of the partition
+def compute_mask():
+    mask = dataset.filter_mask(partition, date_start, date_end, troops)
+    if free_window or exam_periods:
+        mask &= partition.intervals.mask(free_window, exam_periods)
+    return mask
 
-# Apply troop filter to the already date-filtered DataFrame
-filtered_df = filtered_df[filtered_df["troopSchool"].isin(troops)]
+# Apply the filters as boolean masks on the pre-typed language partition (shared across sessions)
+with app_metrics.timer("app_filter_seconds", language=language or ""):
+    if partition:
+        key = result_cache.normalize_key(snapshot.version, language, date_start, date_end, troops,
+                                         free_window, exam_periods)
+        mask, hit = get_result_cache().get_or_compute(key, compute_mask, result_cache.troops_size(troops))
+        app_metrics.increment("app_result_cache_hits_total" if hit else "app_result_cache_misses_total")
+        record_count = int(mask.sum())
+    else:
+        record_count = 0
 
-# Check if the filtered DataFrame is empty
-if filtered_df.empty:
+# Check if the filter result is empty
+if not record_count:
     st.info("No records found for the selected filters.")
 else:
-    # Format the dates to 'YYYY-MM-DD'
-    filtered_df["startDate"] = filtered_df["startDate"].dt.strftime('%Y-%m-%d')
-    filtered_df["endDate"] = filtered_df["endDate"].dt.strftime('%Y-%m-%d')
-
-    # Drop columns not needed for display
-    filtered_df = filtered_df.drop(columns=["scrapeDate", "active"])
-
-    # Rename columns for better display
-    filtered_df = filtered_df.rename(columns={
-        "language": "Language",
-        "troopSchool": "Troop/School",
-        "startDate": "Start Date",
-        "endDate": "End Date"
-    })
-
-    # Show results
+    # Show one page of the results, sorted on the server (only the visible rows are sent to the browser)
     st.subheader("Filtered Service Dates")
-    st.caption("**Tip:** Click on column headers to sort. Use the sidebar to adjust filters. Download the data using the menu in the top-right corner of the table.")
-    st.dataframe(filtered_df, width="stretch")
+    st.caption("**Tip:** Use the sidebar to adjust filters, and the controls below to sort and page through the results.")
+    sort_col, order_col, size_col, page_col = st.columns([2, 1, 1, 1])
+    with sort_col:
+        sort_by = st.selectbox("Sort by", options=list(SORT_OPTIONS), format_func=SORT_OPTIONS.get)
+    with order_col:
+        descending = st.selectbox("Order", options=[False, True],
+                                  format_func=lambda value: "Descending" if value else "Ascending")
+    with size_col:
+        page_size = st.selectbox("Rows per page", options=PAGE_SIZES, index=1)
+    page_count = -(-record_count // page_size)
+    with page_col:
+        page_number = st.number_input("Page", min_value=1, max_value=page_count, value=1, step=1)
+
+    with app_metrics.timer("app_page_seconds", language=language):
+        order = get_sort_order(snapshot.version, language, sort_by, descending, partition)
+        positions = dataset.page_positions(order, mask, (page_number - 1) * page_size, page_size)
+        page_df = partition.frame.iloc[positions]
+    st.dataframe(page_df, width="stretch", hide_index=True, column_config=DISPLAY_COLUMNS)
+    st.caption(f"Page {page_number} of {page_count}")
+
+st.write(f"Records: {record_count}/{language_total}")
+
+# History view: what was published on a date, and what changed between two dates
+if snapshot:
+    with st.expander("History"):
+        history_language = None if language == "ALL" else language  # "All" shows the rows of every language
+        history_col1, history_col2 = st.columns(2)
+        with history_col1:
+            as_of = st.date_input("Published on", value=None, format="YYYY-MM-DD",
+                                  help="Show the records that were on the website on this date")
+        with history_col2:
+            changes_range = st.date_input("Changes between", value=(), format="YYYY-MM-DD",
+                                          help="Show the records that were added or removed in this period")
+
+        if as_of:
+            history_df = history_as_of(snapshot.version, history_language, as_of)
+            if history_df is None:
+                st.info("No history available yet. It is recorded from the next scraper run on.")
+            else:
+                st.caption(f"**Published on {as_of}:** {len(history_df)} records")
+                st.dataframe(history_df, width="stretch", hide_index=True)
 
-st.write(f"Records: {len(filtered_df)}/{len(filtered_by_language)}")
+        if len(changes_range) == 2:
+            changes_df = history_changes(snapshot.version, history_language, *changes_range)
+            if changes_df is None:
+                st.info("No history available yet. It is recorded from the next scraper run on.")
+            else:
+                added = int((changes_df["change"] == "added").sum())
+                st.caption(f"**Changes {changes_range[0]} to {changes_range[1]}:** {added} added, {len(changes_df) - added} removed")
+                st.dataframe(changes_df, width="stretch", hide_index=True)
 
 # Add some vertical space
 st.write("")
@@ -0,0 +1,214 @@
+#%%
+# Hot backups of the SQLite database (online backup API), compressed, with retention and verified restore
+
+#%%
+import os
+import re
+import sys
+import time
+import gzip
+import shutil
+import sqlite3
+import logging
+import datetime
+import dataset
+
+DB_PATH = "data/service_dates.db"
+BACKUP_DIR = "backups"
+BACKUP_PATTERN = re.compile(r"^service_dates_(\d{8}-\d{6})\.db\.gz$")
+
+# Pages copied per backup step and pause between steps (lets the scraper and the app work in between)
+STEP_PAGES = 256
+STEP_SLEEP = 0.01
+
+# Retention: newest backup of each of the last N days, weeks and months
+KEEP_DAILY = 7
+KEEP_WEEKLY = 4
+KEEP_MONTHLY = 6
+
+class BackupError(Exception):
+    """Raised if a backup fails its integrity check."""
+
+# Helper: integrity check of a database file (raises BackupError unless it is ok and has the data tables)
+def _verify(path):
+    conn = sqlite3.connect(f"file:{os.path.abspath(path)}?mode=ro", uri=True)
+    try:
+        result = conn.execute("PRAGMA integrity_check").fetchall()
+        if result != [("ok",)]:
+            raise BackupError(f"Integrity check failed for {path}: {result[:5]}")
+        if not conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'serviceDates'").fetchone():
+            raise BackupError(f"{path} has no serviceDates table")
+    except sqlite3.DatabaseError as e:
+        raise BackupError(f"{path} is not a valid database: {e}")
+    finally:
+        conn.close()
+
+# Function to list the backups as (timestamp, path), oldest first
+def list_backups(backup_dir=BACKUP_DIR):
+    if not os.path.isdir(backup_dir):
+        return []
+    backups = []
+    for name in os.listdir(backup_dir):
+        match = BACKUP_PATTERN.match(name)
+        if match:
+            backups.append((datetime.datetime.strptime(match.group(1), "%Y%m%d-%H%M%S"), os.path.join(backup_dir, name)))
+    return sorted(backups)
+
+#%%
+# Function to take a consistent snapshot of the live database and store it gzip-compressed
+def create_backup(db_path=DB_PATH, backup_dir=BACKUP_DIR, pages=STEP_PAGES, sleep=STEP_SLEEP):
+    """
+    Copy the database with SQLite's online backup API in steps of `pages` pages. Between
+    steps the source is not locked, so the app keeps reading and a scraper write only makes
+    the backup restart; the result is always one consistent state. The copy is checked,
+    compressed and renamed into place, so a backup file is either complete or absent.
+
+    Returns:
+        str: Path of the new backup
+    """
+    os.makedirs(backup_dir, exist_ok=True)
+    path = None
+    while path is None or os.path.exists(path):  # one backup per second (names are timestamps)
+        if path:
+            time.sleep(0.2)
+        timestamp = datetime.datetime.now().strftime("%Y%m%d-%H%M%S")
+        path = os.path.join(backup_dir, f"service_dates_{timestamp}.db.gz")
+    raw_path = path[:-len(".gz")] + ".tmp"
+
+    source = sqlite3.connect(db_path, timeout=30)
+    target = sqlite3.connect(raw_path)
+    try:
+        source.backup(target, pages=pages, sleep=sleep)
+        target.execute("PRAGMA journal_mode=DELETE")  # self-contained file without -wal
+    finally:
+        target.close()
+        source.close()
+
+    try:
+        _verify(raw_path)
+        with open(raw_path, "rb") as f_in, gzip.open(path + ".tmp", "wb", compresslevel=6) as f_out:
+            shutil.copyfileobj(f_in, f_out, length=1024 * 1024)
+        os.replace(path + ".tmp", path)
+    finally:
+        for leftover in (raw_path, path + ".tmp"):
+            if os.path.exists(leftover):
+                os.remove(leftover)
+
+    logging.info(f"Backup written to {path} ({os.path.getsize(path)} bytes)")
+    return path
+
+# Function to delete the backups the retention policy doesn't keep
+def apply_retention(backup_dir=BACKUP_DIR, keep_daily=KEEP_DAILY, keep_weekly=KEEP_WEEKLY, keep_monthly=KEEP_MONTHLY):
+    """
+    Keep the newest backup of each of the last keep_daily days, keep_weekly ISO weeks and
+    keep_monthly months (a backup can count for all three). The newest backup is always kept.
+
+    Returns:
+        list: Paths of the deleted backups
+    """
+    backups = list_backups(backup_dir)
+    keep = {path for _, path in backups[-1:]}
+    for period, count in ((lambda t: t.date(), keep_daily),
+                          (lambda t: t.isocalendar()[:2], keep_weekly),
+                          (lambda t: (t.year, t.month), keep_monthly)):
+        newest = {}
+        for timestamp, path in backups:  # oldest first: the last one of each period wins
+            newest[period(timestamp)] = path
+        keep.update(newest[key] for key in sorted(newest)[-count:] if count > 0)
+
+    deleted = []
+    for _, path in backups:
+        if path not in keep:
+            os.remove(path)
+            deleted.append(path)
+    if deleted:
+        logging.info(f"Retention deleted {len(deleted)} backups")
+    return deleted
+
+#%%
+# Helper: new data version for restored data, committed together with its Arrow snapshot (as in update_database)
+def _publish_restored(conn, db_path):
+    version = datetime.datetime.now().isoformat(timespec="microseconds")
+    snapshot = dataset.snapshot_path(db_path)
+    conn.execute("BEGIN IMMEDIATE")
+    conn.execute("CREATE TABLE IF NOT EXISTS metadata (key TEXT PRIMARY KEY, value TEXT)")
+    conn.execute("INSERT OR REPLACE INTO metadata (key, value) VALUES ('dataVersion', ?)", (version,))
+    try:
+        dataset.write_snapshot(conn, snapshot, version, publish=False)
+        snapshot_written = True
+    except Exception as e:
+        logging.warning(f"Arrow snapshot not written, the app loads from SQLite: {e}")
+        snapshot_written = False
+    try:
+        conn.commit()
+    except BaseException:
+        dataset.discard_snapshot(snapshot)
+        raise
+    if snapshot_written:
+        dataset.publish_snapshot(snapshot)
+    return version
+
+# Function to restore a backup into the live database after verifying it
+def restore_backup(backup_path, db_path=DB_PATH, backup_current=True, backup_dir=BACKUP_DIR):
+    """
+    The backup is decompressed next to the database and integrity-checked first. It then
+    replaces the content of the live database in one backup-API step, which is a single
+    write transaction: readers see either the old or the restored data. (Renaming a file
+    over a database in WAL mode could combine the restored file with the old -wal file.)
+    The restored data gets a new data version and its own Arrow snapshot, so the app
+    reloads it and keeps memory-mapping the snapshot instead of loading from SQLite.
+
+    Args:
+        backup_path (str): .db.gz backup (or an uncompressed .db file)
+        db_path (str): Database to restore into
+        backup_current (bool): Back up the current database first (if it exists)
+        backup_dir (str): Directory for that backup of the current data
+
+    Returns:
+        str: Path of the backup of the replaced data (None if none was taken)
+    """
+    previous = create_backup(db_path, backup_dir) if backup_current and os.path.exists(db_path) else None
+
+    directory = os.path.dirname(os.path.abspath(db_path))
+    raw_path = os.path.join(directory, f".restore_{os.getpid()}.db")
+    try:
+        opener = gzip.open if backup_path.endswith(".gz") else open
+        with opener(backup_path, "rb") as f_in, open(raw_path, "wb") as f_out:
+            shutil.copyfileobj(f_in, f_out, length=1024 * 1024)
+        _verify(raw_path)
+
+        source = sqlite3.connect(raw_path)
+        target = sqlite3.connect(db_path, timeout=30)
+        try:
+            source.backup(target)  # all pages in one step
+            target.execute("PRAGMA journal_mode=WAL")
+            _publish_restored(target, db_path)
+        finally:
+            target.close()
+            source.close()
+    finally:
+        if os.path.exists(raw_path):
+            os.remove(raw_path)
+
+    logging.info(f"Restored {db_path} from {backup_path}")
+    return previous
+
+#%%
+# Usage: python backup.py create | list | prune | restore <backup_file>
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+    command = sys.argv[1] if len(sys.argv) > 1 else "create"
+    if command == "create":
+        print(create_backup())
+        apply_retention()
+    elif command == "list":
+        for timestamp, path in list_backups():
+            print(f"{timestamp:%Y-%m-%d %H:%M:%S}  {os.path.getsize(path):>12}  {path}")
+    elif command == "prune":
+        print(apply_retention())
+    elif command == "restore" and len(sys.argv) > 2:
+        previous = restore_backup(sys.argv[2])
+        print(f"Restored from {sys.argv[2]}" + (f" (previous data saved as {previous})" if previous else ""))
+    else:
+        print("Usage: python backup.py create | list | prune | restore <backup_file>")
+        sys.exit(1)
@@ -0,0 +1,128 @@
+#%%
+# Synthetic stand-in for the armee.ch paginated table (row count and page count as parameters)
+
+#%%
+import json
+import html
+import math
+import datetime
+import threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlsplit, parse_qs
+
+# Pagination label per language ("Seite X von Y" / "Page X de Y" / "Pagina X da Y")
+LABELS = {"de": ("Seite", "von"), "fr": ("Page", "de"), "it": ("Pagina", "da")}
+NAMES = {"de": ["Inf RS", "Pz RS", "Log RS", "Spital RS"], "fr": ["ER inf", "ER chars", "ER log", "ER hôp"],
+         "it": ["SR fant", "SR carri", "SR log", "SR osp"]}
+
+PAGE_TEMPLATE = """<!DOCTYPE html>
+<html>
+<head><meta charset="utf-8"><title>Fixture site</title></head>
+<body>
+  <div id="__nuxt">
+    <table>
+      <thead><tr><th>Truppe/Schule</th><th>Beginn</th><th>Ende</th></tr></thead>
+      <tbody>%(rows)s</tbody>
+    </table>
+    <div class="my-5 flex items-center justify-center">
+      <button id="prev" onclick="go(-1)"%(prev_disabled)s>&lt;</button>
+      <span id="label">%(label)s</span>
+      <button id="next" onclick="go(1)"%(next_disabled)s>&gt;</button>
+    </div>
+  </div>
+  <script>
+    let page = %(page)d;
+    const total = %(total)d, word = %(word)s, of = %(of)s;
+    async function go(delta) {
+      const target = page + delta;
+      if (target < 1 || target > total) return;
+      const response = await fetch(location.pathname + "?fragment=1&page=" + target);
+      const data = await response.json();
+      const body = document.querySelector("table tbody");
+      body.replaceChildren(...data.rows.map(row => {
+        const tr = document.createElement("tr");
+        row.forEach(text => { const td = document.createElement("td"); td.textContent = text; tr.appendChild(td); });
+        return tr;
+      }));
+      page = data.page;
+      document.getElementById("label").textContent = word + " " + page + " " + of + " " + total;
+      document.getElementById("prev").disabled = page <= 1;
+      document.getElementById("next").disabled = page >= total;
+    }
+  </script>
+</body>
+</html>
+"""
+
+# Function to build the synthetic rows of one language (same services in every language, same order)
+def synthetic_rows(language, rows):
+    names = NAMES[language]
+    base = datetime.date(2025, 1, 6)
+    table = []
+    for i in range(rows):
+        start = base + datetime.timedelta(days=(i * 7) % 1400)
+        end = start + datetime.timedelta(days=18 + (i % 5) * 25)
+        table.append([f"{names[i % len(names)]} {i}", start.strftime("%d.%m.%Y"), end.strftime("%d.%m.%Y")])
+    return table
+
+#%%
+# Request handler serving server-rendered pages (?page=N) and JSON fragments for client-side paging
+class FixtureSiteHandler(BaseHTTPRequestHandler):
+    rows = 1000
+    pages = 20
+    _tables = {}
+
+    def _table(self, language):
+        if language not in self._tables:
+            self._tables[language] = synthetic_rows(language, self.rows)
+        return self._tables[language]
+
+    def do_GET(self):
+        parts = urlsplit(self.path)
+        query = parse_qs(parts.query)
+        language = parts.path.strip("/").split("/")[0] or "de"
+        if language not in LABELS:
+            self.send_error(404, "Unknown language")
+            return
+
+        per_page = math.ceil(self.rows / self.pages)
+        page = min(max(1, int(query.get("page", ["1"])[0])), self.pages)
+        page_rows = self._table(language)[(page - 1) * per_page: page * per_page]
+        word, of = LABELS[language]
+
+        if "fragment" in query:
+            body = json.dumps({"page": page, "rows": page_rows}, ensure_ascii=False).encode("utf-8")
+            content_type = "application/json"
+        else:
+            body = (PAGE_TEMPLATE % {
+                "rows": "".join("<tr>" + "".join(f"<td>{html.escape(cell)}</td>" for cell in row) + "</tr>"
+                                for row in page_rows),
+                "label": f"{word} {page} {of} {self.pages}",
+                "prev_disabled": " disabled" if page <= 1 else "",
+                "next_disabled": " disabled" if page >= self.pages else "",
+                "page": page,
+                "total": self.pages,
+                "word": json.dumps(word),
+                "of": json.dumps(of),
+            }).encode("utf-8")
+            content_type = "text/html; charset=utf-8"
+
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+# Function to start the fixture site in a background thread (port 0 picks a free port)
+def start_fixture_site(rows=1000, pages=20, host="127.0.0.1", port=0):
+    """
+    Returns:
+        tuple: (server, base_url) - scrape.URL_PATHS appended to base_url are served, call server.shutdown() when done
+    """
+    handler = type("BoundFixtureSiteHandler", (FixtureSiteHandler,), {"rows": rows, "pages": pages, "_tables": {}})
+    server = ThreadingHTTPServer((host, port), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://{host}:{server.server_address[1]}"
@@ -0,0 +1,169 @@
+#%%
+# Offline benchmarks for the scraper, update_database and the app filter path
+# Usage: python -m benchmarks.run_benchmarks [--sizes 10000 100000] [--skip-scraper] [--output results.json]
+
+#%%
+import os
+import sys
+import json
+import time
+import random
+import shutil
+import argparse
+import datetime
+import platform
+import tempfile
+import subprocess
+import statistics
+
+os.makedirs("logs", exist_ok=True)  # scrape.py logs to logs/scraper.log on import
+
+import numpy as np
+import db
+import dataset
+import scrape
+import http_scraper
+from benchmarks.fixture_site import start_fixture_site
+
+RESULTS_DIR = os.path.join("benchmarks", "results")
+NAMES = {"DE": "Inf RS", "FR": "ER inf", "IT": "SR fant"}
+
+# Function to time a call (returns seconds and the call's result)
+def timed(function, *args, **kwargs):
+    started = time.perf_counter()
+    result = function(*args, **kwargs)
+    return time.perf_counter() - started, result
+
+# Function to time a call several times (returns the median in milliseconds)
+def median_ms(function, repeat=5):
+    return round(statistics.median(timed(function)[0] for _ in range(repeat)) * 1000, 3)
+
+# Function to build a synthetic scrape result with `rows` records per language
+def synthetic_data(rows, seed=0):
+    rng = random.Random(seed)
+    base = datetime.date(2025, 1, 6)
+    data = []
+    for i in range(rows):
+        start = base + datetime.timedelta(days=rng.randrange(0, 1500))
+        end = start + datetime.timedelta(days=rng.choice((5, 12, 19, 40, 124, 145)))
+        for language, name in NAMES.items():
+            data.append({"language": language, "troopSchool": f"{name} {i % 500}-{i}",
+                         "startDate": start.isoformat(), "endDate": end.isoformat()})
+    return data
+
+# Function to change a share of the services (dropped services and new ones), as between two scrapes
+def changed_data(data, share=0.02, seed=1):
+    rng = random.Random(seed)
+    kept = [record for record in data if rng.random() >= share]
+    added = [dict(record, troopSchool=record["troopSchool"] + " neu") for record in rng.sample(data, len(data) - len(kept))]
+    return kept + added
+
+#%%
+# Scraper throughput against the local fixture site (Selenium and HTTP backends)
+def bench_scraper(rows, pages):
+    server, base_url = start_fixture_site(rows=rows, pages=pages)
+    url = base_url + scrape.URL_PATHS["DE"]
+    results = {"fixture": {"rows": rows, "pages": pages}}
+    try:
+        for backend, run in (
+            ("selenium", lambda: scrape.scrape_all_data(url, "DE", max_pages=pages, show_progress=False)),
+            ("http", lambda: scrape.capture_rows(http_scraper.fetch_table_rows(url, max_pages=pages), "DE")),
+        ):
+            try:
+                seconds, records = timed(run)
+            except Exception as e:
+                results[backend] = {"error": f"{type(e).__name__}: {e}".splitlines()[0]}
+                continue
+            results[backend] = {
+                "seconds": round(seconds, 3),
+                "records": len(records),
+                "pages_per_s": round(pages / seconds, 2),
+                "records_per_s": round(len(records) / seconds, 1),
+            }
+    finally:
+        server.shutdown()
+    return results
+
+# update_database (initial and incremental run) and the app's load and filter path for one dataset size
+def bench_database(rows, workdir):
+    db_path = os.path.join(workdir, f"bench_{rows}.db")
+    data = synthetic_data(rows)
+    results = {"rows_per_language": rows, "records": len(data)}
+
+    seconds, counts = timed(scrape.update_database, data, db_path)
+    results["update_initial_s"] = round(seconds, 3)
+    seconds, counts = timed(scrape.update_database, changed_data(data), db_path)
+    results["update_incremental_s"] = round(seconds, 3)
+    results["incremental_counts"] = counts
+    results["db_bytes"] = os.path.getsize(db_path)
+
+    pool = db.ReadOnlyPool(db_path)
+    seconds, snapshot = timed(dataset.load_active_dataset, pool)
+    results["load_s"] = round(seconds, 3)
+    seconds, _ = timed(dataset.load_active_dataset, pool, dataset.read_data_version(pool))
+    results["load_snapshot_s"] = round(seconds, 3)  # memory-mapped Arrow snapshot (same as load_s without pyarrow)
+
+    partition = snapshot["partitions"]["DE"]
+    troops = tuple(partition.troops[:50])
+    results["filter_ms"] = {
+        "dates": median_ms(lambda: dataset.filter_mask(partition, datetime.date(2026, 1, 1), datetime.date(2026, 12, 31))),
+        "dates_troops": median_ms(lambda: dataset.filter_mask(partition, datetime.date(2026, 1, 1),
+                                                              datetime.date(2026, 12, 31), troops)),
+        "free_window": median_ms(lambda: partition.intervals.mask((datetime.date(2026, 1, 1), datetime.date(2026, 6, 30)))),
+        "exam_periods": median_ms(lambda: partition.intervals.mask(exclusion_windows=[
+            (datetime.date(2026, 1, 12), datetime.date(2026, 2, 6)),
+            (datetime.date(2026, 6, 1), datetime.date(2026, 6, 26)),
+        ])),
+    }
+    return results
+
+#%%
+# Function to describe the environment the numbers were measured in
+def environment():
+    try:
+        commit = subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        "timestamp": datetime.datetime.now().isoformat(timespec="seconds"),
+        "commit": commit,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "numpy": np.__version__,
+    }
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Offline benchmarks for the scraper and DB pipeline")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000],
+                        help="Dataset sizes (rows per language) for the database benchmarks")
+    parser.add_argument("--fixture-rows", type=int, default=1000, help="Rows on the fixture site")
+    parser.add_argument("--fixture-pages", type=int, default=20, help="Pages on the fixture site")
+    parser.add_argument("--skip-scraper", action="store_true", help="Only run the database benchmarks")
+    parser.add_argument("--output", help="JSON file for the results (default: benchmarks/results/<timestamp>.json)")
+    args = parser.parse_args(argv)
+
+    results = {"environment": environment()}
+    if not args.skip_scraper:
+        print(f"Scraper: {args.fixture_rows} rows on {args.fixture_pages} pages")
+        results["scraper"] = bench_scraper(args.fixture_rows, args.fixture_pages)
+
+    workdir = tempfile.mkdtemp(prefix="service_dates_bench_")
+    try:
+        results["database"] = []
+        for rows in args.sizes:
+            print(f"Database: {rows} rows per language")
+            results["database"].append(bench_database(rows, workdir))
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    output = args.output or os.path.join(
+        RESULTS_DIR, f"{datetime.datetime.now().strftime('%Y%m%d-%H%M%S')}_{(results['environment']['commit'] or 'nogit')[:8]}.json"
+    )
+    os.makedirs(os.path.dirname(output) or ".", exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2)
+    print(f"Results written to {output}")
+    return results
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
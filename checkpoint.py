@@ -0,0 +1,147 @@
+#%%
+# Per-page staging and checkpoints for resumable scraping
+
+#%%
+import sqlite3
+import datetime
+
+class ScrapeCheckpoint:
+    """
+    Stage scraped pages in the database as soon as they are scraped.
+
+    Every page is written together with its progress row in one transaction, so after a
+    crash the staged rows and the list of done pages always agree. A rerun on the same day
+    resumes from the first page that is not done yet. Rows of older days are discarded.
+    """
+
+    def __init__(self, db_path, scrape_date=None):
+        self.scrape_date = scrape_date or datetime.date.today().strftime('%Y-%m-%d')
+        self.conn = sqlite3.connect(db_path, timeout=30)  # several scraper processes may write at once
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.create_tables()
+
+    def create_tables(self):
+        self.conn.execute("""
+        CREATE TABLE IF NOT EXISTS scrapePages (
+            scrapeDate TEXT NOT NULL,
+            language TEXT NOT NULL,
+            page INTEGER NOT NULL,
+            position INTEGER NOT NULL,  -- row position on the page
+            troopSchool TEXT NOT NULL,
+            startDate TEXT,
+            endDate TEXT,
+            cellCount INTEGER           -- raw rows without 3 cells (NULL = 3 cells)
+        )
+        """)
+        # Staging tables from before raw capture: add the column
+        if "cellCount" not in [row[1] for row in self.conn.execute("PRAGMA table_info(scrapePages)")]:
+            self.conn.execute("ALTER TABLE scrapePages ADD COLUMN cellCount INTEGER")
+        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_scrapePages_page ON scrapePages(scrapeDate, language, page)")
+        self.conn.execute("""
+        CREATE TABLE IF NOT EXISTS scrapeProgress (
+            scrapeDate TEXT NOT NULL,
+            language TEXT NOT NULL,
+            page INTEGER NOT NULL,
+            records INTEGER NOT NULL,
+            PRIMARY KEY (scrapeDate, language, page)
+        )
+        """)
+        self.conn.execute("""
+        CREATE TABLE IF NOT EXISTS scrapeLanguages (
+            scrapeDate TEXT NOT NULL,
+            language TEXT NOT NULL,
+            siteTotalPages INTEGER,
+            completed BOOLEAN NOT NULL DEFAULT FALSE,
+            PRIMARY KEY (scrapeDate, language)
+        )
+        """)
+        self.conn.commit()
+
+    # Stage the (raw) records of one page and mark the page as done
+    def save_page(self, language, page, records):
+        with self.conn:
+            self.conn.execute("DELETE FROM scrapePages WHERE scrapeDate = ? AND language = ? AND page = ?",
+                              (self.scrape_date, language, page))
+            self.conn.executemany(
+                "INSERT INTO scrapePages VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                [(self.scrape_date, language, page, position, record["troopSchool"], record["startDate"], record["endDate"],
+                  record.get("cellCount"))
+                 for position, record in enumerate(records)]
+            )
+            self.conn.execute("INSERT OR REPLACE INTO scrapeProgress VALUES (?, ?, ?, ?)",
+                              (self.scrape_date, language, page, len(records)))
+
+    # Remember the total number of pages the site reports for a language
+    def set_site_total(self, language, total_pages):
+        with self.conn:
+            self.conn.execute("""
+            INSERT INTO scrapeLanguages (scrapeDate, language, siteTotalPages) VALUES (?, ?, ?)
+            ON CONFLICT (scrapeDate, language) DO UPDATE SET siteTotalPages = excluded.siteTotalPages
+            """, (self.scrape_date, language, total_pages))
+
+    # Mark a language as complete (for backends that fetch all pages at once)
+    def mark_completed(self, language):
+        with self.conn:
+            self.conn.execute("""
+            INSERT INTO scrapeLanguages (scrapeDate, language, completed) VALUES (?, ?, TRUE)
+            ON CONFLICT (scrapeDate, language) DO UPDATE SET completed = TRUE
+            """, (self.scrape_date, language))
+
+    def done_pages(self, language):
+        return {row[0] for row in self.conn.execute(
+            "SELECT page FROM scrapeProgress WHERE scrapeDate = ? AND language = ?", (self.scrape_date, language)
+        )}
+
+    # First page in first_page..last_page that is not done yet (last_page + 1 if all are done)
+    def first_missing_page(self, language, first_page, last_page):
+        done = self.done_pages(language)
+        page = first_page
+        while page <= last_page and page in done:
+            page += 1
+        return page
+
+    # A language is complete when all pages up to the site total (capped by max_pages) are done
+    def is_completed(self, language, max_pages):
+        row = self.conn.execute(
+            "SELECT siteTotalPages, completed FROM scrapeLanguages WHERE scrapeDate = ? AND language = ?",
+            (self.scrape_date, language)
+        ).fetchone()
+        if not row:
+            return False
+        site_total, completed = row
+        if completed:
+            return True
+        if not site_total:
+            return False
+        return self.first_missing_page(language, 1, min(site_total, max_pages)) > min(site_total, max_pages)
+
+    def count(self, language):
+        return self.conn.execute("SELECT COALESCE(SUM(records), 0) FROM scrapeProgress WHERE scrapeDate = ? AND language = ?",
+                                 (self.scrape_date, language)).fetchone()[0]
+
+    # Staged records in the shape scrape_all_data returns, ordered by language, page and row
+    def records(self, languages):
+        for language in languages:
+            cursor = self.conn.execute("""
+            SELECT troopSchool, startDate, endDate, cellCount FROM scrapePages
+            WHERE scrapeDate = ? AND language = ?
+            ORDER BY page, position
+            """, (self.scrape_date, language))
+            for troop, start, end, cell_count in cursor:
+                yield {"language": language, "troopSchool": troop, "startDate": start, "endDate": end,
+                       "cellCount": cell_count}
+
+    # Discard staged rows of earlier days (a new day starts a new scrape)
+    def clear_older(self):
+        with self.conn:
+            for table in ("scrapePages", "scrapeProgress", "scrapeLanguages"):
+                self.conn.execute(f"DELETE FROM {table} WHERE scrapeDate <> ?", (self.scrape_date,))
+
+    # Discard today's staged rows (after they were applied to the database)
+    def clear(self):
+        with self.conn:
+            for table in ("scrapePages", "scrapeProgress", "scrapeLanguages"):
+                self.conn.execute(f"DELETE FROM {table} WHERE scrapeDate = ?", (self.scrape_date,))
+
+    def close(self):
+        self.conn.close()
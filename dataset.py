@@ -0,0 +1,289 @@
+# dataset.py
+# Version-aware snapshot of the app data, reloaded in the background when the scraper writes new data
+import os
+import json
+import sqlite3
+import logging
+import threading
+from collections import namedtuple
+import numpy as np
+import pandas as pd
+import intervals
+
+try:
+    import pyarrow
+    import pyarrow.ipc  # optional: memory-mapped snapshot of the active data
+except ImportError:
+    pyarrow = None
+
+# A loaded dataset together with the data version it was built from
+Snapshot = namedtuple("Snapshot", ["version", "data"])
+
+# Per-language slice of the active data, typed once per data version
+Partition = namedtuple("Partition", ["frame", "troops", "intervals"])
+
+# Build a partition from a typed frame (categorical troopSchool with sorted categories, datetime64 dates)
+def make_partition(frame):
+    index = intervals.IntervalIndex(frame["startDate"].to_numpy(), frame["endDate"].to_numpy())
+    return Partition(frame, list(frame["troopSchool"].cat.categories), index)
+
+# Build the typed per-language partitions from the raw activeServiceDates rows
+def build_partitions(df):
+    """
+    Split the active data by language and convert it once: datetime64 dates, categorical
+    troopSchool (categories = the sorted troop list) and a fresh 0..n-1 index, plus an
+    interval index over the service dates for window/conflict queries.
+    """
+    partitions = {}
+    for language, part in df.groupby("language", sort=True):
+        part = part.reset_index(drop=True)
+        troops = sorted(part["troopSchool"].unique())
+        frame = pd.DataFrame({
+            "language": pd.Categorical(part["language"]),
+            "troopSchool": pd.Categorical(part["troopSchool"], categories=troops),
+            "startDate": pd.to_datetime(part["startDate"], errors="coerce"),
+            "endDate": pd.to_datetime(part["endDate"], errors="coerce"),
+        })
+        partitions[language] = make_partition(frame)
+    return partitions
+
+# Helper to read the active rows and the linked events ('ALL') of a database connection
+def _read_active(conn):
+    df = pd.read_sql("SELECT language, troopSchool, startDate, endDate, scrapeDate FROM activeServiceDates", conn)
+    try:
+        # One row per linked DE/FR/IT event, with all names in troopSchool
+        events = pd.read_sql("SELECT 'ALL' AS language, label AS troopSchool, startDate, endDate FROM serviceEvents", conn)
+    except (sqlite3.OperationalError, pd.errors.DatabaseError):
+        events = pd.DataFrame()  # database from before event linking
+    return df, events
+
+# Load the active data (through a db.ReadOnlyPool) and build the snapshot data the app works with
+def load_active_dataset(pool, version=None):
+    """
+    With a data version, the Arrow snapshot next to the database is used if it was
+    published for that version; otherwise (or without pyarrow) the rows come from SQLite.
+    """
+    if version is not None:
+        data = load_snapshot(snapshot_path(pool.db_path), version)
+        if data is not None:
+            return data
+    with pool.connection() as conn:
+        df, events = _read_active(conn)
+    partitions = build_partitions(df)
+    if not events.empty:
+        partitions.update(build_partitions(events))
+    return {
+        "last_updated": df["scrapeDate"].max() if not df.empty else None,
+        "partitions": partitions,
+    }
+
+# Arrow snapshot of the active data, written by the scraper and memory-mapped by every app replica
+SNAPSHOT_NAME = "active_snapshot.arrow"
+
+# Path of the snapshot that belongs to a database file
+def snapshot_path(db_path):
+    return os.path.join(os.path.dirname(db_path), SNAPSHOT_NAME)
+
+# Helper: one-element list array holding all values of a partition (so every language has its own column length)
+def _single_list(values):
+    return pyarrow.ListArray.from_arrays(pyarrow.array([0, len(values)], pyarrow.int32()), values)
+
+# Function to write the active data of a database connection as an Arrow IPC file
+def write_snapshot(conn, path, version, publish=True):
+    """
+    The file holds the partitions exactly as load_active_dataset builds them, in one row
+    with three columns per language: troopSchool as a dictionary with that language's
+    sorted troop list (indices of the width pandas uses for the codes), and startDate and
+    endDate as int64 nanoseconds with NaT's value for missing dates, so there are no null
+    bitmaps. The language order, the data version and the last scrape date are in the
+    schema metadata. The file is uncompressed so readers can memory-map it, and it is
+    written to a temporary file and renamed into place, so readers see the old or the new
+    snapshot, never a partial one. With publish=False the temporary file is left for
+    publish_snapshot, so a writer can build it inside its transaction and rename it right
+    after the commit.
+
+    Returns:
+        int: Number of rows written
+    """
+    if pyarrow is None:
+        raise ImportError("Writing the Arrow snapshot needs pyarrow")
+    df, events = _read_active(conn)
+    partitions = build_partitions(df)
+    if not events.empty:
+        partitions.update(build_partitions(events))
+
+    columns = {}
+    for language, partition in partitions.items():
+        frame = partition.frame
+        troops = pyarrow.DictionaryArray.from_arrays(frame["troopSchool"].cat.codes.to_numpy(),
+                                                     pyarrow.array(partition.troops, pyarrow.string()))
+        columns[f"troopSchool/{language}"] = _single_list(troops)
+        for name in ("startDate", "endDate"):
+            columns[f"{name}/{language}"] = _single_list(pyarrow.array(frame[name].to_numpy().view(np.int64)))
+    table = pyarrow.table(columns).replace_schema_metadata({
+        "dataVersion": str(version),
+        "lastUpdated": (df["scrapeDate"].max() if not df.empty else None) or "",
+        "languages": json.dumps(list(partitions)),
+    })
+
+    tmp_path = _tmp_path(path)
+    try:
+        with pyarrow.OSFile(tmp_path, "wb") as sink, pyarrow.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+    except BaseException:
+        discard_snapshot(path)
+        raise
+    if publish:
+        publish_snapshot(path)
+    return sum(len(partition.frame) for partition in partitions.values())
+
+# Helper: temporary file of a snapshot (per process, so writers never rename each other's files)
+def _tmp_path(path):
+    return f"{path}.{os.getpid()}.tmp"
+
+# Rename a snapshot written with publish=False into place
+def publish_snapshot(path):
+    os.replace(_tmp_path(path), path)
+
+# Remove a snapshot written with publish=False (e.g. when the transaction it belongs to was rolled back)
+def discard_snapshot(path):
+    if os.path.exists(_tmp_path(path)):
+        os.remove(_tmp_path(path))
+
+# Function to load the snapshot data from the Arrow file (None if missing, unreadable or not for this version)
+def load_snapshot(path, version):
+    """
+    The file is memory-mapped and the partition frames are built on top of its buffers
+    without copying: the dates are viewed as datetime64[ns] and the troop codes are used
+    as the categorical codes directly. Those pages come from the page cache, which all
+    app processes on the host share; only each language's troop list is decoded into
+    Python strings. The partitions are returned in the same order as load_active_dataset.
+    """
+    if pyarrow is None or not os.path.exists(path):
+        return None
+    try:
+        table = pyarrow.ipc.open_file(pyarrow.memory_map(path, "r")).read_all()
+    except (OSError, pyarrow.ArrowInvalid) as e:
+        logging.warning(f"Arrow snapshot {path} not readable, loading from SQLite: {e}")
+        return None
+    metadata = table.schema.metadata or {}
+    if metadata.get(b"dataVersion", b"").decode() != str(version):
+        return None  # written for another version (e.g. the scraper is still publishing)
+
+    partitions = {}
+    for language in json.loads(metadata[b"languages"]):
+        troops = table[f"troopSchool/{language}"].chunk(0).values
+        codes = troops.indices.to_numpy(zero_copy_only=True)
+        dates = {name: table[f"{name}/{language}"].chunk(0).values.to_numpy(zero_copy_only=True).view("datetime64[ns]")
+                 for name in ("startDate", "endDate")}
+        frame = pd.DataFrame({
+            "language": pd.Categorical.from_codes(np.zeros(len(codes), dtype=np.int8), [language]),
+            "troopSchool": pd.Categorical.from_codes(codes, troops.dictionary.to_pylist(), validate=False),
+            "startDate": dates["startDate"],
+            "endDate": dates["endDate"],
+        }, copy=False)
+        partitions[language] = make_partition(frame)
+    return {
+        "last_updated": metadata.get(b"lastUpdated", b"").decode() or None,
+        "partitions": partitions,
+    }
+
+# Boolean mask of a partition for the sidebar filters (troops=None means no troop filter)
+def filter_mask(partition, date_start=None, date_end=None, troops=None):
+    frame = partition.frame
+    mask = np.ones(len(frame), dtype=bool)
+    if date_start is not None:
+        mask &= frame["startDate"].to_numpy() >= np.datetime64(date_start, "ns")
+    if date_end is not None:
+        mask &= frame["endDate"].to_numpy() <= np.datetime64(date_end, "ns")
+    if troops is not None:
+        mask &= frame["troopSchool"].isin(troops).to_numpy()
+    return mask
+
+# Columns the result view can be sorted by (the others break ties in this order)
+SORT_COLUMNS = ["startDate", "endDate", "troopSchool"]
+
+# Helper: int64 sort key of a column (categorical codes follow the sorted categories) and its missing values
+def _sort_key(column):
+    if isinstance(column.dtype, pd.CategoricalDtype):
+        codes = column.cat.codes.to_numpy().astype(np.int64)
+        return codes, codes < 0
+    values = column.to_numpy()
+    return values.view(np.int64), np.isnat(values)
+
+# Row positions of a partition sorted by one column (ties: the other SORT_COLUMNS), missing values last
+def sort_order(partition, sort_by="startDate", descending=False):
+    keys = []
+    for name in [sort_by] + [column for column in SORT_COLUMNS if column != sort_by]:
+        key, missing = _sort_key(partition.frame[name])
+        if name == sort_by and descending:
+            key = -key
+        keys.append(np.where(missing, np.iinfo(np.int64).max, key))
+    return np.lexsort(keys[::-1])  # lexsort sorts by the last key first
+
+# Row positions of one result page: the masked rows in sort order, from offset
+def page_positions(order, mask, offset, limit):
+    return order[mask[order]][offset:offset + limit]
+
+# Cheap data-version signal: the version row written by update_database, else the DB file's mtime
+def read_data_version(pool):
+    if not pool.exists():
+        return None
+    try:
+        with pool.connection() as conn:
+            row = conn.execute("SELECT value FROM metadata WHERE key = 'dataVersion'").fetchone()
+        if row:
+            return row[0]
+    except sqlite3.OperationalError:
+        pass  # older database without metadata table
+    return f"mtime:{os.path.getmtime(pool.db_path)}"
+
+# Process-wide holder of the current snapshot
+class DatasetStore:
+    """
+    Keep one snapshot per process and swap it when the data version changes.
+
+    The first call loads synchronously. Later version changes are loaded in a background
+    thread while callers keep getting the old snapshot until the new one is ready.
+    Failed loads are never stored, so a missing table is retried on the next call.
+    """
+
+    def __init__(self, loader, version_reader):
+        self._loader = loader                  # loader(version) -> data
+        self._version_reader = version_reader  # version_reader() -> version or None
+        self._snapshot = None
+        self._reloading = False
+        self._lock = threading.Lock()
+
+    def get(self):
+        version = self._version_reader()
+        with self._lock:
+            snapshot = self._snapshot
+            if snapshot is not None and (snapshot.version == version or self._reloading):
+                return snapshot
+            if snapshot is not None:
+                self._reloading = True
+                threading.Thread(target=self._reload, args=(version,), daemon=True).start()
+                return snapshot
+
+        # No snapshot yet: load in the caller's thread
+        return self._load(version)
+
+    def _load(self, version):
+        if version is None:
+            return None
+        try:
+            snapshot = Snapshot(version, self._loader(version))
+        except Exception as e:
+            logging.warning(f"Could not load dataset version {version}: {e}")
+            return None
+        with self._lock:
+            self._snapshot = snapshot
+        return snapshot
+
+    def _reload(self, version):
+        try:
+            self._load(version)
+        finally:
+            with self._lock:
+                self._reloading = False
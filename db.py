@@ -0,0 +1,48 @@
+# db.py
+# Pooled read-only SQLite connections for the app (the scraper is the only writer)
+import os
+import queue
+import sqlite3
+from contextlib import contextmanager
+
+DB_PATH = "data/service_dates.db"
+
+class ReadOnlyPool:
+    """
+    Reuse read-only connections across reruns and sessions.
+
+    With the database in WAL mode, readers see the last committed snapshot and are never
+    blocked by the scraper's write transaction (and never see a half-written table).
+    """
+
+    def __init__(self, db_path=DB_PATH, size=4, timeout=5.0):
+        self.db_path = db_path
+        self._timeout = timeout
+        self._idle = queue.LifoQueue(maxsize=size)
+
+    def _connect(self):
+        uri = f"file:{os.path.abspath(self.db_path)}?mode=ro"
+        conn = sqlite3.connect(uri, uri=True, check_same_thread=False, timeout=self._timeout)
+        conn.execute("PRAGMA query_only = ON")
+        return conn
+
+    def exists(self):
+        return os.path.exists(self.db_path)
+
+    @contextmanager
+    def connection(self):
+        try:
+            conn = self._idle.get_nowait()
+        except queue.Empty:
+            conn = self._connect()
+        try:
+            yield conn
+        except Exception:
+            conn.close()  # don't return a connection in an unknown state
+            raise
+        else:
+            conn.rollback()  # end the read transaction so the next user sees new commits
+            try:
+                self._idle.put_nowait(conn)
+            except queue.Full:
+                conn.close()
@@ -0,0 +1,210 @@
+#%%
+# Streaming exports of the scraped data (NDJSON, gzip/zstd, Parquet) with daily delta files
+
+#%%
+import os
+import re
+import gzip
+import json
+import sqlite3
+import logging
+
+try:
+    import zstandard  # optional: .zst exports
+except ImportError:
+    zstandard = None
+
+try:
+    import pyarrow
+    import pyarrow.parquet  # optional: .parquet exports
+except ImportError:
+    pyarrow = None
+
+EXPORT_DIR = "json_exports"
+FORMATS = ("ndjson", "ndjson.gz", "ndjson.zst", "parquet")
+RECORD_COLUMNS = ["language", "troopSchool", "startDate", "endDate"]
+DELTA_COLUMNS = ["change"] + RECORD_COLUMNS  # change: "removed" or "added"
+
+# base_YYYY-MM-DD.<format> / delta_YYYY-MM-DD.<format>
+FILE_PATTERN = re.compile(r"^(base|delta)_(\d{4}-\d{2}-\d{2})\.(ndjson(?:\.gz|\.zst)?|parquet)$")
+PARQUET_BATCH_SIZE = 10000
+
+class ExportError(Exception):
+    """Raised for unknown export formats or missing optional dependencies."""
+
+# Function to build the file name of an export
+def export_filename(kind, date, export_format="ndjson.gz"):
+    if export_format not in FORMATS:
+        raise ExportError(f"Unknown export format: {export_format} (use one of {', '.join(FORMATS)})")
+    return f"{kind}_{date}.{export_format}"
+
+# Function to open an NDJSON file as text (compression from the name: .gz, .zst or none)
+def open_ndjson(path, mode="r", name=None):
+    name = name or path
+    if name.endswith(".gz"):
+        return gzip.open(path, mode + "t", encoding="utf-8")
+    if name.endswith(".zst"):
+        if zstandard is None:
+            raise ExportError("zstd exports need the zstandard package (pip install zstandard)")
+        return zstandard.open(path, mode + "t", encoding="utf-8")
+    return open(path, mode, encoding="utf-8")
+
+#%%
+# Function to write rows (dicts) to an export file one at a time (to a temp file that is renamed when complete)
+def write_rows(rows, path, columns=RECORD_COLUMNS):
+    tmp_path = path + ".tmp"
+    try:
+        count = _write_rows(rows, tmp_path, path, columns)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)  # don't leave a partial export behind
+        raise
+    os.replace(tmp_path, path)
+    logging.info(f"Exported {count} rows to {path}")
+    return count
+
+def _write_rows(rows, tmp_path, path, columns):
+    count = 0
+    if path.endswith(".parquet"):
+        if pyarrow is None:
+            raise ExportError("Parquet exports need the pyarrow package (pip install pyarrow)")
+        schema = pyarrow.schema([(column, pyarrow.string()) for column in columns])
+        with pyarrow.parquet.ParquetWriter(tmp_path, schema, compression="zstd") as writer:
+            batch = []
+            for row in rows:
+                batch.append({column: row.get(column) for column in columns})
+                if len(batch) >= PARQUET_BATCH_SIZE:
+                    writer.write_table(pyarrow.Table.from_pylist(batch, schema=schema))
+                    count += len(batch)
+                    batch = []
+            writer.write_table(pyarrow.Table.from_pylist(batch, schema=schema))
+            count += len(batch)
+    else:
+        with open_ndjson(tmp_path, "w", name=path) as f:
+            for row in rows:
+                f.write(json.dumps({column: row.get(column) for column in columns}, ensure_ascii=False) + "\n")
+                count += 1
+    return count
+
+# Function to read the rows of an export file one at a time
+def read_rows(path):
+    if path.endswith(".parquet"):
+        if pyarrow is None:
+            raise ExportError("Parquet exports need the pyarrow package (pip install pyarrow)")
+        for batch in pyarrow.parquet.ParquetFile(path).iter_batches(batch_size=PARQUET_BATCH_SIZE):
+            yield from batch.to_pylist()
+    else:
+        with open_ndjson(path) as f:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+
+#%%
+# Function to export the active data (streamed from the database, in scrape order)
+def export_base(db_path, path):
+    conn = sqlite3.connect(db_path)
+    try:
+        cursor = conn.execute(f"SELECT {', '.join(RECORD_COLUMNS)} FROM activeServiceDates ORDER BY rowid")
+        return write_rows((dict(zip(RECORD_COLUMNS, row)) for row in cursor), path)
+    finally:
+        conn.close()
+
+# Function to export the rows added and removed on a scrape date (from the serviceDateHistory intervals)
+def export_delta(db_path, path, date):
+    """
+    Removed rows come first, so a record that was removed and re-added on the same day
+    ends up present when the delta is applied in file order.
+    """
+    conn = sqlite3.connect(db_path)
+    try:
+        cursor = conn.execute(f"""
+        SELECT 0 AS step, 'removed', {', '.join('sd.' + column for column in RECORD_COLUMNS)}, sd.id AS serviceId
+        FROM serviceDateHistory h JOIN serviceDates sd ON sd.id = h.serviceId
+        WHERE h.validTo = ?
+        UNION ALL
+        SELECT 1 AS step, 'added', {', '.join('sd.' + column for column in RECORD_COLUMNS)}, sd.id
+        FROM serviceDateHistory h JOIN serviceDates sd ON sd.id = h.serviceId
+        WHERE h.validFrom = ?
+        ORDER BY step, serviceId
+        """, (date, date))
+        return write_rows((dict(zip(DELTA_COLUMNS, row[1:-1])) for row in cursor), path, columns=DELTA_COLUMNS)
+    finally:
+        conn.close()
+
+# Function to export a run: the day's delta, plus a full base export if the directory has none yet
+def export_run(db_path, date, export_dir=EXPORT_DIR, export_format="ndjson.gz"):
+    os.makedirs(export_dir, exist_ok=True)
+    written = []
+    if not any(kind == "base" for kind, _, _ in list_exports(export_dir)):
+        path = os.path.join(export_dir, export_filename("base", date, export_format))
+        export_base(db_path, path)
+        written.append(path)
+    else:
+        path = os.path.join(export_dir, export_filename("delta", date, export_format))
+        export_delta(db_path, path, date)
+        written.append(path)
+    return written
+
+# Function to list the export files of a directory as (kind, date, path), sorted by date
+def list_exports(export_dir=EXPORT_DIR):
+    if not os.path.isdir(export_dir):
+        return []
+    files = []
+    for name in os.listdir(export_dir):
+        match = FILE_PATTERN.match(name)
+        if match:
+            files.append((match.group(1), match.group(2), os.path.join(export_dir, name)))
+    return sorted(files, key=lambda item: (item[1], item[0] == "delta"))
+
+#%%
+# Function to replay the latest base export and the later deltas as the states of the scraped days
+def replay_exports(export_dir=EXPORT_DIR):
+    """
+    Yields:
+        tuple: (date, records) - the full record list as of every export date, in date order
+    """
+    files = list_exports(export_dir)
+    bases = [item for item in files if item[0] == "base"]
+    if not bases:
+        raise ExportError(f"No base export found in {export_dir}")
+    _, base_date, base_path = bases[-1]
+
+    # Insertion-ordered dict as an ordered set of record tuples
+    state = dict.fromkeys(tuple(row[column] for column in RECORD_COLUMNS) for row in read_rows(base_path))
+    yield base_date, [dict(zip(RECORD_COLUMNS, key)) for key in state]
+
+    for kind, date, path in files:
+        if kind != "delta" or date <= base_date:
+            continue
+        for row in read_rows(path):
+            key = tuple(row[column] for column in RECORD_COLUMNS)
+            if row["change"] == "removed":
+                state.pop(key, None)
+            else:
+                state[key] = None
+        yield date, [dict(zip(RECORD_COLUMNS, key)) for key in state]
+
+# Function to rebuild a database from a base export and its deltas (one update per export date)
+def rebuild_database(db_path, export_dir=EXPORT_DIR):
+    import scrape  # scrape.py imports this module for run_scraper
+
+    summaries = []
+    for date, records in replay_exports(export_dir):
+        summaries.append(scrape.update_database(records, db_path, scrape_date=date))
+    logging.info(f"Rebuilt {db_path} from {len(summaries)} exports in {export_dir}")
+    return summaries
+
+#%%
+# Usage: python exports.py export <db_path> <date> [export_dir] [format]
+#        python exports.py rebuild <db_path> [export_dir]
+if __name__ == "__main__":
+    import sys
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+    if len(sys.argv) >= 4 and sys.argv[1] == "export":
+        print(export_run(sys.argv[2], sys.argv[3], *sys.argv[4:6]))
+    elif len(sys.argv) >= 3 and sys.argv[1] == "rebuild":
+        print(rebuild_database(sys.argv[2], *sys.argv[3:4]))
+    else:
+        print("Usage: python exports.py export <db_path> <date> [export_dir] [format]\n"
+              "       python exports.py rebuild <db_path> [export_dir]")
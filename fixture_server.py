@@ -0,0 +1,108 @@
+#%%
+# Local stand-in for armee.ch serving fixture pages (offline runs and tests of the HTTP backend)
+# The fixtures in fixtures/ are synthetic pages in the site's markup; `record` replaces them with real pages
+
+#%%
+import os
+import sys
+import logging
+import threading
+from http.server import ThreadingHTTPServer, SimpleHTTPRequestHandler
+from urllib.parse import urlsplit, parse_qs
+import http_scraper
+
+FIXTURES_DIR = "fixtures"
+PAYLOAD_NAME = "_payload.json"
+
+# Function to map a site URL path and page number to its fixture file
+def fixture_path(fixtures_dir, url_path, page):
+    return os.path.join(fixtures_dir, url_path.strip("/"), f"page_{page}.html")
+
+# Function to map a site URL path to its recorded Nuxt payload (<url path>/_payload.json)
+def payload_path(fixtures_dir, url_path):
+    return os.path.join(fixtures_dir, url_path.strip("/"), PAYLOAD_NAME)
+
+#%%
+# Request handler answering "/<url path>?page=N" with the fixture page N (and "/<url path>/_payload.json")
+class FixtureHandler(SimpleHTTPRequestHandler):
+    fixtures_dir = FIXTURES_DIR
+    page_param = "page"
+
+    def do_GET(self):
+        parts = urlsplit(self.path)
+        if parts.path.endswith("/" + PAYLOAD_NAME):
+            self.send_fixture(payload_path(self.fixtures_dir, parts.path[:-len(PAYLOAD_NAME)]), "application/json")
+            return
+        try:
+            page = int(parse_qs(parts.query).get(self.page_param, ["1"])[0])
+        except ValueError:
+            self.send_error(400, "Invalid page parameter")
+            return
+
+        self.send_fixture(fixture_path(self.fixtures_dir, parts.path, page), "text/html")
+
+    def send_fixture(self, path, content_type):
+        if not os.path.isfile(path):
+            self.send_error(404, f"No fixture {path}")
+            return
+
+        with open(path, "rb") as fixture_file:
+            body = fixture_file.read()
+        self.send_response(200)
+        self.send_header("Content-Type", f"{content_type}; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        logging.debug("fixture server: " + format, *args)
+
+# Function to start the fixture server in a background thread (port 0 picks a free port)
+def start_fixture_server(fixtures_dir=FIXTURES_DIR, host="127.0.0.1", port=0):
+    """
+    Serve the fixture pages on a local port.
+
+    Returns:
+        tuple: (server, base_url) - pass base_url to run_scraper, call server.shutdown() when done
+    """
+    handler = type("BoundFixtureHandler", (FixtureHandler,), {"fixtures_dir": fixtures_dir})
+    server = ThreadingHTTPServer((host, port), handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server, f"http://{host}:{server.server_address[1]}"
+
+#%%
+# Function to record the pages of one site URL into the fixtures directory
+def record_fixtures(url, max_pages=3, fixtures_dir=FIXTURES_DIR, page_param="page"):
+    session = http_scraper.create_session()
+    try:
+        for page in range(1, max_pages + 1):
+            response = session.get(http_scraper.page_url(url, page, page_param), timeout=15)
+            response.raise_for_status()
+            path = fixture_path(fixtures_dir, urlsplit(url).path, page)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, "w", encoding="utf-8") as fixture_file:
+                fixture_file.write(response.text)
+            logging.info(f"Recorded {url} page {page} to {path}")
+
+        # The Nuxt payload of prerendered pages, if the site serves one
+        response = session.get(url.rstrip("/") + "/" + PAYLOAD_NAME, timeout=15)
+        if response.ok and response.text.lstrip().startswith("["):
+            path = payload_path(fixtures_dir, urlsplit(url).path)
+            with open(path, "w", encoding="utf-8") as fixture_file:
+                fixture_file.write(response.text)
+            logging.info(f"Recorded the Nuxt payload of {url} to {path}")
+    finally:
+        session.close()
+
+#%%
+if __name__ == "__main__":
+    # Usage: python fixture_server.py [port]               -> serve ./fixtures
+    #        python fixture_server.py record <url> [pages] -> record pages into ./fixtures
+    if len(sys.argv) > 2 and sys.argv[1] == "record":
+        record_fixtures(sys.argv[2], max_pages=int(sys.argv[3]) if len(sys.argv) > 3 else 3)
+    else:
+        port = int(sys.argv[1]) if len(sys.argv) > 1 else 8765
+        server = ThreadingHTTPServer(("127.0.0.1", port), FixtureHandler)
+        print(f"Serving {FIXTURES_DIR} on http://127.0.0.1:{port} (use run_scraper(backend='http', base_url=...))")
+        server.serve_forever()
@@ -0,0 +1,306 @@
+#%%
+# Browserless HTTP backend for the Swiss Army service dates scraper
+
+#%%
+import re
+import json
+import logging
+from html.parser import HTMLParser
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode, urljoin
+import requests
+from requests.adapters import HTTPAdapter
+
+# Classes of the div that holds the pagination text ("Seite X von Y" / "Page X de Y" / "Pagina X da Y")
+PAGINATION_CLASSES = {"my-5", "flex", "items-center", "justify-center"}
+
+HEADERS = {
+    "User-Agent": "Mozilla/5.0 (X11; Linux x86_64) swiss-army-service-dates",
+    "Accept": "text/html,application/xhtml+xml",
+}
+
+# Date values in the Nuxt payload: dd.mm.yyyy as in the table, or ISO (optionally with a time)
+PAYLOAD_DATE = re.compile(r"^(?:(\d{2}\.\d{2}\.\d{4})|(\d{4})-(\d{2})-(\d{2})(?:T[\d:.]+(?:Z|[+-]\d{2}:?\d{2})?)?)$")
+
+# Tags of the devalue format (Nuxt 3 payloads) that wrap a single value
+PAYLOAD_WRAPPERS = {"Reactive", "ShallowReactive", "Ref", "ShallowRef"}
+
+class HttpScrapeError(Exception):
+    """Raised when the server-rendered pages do not contain the data we need (caller falls back to Selenium)."""
+
+#%%
+# Parser for the server-rendered (Nuxt SSR) HTML of one results page
+class TablePageParser(HTMLParser):
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.rows = []          # cell texts of every "table tbody tr"
+        self.page_text = None   # text of the first span in the pagination div
+        self._tbody_depth = 0
+        self._row = None
+        self._cell = None
+        self._div_depth = 0
+        self._pagination_div = None  # div depth at which the pagination div was opened
+        self._span = None
+        self.payload = None     # (kind, text) of the embedded Nuxt data: "nuxt3" (__NUXT_DATA__) or "nuxt2"
+        self._script = None
+        self._script_id = None
+
+    def handle_starttag(self, tag, attrs):
+        if tag == "div":
+            self._div_depth += 1
+            classes = set((dict(attrs).get("class") or "").split())
+            if self._pagination_div is None and PAGINATION_CLASSES <= classes:
+                self._pagination_div = self._div_depth
+        elif tag == "span" and self._pagination_div is not None and self.page_text is None:
+            self._span = []
+        elif tag == "tbody":
+            self._tbody_depth += 1
+        elif tag == "tr" and self._tbody_depth:
+            self._row = []
+        elif tag == "td" and self._row is not None:
+            self._cell = []
+        elif tag == "script":
+            self._script = []
+            self._script_id = dict(attrs).get("id")
+
+    def handle_endtag(self, tag):
+        if tag == "div":
+            if self._pagination_div == self._div_depth:
+                self._pagination_div = None
+            self._div_depth -= 1
+        elif tag == "span" and self._span is not None:
+            self.page_text = " ".join("".join(self._span).split())
+            self._span = None
+        elif tag == "tbody" and self._tbody_depth:
+            self._tbody_depth -= 1
+        elif tag == "tr" and self._row is not None:
+            self.rows.append(self._row)
+            self._row = None
+        elif tag == "td" and self._cell is not None:
+            self._row.append(" ".join("".join(self._cell).split()))
+            self._cell = None
+        elif tag == "script" and self._script is not None:
+            text = "".join(self._script).strip()
+            if self._script_id == "__NUXT_DATA__":
+                self.payload = ("nuxt3", text)
+            elif text.startswith("window.__NUXT__") and self.payload is None:
+                self.payload = ("nuxt2", text)
+            self._script = None
+
+    def handle_data(self, data):
+        if self._script is not None:
+            self._script.append(data)
+            return
+        if self._cell is not None:
+            self._cell.append(data)
+        if self._span is not None:
+            self._span.append(data)
+
+# Function to parse the current and total page numbers from the pagination text
+def parse_page_numbers(page_text):
+    match = re.search(r"\D+\s(\d+)\s\D+\s(\d+)", page_text or "")
+    return (int(match.group(1)), int(match.group(2))) if match else None
+
+# Function to build the URL of a given results page
+def page_url(url, page, page_param="page"):
+    if page == 1:
+        return url
+    parts = urlsplit(url)
+    query = [(key, value) for key, value in parse_qsl(parts.query) if key != page_param]
+    query.append((page_param, str(page)))
+    return urlunsplit(parts._replace(query=urlencode(query)))
+
+# Function to create a session that keeps connections alive across page requests
+def create_session(workers=4):
+    session = requests.Session()
+    session.headers.update(HEADERS)
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max(1, workers))
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+# Function to fetch and parse one results page
+def fetch_page(session, url, page, timeout=15, page_param="page"):
+    response = session.get(page_url(url, page, page_param), timeout=timeout)
+    response.raise_for_status()
+    parser = TablePageParser()
+    parser.feed(response.text)
+    parser.close()
+    return parser
+
+#%%
+# Function to rebuild the value of a Nuxt 3 payload (devalue format: a flat array, containers refer to indices)
+def unflatten_payload(values):
+    if not isinstance(values, list) or not values:
+        return None
+    hydrated = {}
+
+    def hydrate(index):
+        if not isinstance(index, int) or index < 0 or index >= len(values):
+            return None  # negative indices encode undefined, NaN, holes, ...
+        if index in hydrated:
+            return hydrated[index]
+        value = values[index]
+        if isinstance(value, dict):
+            result = hydrated[index] = {}
+            for key, child in value.items():
+                result[key] = hydrate(child)
+        elif isinstance(value, list) and value and isinstance(value[0], str):  # tagged value
+            tag = value[0]
+            if tag in PAYLOAD_WRAPPERS:
+                result = hydrate(value[1]) if len(value) > 1 else None
+            elif tag == "Date":
+                result = value[1] if len(value) > 1 else None
+            elif tag == "null":  # object without prototype: key, index, key, index, ...
+                result = {key: hydrate(child) for key, child in zip(value[1::2], value[2::2])}
+            elif tag == "Set":
+                result = [hydrate(child) for child in value[1:]]
+            else:
+                result = None
+            hydrated[index] = result
+        elif isinstance(value, list):
+            result = hydrated[index] = []
+            result.extend(hydrate(child) for child in value)
+        else:
+            result = value
+        return result
+
+    return hydrate(0)
+
+# Function to decode the payload found in a page ((kind, text) from TablePageParser, or _payload.json text)
+def decode_payload(kind, text):
+    try:
+        if kind == "nuxt2":
+            # window.__NUXT__=... is only readable if it is a JSON literal (not the usual minified function)
+            return json.loads(text.split("=", 1)[1].strip().rstrip(";"))
+        return unflatten_payload(json.loads(text))
+    except (ValueError, IndexError) as e:
+        logging.debug(f"Nuxt payload ({kind}) not readable: {e}")
+        return None
+
+# Helper: a payload date as the table shows it (dd.mm.yyyy, "" if missing or not a date)
+def _payload_date(value):
+    match = PAYLOAD_DATE.match(value) if isinstance(value, str) else None
+    if not match:
+        return ""
+    return match.group(1) or f"{match.group(4)}.{match.group(3)}.{match.group(2)}"
+
+# Helper: table cells [name, start, end] of a list of payload objects (None if it isn't the service list)
+def _list_rows(items, names):
+    if not items or not all(isinstance(item, dict) for item in items):
+        return None
+    keys = list(items[0])
+    # Name: the field holding the troop names of the HTML page, dates: the fields with only dates (or nothing)
+    name_key = next((key for key in keys
+                     if any(isinstance(item.get(key), str) and " ".join(item[key].split()) in names for item in items)), None)
+    date_keys = [key for key in keys
+                 if any(item.get(key) for item in items)
+                 and all(item.get(key) is None or _payload_date(item.get(key)) for item in items)]
+    if name_key is None or len(date_keys) < 2:
+        return None
+    start_key, end_key = date_keys[:2]  # in field order, like the table columns
+    return [[" ".join(str(item.get(name_key) or "").split()), _payload_date(item.get(start_key)),
+             _payload_date(item.get(end_key))] for item in items]
+
+# Function to find the service records in a decoded payload: the longest list of objects with the
+# troop names of the HTML page and two date fields
+def find_payload_rows(data, page_rows):
+    names = {row[0] for row in page_rows if row}
+    best, stack, seen = [], [data], set()
+    while stack:
+        node = stack.pop()
+        if not isinstance(node, (dict, list)) or id(node) in seen:
+            continue
+        seen.add(id(node))
+        if isinstance(node, dict):
+            stack.extend(node.values())
+            continue
+        rows = _list_rows(node, names)
+        if rows and len(rows) > len(best):
+            best = rows
+        stack.extend(node)
+    return best
+
+# Function to read all rows from the Nuxt payload of a language (None if there is none with all rows)
+def fetch_payload_rows(session, url, first_page, total_pages, timeout=15):
+    """
+    Nuxt embeds the page data as __NUXT_DATA__ (Nuxt 3) or window.__NUXT__ (Nuxt 2), and
+    prerendered pages also serve it as <url>/_payload.json. If that data contains every
+    row of the first HTML page and enough rows for all pages, it is used instead of
+    requesting the pages one by one. Otherwise (e.g. the payload only holds page 1) the
+    caller pages through the HTML.
+    """
+    candidates = []
+    if first_page.payload:
+        candidates.append(decode_payload(*first_page.payload))
+    try:
+        response = session.get(urljoin(url.rstrip("/") + "/", "_payload.json"), timeout=timeout)
+        if response.ok and response.text.lstrip().startswith("["):
+            candidates.append(decode_payload("nuxt3", response.text))
+    except requests.RequestException as e:
+        logging.debug(f"No _payload.json for {url}: {e}")
+
+    page_rows = {tuple(row) for row in first_page.rows}
+    for data in candidates:
+        rows = find_payload_rows(data, first_page.rows)
+        if page_rows <= {tuple(row) for row in rows} and len(rows) > (total_pages - 1) * len(first_page.rows):
+            return rows
+    return None
+
+#%%
+# Function to fetch the raw table rows of all pages of one language over plain HTTP
+def fetch_table_rows(url, max_pages=200, workers=4, timeout=15, page_param="page"):
+    """
+    Fetch the server-rendered table rows of all pages without a browser.
+
+    The first page tells us the total page count. If the Nuxt payload of the page (or its
+    _payload.json) holds all rows, they are taken from there. Otherwise the remaining pages
+    are requested concurrently over one keep-alive session; every page must report the
+    page number we asked for, otherwise the site ignores the page parameter and
+    HttpScrapeError is raised.
+
+    Args:
+        url (str): URL of the first results page
+        max_pages (int): Maximum pages to fetch
+        workers (int): Number of concurrent page requests
+        timeout (int): Timeout per request in seconds
+        page_param (str): Query parameter selecting the results page
+
+    Returns:
+        list: Raw cell texts per row (lists of strings), in page order
+    """
+    session = create_session(workers)
+    try:
+        first_page = fetch_page(session, url, 1, timeout=timeout, page_param=page_param)
+        if not first_page.rows:
+            raise HttpScrapeError(f"No table rows in server-rendered HTML of {url}")
+
+        page_numbers = parse_page_numbers(first_page.page_text)
+        if not page_numbers:
+            raise HttpScrapeError(f"Could not parse pagination text: '{first_page.page_text}'")
+        total_pages = min(max_pages, page_numbers[1])
+
+        payload_rows = fetch_payload_rows(session, url, first_page, page_numbers[1], timeout=timeout)
+        if payload_rows is not None:
+            logging.info(f"HTTP backend: {len(payload_rows)} rows of {url} from the Nuxt payload")
+            return payload_rows[:max_pages * len(first_page.rows)]  # same limit as max_pages pages
+        logging.info(f"HTTP backend: {url} has {page_numbers[1]} pages, fetching {total_pages}")
+
+        def fetch(page):
+            parsed = fetch_page(session, url, page, timeout=timeout, page_param=page_param)
+            numbers = parse_page_numbers(parsed.page_text)
+            if not numbers or numbers[0] != page:
+                raise HttpScrapeError(f"Requested page {page} but got '{parsed.page_text}' (page parameter not supported?)")
+            return parsed.rows
+
+        with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+            other_pages = list(executor.map(fetch, range(2, total_pages + 1)))  # map keeps page order
+
+        rows = list(first_page.rows)
+        for page_rows in other_pages:
+            rows.extend(page_rows)
+        return rows
+    except requests.RequestException as e:
+        raise HttpScrapeError(f"HTTP request failed for {url}: {e}") from e
+    finally:
+        session.close()
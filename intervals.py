@@ -0,0 +1,92 @@
+# intervals.py
+# Interval index over service dates for "fits in my free window" and exam-conflict queries
+import re
+import datetime
+import numpy as np
+
+# Convert a date / string / datetime64 (scalar or array) to integer days since the epoch
+def _days(value):
+    return np.asarray(value, dtype="datetime64[D]").astype(np.int64)
+
+# Merge overlapping or touching (start, end) windows into a sorted list of disjoint windows
+def merge_windows(windows):
+    merged = []
+    for start, end in sorted((_days(start).item(), _days(end).item()) for start, end in windows):
+        if end < start:
+            raise ValueError("Window ends before it starts")
+        if merged and start <= merged[-1][1] + 1:
+            merged[-1][1] = max(merged[-1][1], end)
+        else:
+            merged.append([start, end])
+    return [tuple(window) for window in merged]
+
+# Parse one window per line ("2025-06-02 - 2025-06-20" or "2025-06-02 2025-06-20")
+def parse_windows(text):
+    windows = []
+    for line in (text or "").splitlines():
+        line = line.strip()
+        if not line:
+            continue
+        match = re.fullmatch(r"(\d{4}-\d{2}-\d{2})\s*(?:-|–|to|bis)?\s*(\d{4}-\d{2}-\d{2})", line)
+        if not match:
+            raise ValueError(f"Could not read period '{line}' (expected YYYY-MM-DD - YYYY-MM-DD)")
+        start, end = (datetime.date.fromisoformat(group) for group in match.groups())
+        if end < start:
+            raise ValueError(f"Period '{line}' ends before it starts")
+        windows.append((start, end))
+    return windows
+
+class IntervalIndex:
+    """
+    Services sorted by start date, with the longest service duration as search bound.
+
+    A service [s, e] overlaps a window [a, b] iff s <= b and e >= a. Because e - s is at most
+    max_length, every such service starts in [a - max_length, b], which is one binary search
+    on the sorted starts. Queries cost O(log n + candidates) instead of a scan of all rows.
+    Services with a missing start or end date never match (their dates are not decided yet).
+    """
+
+    def __init__(self, starts, ends):
+        starts = np.asarray(starts, dtype="datetime64[D]")
+        ends = np.asarray(ends, dtype="datetime64[D]")
+        self.size = len(starts)
+
+        valid = ~(np.isnat(starts) | np.isnat(ends))
+        positions = np.flatnonzero(valid)
+        starts, ends = starts[valid].astype(np.int64), ends[valid].astype(np.int64)
+
+        order = np.argsort(starts, kind="stable")
+        self._positions = positions[order]  # row positions in the original frame
+        self._starts = starts[order]
+        self._ends = ends[order]
+        self._max_length = int((self._ends - self._starts).max()) if len(order) else 0
+
+    # Row positions of services that lie entirely inside [window_start, window_end]
+    def within(self, window_start, window_end):
+        start, end = _days(window_start), _days(window_end)
+        lo = np.searchsorted(self._starts, start, side="left")
+        hi = np.searchsorted(self._starts, end, side="right")
+        return self._positions[lo:hi][self._ends[lo:hi] <= end]
+
+    # Row positions of services that overlap [window_start, window_end]
+    def overlapping(self, window_start, window_end):
+        start, end = _days(window_start), _days(window_end)
+        lo = np.searchsorted(self._starts, start - self._max_length, side="left")
+        hi = np.searchsorted(self._starts, end, side="right")
+        return self._positions[lo:hi][self._ends[lo:hi] >= start]
+
+    # Row positions of services that overlap any of the windows
+    def conflicting(self, windows):
+        hits = [self.overlapping(start, end) for start, end in merge_windows(windows)]
+        return np.unique(np.concatenate(hits)) if hits else np.empty(0, dtype=np.int64)
+
+    # Boolean mask over all rows: services inside the free window and clear of all exclusion windows
+    def mask(self, free_window=None, exclusion_windows=()):
+        mask = np.zeros(self.size, dtype=bool)
+        if free_window is not None:
+            mask[self.within(*free_window)] = True
+        else:
+            mask[self._positions] = True
+        if exclusion_windows:
+            mask[self.conflicting(exclusion_windows)] = False
+        return mask
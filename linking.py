@@ -0,0 +1,97 @@
+#%%
+# Cross-language linking of the DE/FR/IT rows that describe the same service
+
+#%%
+import re
+import hashlib
+
+LANGUAGES = ("DE", "FR", "IT")
+NUMBER_PATTERN = re.compile(r"\d+")
+
+# Function to get the language-independent key of a name: its numbers ("Inf RS 14" / "ER inf 14" -> ("14",))
+def number_key(name):
+    return tuple(sorted(set(NUMBER_PATTERN.findall(name or ""))))
+
+# Function to build a stable event id from the dates and the name in the anchor language
+def event_id(start_date, end_date, language, name):
+    key = f"{start_date}|{end_date}|{language}|{name}"
+    return hashlib.sha1(key.encode("utf-8")).hexdigest()[:16]
+
+# Function to find the date groups whose rows differ from the linked rows (the only ones to relink)
+def changed_groups(data, linked_keys):
+    """
+    Args:
+        data (list): Scraped records (dicts with language, troopSchool, startDate, endDate)
+        linked_keys (set): (language, troopSchool, startDate, endDate) of the rows linked so far
+
+    Returns:
+        set: (startDate, endDate) of the groups with inserted or removed rows
+    """
+    keys = {(record["language"], record["troopSchool"], record["startDate"], record["endDate"]) for record in data}
+    return {(start_date, end_date) for _, _, start_date, end_date in keys ^ linked_keys}
+
+#%%
+# Function to group the scraped rows of all languages into events
+def link_events(data, groups=None):
+    """
+    Match the DE, FR and IT rows that describe the same service.
+
+    Rows are only linked if they have the same start and end date. Within such a group,
+    rows with the same numbers in their name are paired by their rank in their language's
+    table (all languages list the services in the same order); every event gets at most
+    one row per language, and rows without a partner become events of their own. Only
+    hash lookups are used, so linking is linear in the number of rows.
+
+    Args:
+        data (list): Scraped records in table order (dicts with language, troopSchool, startDate, endDate)
+        groups (set): Only link these (startDate, endDate) groups (default: all)
+
+    Returns:
+        list: Events as dicts with eventId, startDate, endDate and names ({language: troopSchool})
+    """
+    # Distinct names per date group and language, in table order
+    grouped = {}
+    seen = set()
+    for record in data:
+        key = (record["language"], record["troopSchool"], record["startDate"], record["endDate"])
+        if key in seen:
+            continue
+        seen.add(key)
+        dates = (record["startDate"], record["endDate"])
+        if groups is None or dates in groups:
+            grouped.setdefault(dates, {}).setdefault(record["language"], []).append(record["troopSchool"])
+
+    present = {language for language, _, _, _ in seen}
+    languages = [language for language in LANGUAGES if language in present]
+    languages += sorted(present - set(languages))
+
+    events = []
+    for (start_date, end_date), group in grouped.items():
+        buckets = {}  # number key -> events of the group in rank order
+        group_events = []
+        for language in languages:
+            taken = {}  # number key -> events of the bucket already paired with this language
+            new_events = []
+            for name in group.get(language, []):
+                key = number_key(name)
+                bucket = buckets.get(key, [])
+                index = taken.get(key, 0)
+                if index < len(bucket):
+                    bucket[index][language] = name
+                    taken[key] = index + 1
+                else:
+                    new_events.append({language: name})
+            for event in new_events:  # rows without a partner, open for the next languages
+                buckets.setdefault(number_key(next(iter(event.values()))), []).append(event)
+            group_events += new_events
+
+        for event in group_events:
+            anchor_language, anchor_name = next(iter(event.items()))
+            events.append({
+                "eventId": event_id(start_date, end_date, anchor_language, anchor_name),
+                "startDate": start_date,
+                "endDate": end_date,
+                "names": event,
+            })
+
+    return events
@@ -0,0 +1,222 @@
+#%%
+# Structured metrics: JSON lines per observation and a Prometheus text-format file for the node exporter
+
+#%%
+import os
+import re
+import json
+import time
+import uuid
+import atexit
+import socket
+import threading
+from contextlib import contextmanager
+
+# Directory of the metrics files (point the node exporter's --collector.textfile.directory here)
+METRICS_DIR = os.environ.get("METRICS_DIR", "logs")
+RUN_ID_ENV = "SCRAPER_RUN_ID"  # shared by run_scraper and its worker processes
+
+# Size at which a JSON lines file is rotated to <file>.1 (replacing the previous .1)
+MAX_JSONL_BYTES = int(os.environ.get("METRICS_MAX_BYTES", 10 * 1024 * 1024))
+
+# Seconds between two writes of a long-running process's .prom file
+PROMETHEUS_INTERVAL = 15
+
+# Function to start a new run id (inherited by worker processes through the environment)
+def start_run():
+    os.environ[RUN_ID_ENV] = uuid.uuid4().hex[:12]
+    return os.environ[RUN_ID_ENV]
+
+# Helper to render Prometheus labels ({key="value",...}, sorted for stable output)
+def _labels(labels):
+    if not labels:
+        return ""
+    escaped = (str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") for value in labels.values())
+    return "{" + ",".join(f'{key}="{value}"' for key, value in zip(labels, escaped)) + "}"
+
+# Helper: (inode, size) of a file, (None, 0) if it doesn't exist
+def _position(path):
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None, 0
+    return stat.st_ino, stat.st_size
+
+# Helper: whether a process id is running on this host
+def _pid_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass  # exists, owned by another user
+    return True
+
+class MetricsRecorder:
+    """
+    Record observations of one component ("scraper", "app").
+
+    Every observation is appended to <component>_metrics.jsonl right away (one line each,
+    so worker processes can write to the same file) and added to in-process aggregates.
+    The file is rotated to .1 once it is larger than max_bytes. write_prometheus() writes
+    the aggregates as sum/count summaries (counters for names ending in _total) to
+    <component>.prom, via a temp file so the exporter never reads half a file.
+
+    With per_process=True (app replicas), every process writes its own
+    <component>_<host>-<pid>.prom with a process label, so replicas don't overwrite each
+    other; the file is removed when the process exits.
+    """
+
+    def __init__(self, component, metrics_dir=None, max_bytes=MAX_JSONL_BYTES, per_process=False):
+        self.component = component
+        self.metrics_dir = metrics_dir or METRICS_DIR
+        self.max_bytes = max_bytes
+        self.jsonl_path = os.path.join(self.metrics_dir, f"{component}_metrics.jsonl")
+        self.process = f"{socket.gethostname()}-{os.getpid()}" if per_process else None
+        self.prom_path = os.path.join(self.metrics_dir, f"{component}_{self.process}.prom" if per_process
+                                      else f"{component}.prom")
+        self._aggregates = {}  # (name, labels tuple) -> [sum, count]
+        self._run_start = None  # (inode, size) of the JSON lines file when the run started
+        self._writer = None
+        self._lock = threading.Lock()
+
+    def observe(self, name, value, **labels):
+        line = {"ts": round(time.time(), 3), "component": self.component, "run": os.environ.get(RUN_ID_ENV),
+                "metric": name, "value": value, "labels": labels}
+        with self._lock:
+            self._add(name, labels, value)
+            try:
+                os.makedirs(self.metrics_dir, exist_ok=True)
+                with open(self.jsonl_path, "a", encoding="utf-8") as f:
+                    f.write(json.dumps(line, ensure_ascii=False) + "\n")
+                    size = f.tell()
+                if size > self.max_bytes:
+                    os.replace(self.jsonl_path, self.jsonl_path + ".1")
+            except OSError:
+                pass  # metrics must never break a scrape or a page view
+
+    # Count one event (e.g. a retry)
+    def increment(self, name, amount=1, **labels):
+        self.observe(name, amount, **labels)
+
+    # Time a block in seconds
+    @contextmanager
+    def timer(self, name, **labels):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, round(time.perf_counter() - started, 6), **labels)
+
+    def _add(self, name, labels, value):
+        entry = self._aggregates.setdefault((name, tuple(sorted(labels.items()))), [0.0, 0])
+        entry[0] += value
+        entry[1] += 1
+
+    # Start a new run (see start_run) and remember where its lines begin in the JSON lines file
+    def begin_run(self):
+        run_id = start_run()
+        with self._lock:
+            try:
+                os.makedirs(self.metrics_dir, exist_ok=True)
+                open(self.jsonl_path, "a").close()  # exists from here on, so a rotation is detected by its inode
+            except OSError:
+                pass
+            self._run_start = _position(self.jsonl_path)
+        return run_id
+
+    # Replace the aggregates with all observations of a run (including those of worker processes)
+    def collect_run(self, run_id=None):
+        """
+        Only the lines written since begin_run() are read (from the start of .1 too if the
+        file was rotated during the run), not the whole history of the file.
+        """
+        run_id = run_id or os.environ.get(RUN_ID_ENV)
+        with self._lock:
+            self._aggregates = {}
+            inode, offset = self._run_start or (None, 0)
+            if inode is not None and _position(self.jsonl_path)[0] != inode:
+                sources = [(self.jsonl_path + ".1", offset), (self.jsonl_path, 0)]  # rotated during the run
+            else:
+                sources = [(self.jsonl_path, offset)]
+            for path, start in sources:
+                if not os.path.exists(path):
+                    continue
+                with open(path, "rb") as f:
+                    f.seek(start)
+                    for line in f:
+                        try:
+                            record = json.loads(line)
+                        except ValueError:
+                            continue  # line cut off by a crash
+                        if record.get("run") == run_id:
+                            self._add(record["metric"], record["labels"], record["value"])
+
+    def write_prometheus(self):
+        with self._lock:
+            aggregates = sorted(self._aggregates.items())
+        lines, typed = [], set()
+        for (name, labels), (total, count) in aggregates:
+            labels = dict(labels, process=self.process) if self.process else dict(labels)
+            if name.endswith("_total"):
+                if name not in typed:
+                    lines.append(f"# TYPE {name} counter")
+                    typed.add(name)
+                lines.append(f"{name}{_labels(labels)} {total:g}")
+            else:
+                if name not in typed:
+                    lines.append(f"# TYPE {name} summary")
+                    typed.add(name)
+                lines.append(f"{name}_sum{_labels(labels)} {total:g}")
+                lines.append(f"{name}_count{_labels(labels)} {count}")
+        lines.append(f"# TYPE {self.component}_metrics_written_timestamp_seconds gauge")
+        process_label = _labels({"process": self.process} if self.process else None)
+        lines.append(f"{self.component}_metrics_written_timestamp_seconds{process_label} {time.time():.0f}")
+
+        os.makedirs(self.metrics_dir, exist_ok=True)
+        tmp_path = self.prom_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write("\n".join(lines) + "\n")
+        os.replace(tmp_path, self.prom_path)
+        return self.prom_path
+
+    # Write the .prom file every `interval` seconds in a background thread (once per recorder)
+    def start_prometheus_writer(self, interval=PROMETHEUS_INTERVAL):
+        with self._lock:
+            if self._writer is not None:
+                return
+            self._writer = threading.Thread(target=self._write_periodically, args=(interval,), daemon=True,
+                                            name=f"{self.component}-metrics")
+        if self.process:
+            self._remove_stale_files()
+            atexit.register(self._remove_prometheus)
+        self._writer.start()
+
+    def _write_periodically(self, interval):
+        while True:
+            try:
+                self.write_prometheus()
+            except OSError:
+                pass  # metrics must never break the app
+            time.sleep(interval)
+
+    def _remove_prometheus(self):
+        try:
+            os.remove(self.prom_path)
+        except OSError:
+            pass
+
+    # Remove the per-process files of processes on this host that are gone
+    def _remove_stale_files(self):
+        pattern = re.compile(rf"^{re.escape(self.component)}_{re.escape(socket.gethostname())}-(\d+)\.prom$")
+        try:
+            names = os.listdir(self.metrics_dir)
+        except OSError:
+            return
+        for name in names:
+            match = pattern.match(name)
+            if match and not _pid_alive(int(match.group(1))):
+                try:
+                    os.remove(os.path.join(self.metrics_dir, name))
+                except OSError:
+                    pass
@@ -0,0 +1,176 @@
+#%%
+# Page navigation for the paginated armee.ch table (event-driven waits, direct page jumps)
+
+#%%
+import logging
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support.ui import WebDriverWait
+from selenium.webdriver.support import expected_conditions as EC
+from http_scraper import parse_page_numbers
+
+PAGINATION_SELECTOR = "div.my-5.flex.items-center.justify-center"
+NEXT_BUTTON_XPATH = '//*[@id="__nuxt"]/div[2]/div[2]/div[5]/div[2]/div/div/div[2]/button[2]'
+
+# JavaScript that finds the next button with one of the known strategies
+FIND_NEXT_BUTTON_JS = """
+function findNextButton(strategy) {
+    const pagination = "%(pagination)s";
+    if (!strategy || strategy === "xpath") {
+        const node = document.evaluate('%(xpath)s', document, null,
+                                       XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue;
+        if (node) return [node, "xpath"];
+    }
+    if (!strategy || strategy === "css") {
+        const buttons = document.querySelectorAll(pagination + " button");
+        if (buttons.length >= 2) return [buttons[1], "css"];
+    }
+    if (!strategy || strategy === "enabled") {
+        const buttons = document.querySelectorAll(pagination + " button:not([disabled])");
+        if (buttons.length) return [buttons[buttons.length - 1], "enabled"];
+    }
+    return [null, null];
+}
+""" % {"pagination": PAGINATION_SELECTOR, "xpath": NEXT_BUTTON_XPATH}
+
+# Resolve the next button strategy once (returns "xpath", "css", "enabled" or null)
+RESOLVE_SCRIPT = FIND_NEXT_BUTTON_JS + "return findNextButton(null)[1];"
+
+# Click next and resolve as soon as the table body content changes (MutationObserver, no polling)
+NEXT_PAGE_SCRIPT = FIND_NEXT_BUTTON_JS + """
+const strategy = arguments[0], timeoutMs = arguments[1], done = arguments[arguments.length - 1];
+const [button] = findNextButton(strategy);
+if (!button) { done("missing"); return; }
+if (button.disabled || (button.className || "").includes("cursor-not-allowed")) { done("disabled"); return; }
+
+const table = document.querySelector("table");
+const signature = () => { const body = document.querySelector("table tbody"); return body ? body.innerText : ""; };
+const before = signature();
+let timer = null;
+const observer = new MutationObserver(() => {
+    if (signature() !== before) { observer.disconnect(); clearTimeout(timer); done("changed"); }
+});
+observer.observe(table || document.body, {childList: true, subtree: true, characterData: true});
+timer = setTimeout(() => { observer.disconnect(); done(signature() !== before ? "changed" : "timeout"); }, timeoutMs);
+button.click();
+"""
+
+# Function to add or replace query parameters of a URL
+def with_query(url, **params):
+    parts = urlsplit(url)
+    query = [(key, value) for key, value in parse_qsl(parts.query) if key not in params]
+    query += [(key, str(value)) for key, value in params.items() if value is not None]
+    return urlunsplit(parts._replace(query=urlencode(query)))
+
+#%%
+class Paginator:
+    """
+    Navigation over the result pages of one language in one driver.
+
+    The next button strategy is resolved once per run. Each step clicks and waits for the
+    table body to change in a single async script, so the wait ends when the site has
+    rendered instead of on a polling tick, and a lagging page label doesn't stall it.
+    The paginator counts pages itself. If the site honours a page (or page size) query
+    parameter, goto() loads the target page directly instead of clicking through.
+    """
+
+    def __init__(self, driver, url, timeout=15, page_param="page", page_size=None, page_size_param="pageSize",
+                 fallback=None):
+        self.driver = driver
+        self.url = url
+        self.timeout = timeout
+        self.page_param = page_param
+        self.page_size = page_size
+        self.page_size_param = page_size_param
+        self.page = 1
+        self.strategy = None
+        self.supports_jumps = None  # unknown until the first jump
+        self.retries = 0  # re-resolved strategies and fallback navigations (for the metrics)
+        self.fallback = fallback  # fallback(driver) -> bool, e.g. the polling click_next_button
+
+    # URL of a given page (page size parameter only if configured)
+    def url_for(self, page=1):
+        params = {self.page_size_param: self.page_size} if self.page_size else {}
+        if page > 1:
+            params[self.page_param] = page
+        return with_query(self.url, **params) if params else self.url
+
+    # Load the first page
+    def open(self):
+        self.driver.get(self.url_for(1))
+        self.page = 1
+
+    # Resolve which next-button strategy works on this site (once per run)
+    def resolve(self):
+        self.strategy = self.driver.execute_script(RESOLVE_SCRIPT)
+        logging.info(f"Pagination controls resolved with strategy: {self.strategy}")
+        return self.strategy
+
+    # Current and total page from the pagination label (None if it can't be parsed)
+    def read_label(self):
+        return parse_page_numbers(self.driver.find_element(By.CSS_SELECTOR, PAGINATION_SELECTOR + " span").text)
+
+    # Go to the next page; returns True once the table shows the new page
+    def next_page(self):
+        if self.strategy is None and not self.resolve():
+            logging.warning("Could not find next button with any method.")
+            return False
+
+        try:
+            self.driver.set_script_timeout(self.timeout + 5)
+            result = self.driver.execute_async_script(NEXT_PAGE_SCRIPT, self.strategy, int(self.timeout * 1000))
+            if result == "missing":
+                # The page was re-rendered differently: resolve again once
+                self.retries += 1
+                if self.resolve():
+                    result = self.driver.execute_async_script(NEXT_PAGE_SCRIPT, self.strategy, int(self.timeout * 1000))
+        except Exception as e:
+            if not self.fallback:
+                raise
+            logging.warning(f"Async navigation script failed, using fallback navigation: {e}")
+            self.retries += 1
+            result = "changed" if self.fallback(self.driver) else "fallback failed"
+
+        if result == "changed":
+            self.page += 1
+            return True
+        if result == "disabled":
+            logging.info("Next button is disabled or not clickable.")
+        else:
+            logging.error(f"Table did not change after clicking next ({result})")
+        return False
+
+    # Load a page directly through the page parameter (checks the label to confirm)
+    def jump_to(self, page):
+        self.driver.get(self.url_for(page))
+        WebDriverWait(self.driver, self.timeout).until(
+            EC.presence_of_element_located((By.CSS_SELECTOR, "table tbody tr"))
+        )
+        WebDriverWait(self.driver, self.timeout).until(
+            EC.presence_of_element_located((By.CSS_SELECTOR, PAGINATION_SELECTOR + " span"))
+        )
+        numbers = self.read_label()
+        self.supports_jumps = bool(numbers and numbers[0] == page)
+        self.page = numbers[0] if numbers else 1
+        return self.supports_jumps
+
+    # Go to a page: direct jump when supported, else click through from the current page
+    def goto(self, page):
+        if page == self.page:
+            return True
+        if self.supports_jumps is not False and page > 1:
+            try:
+                if self.jump_to(page):
+                    logging.info(f"Jumped directly to page {page}")
+                    return True
+                logging.info("Page parameter not supported - clicking through instead")
+            except Exception as e:
+                self.supports_jumps = False
+                logging.info(f"Direct page jump failed, clicking through instead: {e}")
+                self.open()
+        if page < self.page:
+            self.open()
+        while self.page < page:
+            if not self.next_page():
+                return False
+        return True
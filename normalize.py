@@ -0,0 +1,88 @@
+#%%
+# Batch normalization of the raw scraped cells (vectorized date parsing, cleanup, NULL handling, dedup, quarantine)
+
+#%%
+import logging
+import pandas as pd
+
+COLUMNS = ["language", "troopSchool", "startDate", "endDate"]
+SOURCE_DATE_FORMAT = "%d.%m.%Y"
+
+# Cell texts that mean "date not decided yet" (stored as NULL)
+NULL_DATE_VALUES = ["", "-", "–", "—", "?", "n/a", "offen", "ouvert", "aperto", "tbd"]
+
+# Invisible and special whitespace characters in the site's cell texts (non-breaking/zero-width spaces, BOM)
+SPECIAL_WHITESPACE = r"[\u00a0\u2000-\u200b\u202f\u3000\ufeff]"
+
+# Helper to clean a column of cell texts: Unicode NFC, special whitespace to spaces, collapsed and stripped
+def clean_text(series):
+    return (series.astype("string")
+            .str.normalize("NFC")
+            .str.replace(SPECIAL_WHITESPACE, " ", regex=True)
+            .str.replace(r"\s+", " ", regex=True)
+            .str.strip())
+
+# Helper to parse a column of dd.mm.yyyy texts; returns the dates (NaT for NULL) and a mask of unparseable cells
+def parse_dates(series):
+    text = clean_text(series)
+    is_null = text.isna() | text.str.lower().isin(NULL_DATE_VALUES)
+    dates = pd.to_datetime(text.where(~is_null), format=SOURCE_DATE_FORMAT, errors="coerce")
+    return dates, dates.isna() & ~is_null
+
+#%%
+# Function to normalize a batch of raw records into clean records and quarantined rows
+def normalize_records(raw_records):
+    """
+    Clean the raw cell strings of a whole scrape at once.
+
+    Troop names are Unicode- and whitespace-normalized, dates are parsed from dd.mm.yyyy
+    to YYYY-MM-DD, and cells without a decided date become NULL. A row is quarantined (with
+    its reasons) if it doesn't have 3 cells, has no name, has a date that can't be parsed,
+    or ends before it starts; the other rows are kept. Duplicates are dropped, keeping the
+    first occurrence, so the table order of every language is preserved.
+
+    Args:
+        raw_records (iterable): Dicts with language, troopSchool, startDate, endDate (raw cell texts)
+            and optionally cellCount (number of cells of the table row, if not 3)
+
+    Returns:
+        tuple: (records, quarantined) - lists of dicts; quarantined rows keep the raw texts plus a reason
+    """
+    raw = pd.DataFrame(list(raw_records), columns=COLUMNS + ["cellCount"])
+    if raw.empty:
+        return [], []
+
+    troops = clean_text(raw["troopSchool"])
+    start_dates, bad_start = parse_dates(raw["startDate"])
+    end_dates, bad_end = parse_dates(raw["endDate"])
+    cell_counts = pd.to_numeric(raw["cellCount"]).fillna(3).astype(int)
+
+    # Reasons per row (several can apply, joined with "; ")
+    checks = [
+        (cell_counts != 3, "expected 3 cells, got " + cell_counts.astype(str)),
+        (troops.isna() | (troops == ""), "missing troopSchool"),
+        (bad_start, "invalid startDate"),
+        (bad_end, "invalid endDate"),
+        ((end_dates < start_dates).fillna(False), "endDate before startDate"),
+    ]
+    reasons = pd.Series("", index=raw.index)
+    for failed, reason in checks:
+        failed = failed.to_numpy(dtype=bool)
+        reasons[failed] = reasons[failed] + "; " + (reason[failed] if isinstance(reason, pd.Series) else reason)
+    reasons = reasons.str.removeprefix("; ")
+    rejected = reasons != ""
+
+    clean = pd.DataFrame({
+        "language": raw["language"],
+        "troopSchool": troops,
+        "startDate": start_dates.dt.strftime("%Y-%m-%d"),
+        "endDate": end_dates.dt.strftime("%Y-%m-%d"),
+    })[~rejected].drop_duplicates()
+    clean = clean.astype(object).where(clean.notna(), None)  # NaN/NA -> None (NULL)
+
+    quarantined = raw.loc[rejected, COLUMNS].assign(reason=reasons[rejected])
+    quarantined = quarantined.astype(object).where(quarantined.notna(), None)
+
+    if rejected.any():
+        logging.warning(f"Quarantined {int(rejected.sum())} of {len(raw)} scraped rows")
+    return clean.to_dict("records"), quarantined.to_dict("records")
@@ -0,0 +1,128 @@
+# queries.py
+# Parameterized SQL for the app filters (language, date range, troops)
+import re
+import pandas as pd
+
+# Tables that can be queried (table names can't be bound as parameters)
+TABLES = ("activeServiceDates", "serviceDates")
+
+COLUMNS = ["language", "troopSchool", "startDate", "endDate", "scrapeDate"]
+
+# Helper to check a table name before formatting it into SQL
+def _table(table):
+    if table not in TABLES:
+        raise ValueError(f"Unknown table: {table}")
+    return table
+
+# Build one parameterized query for the sidebar selections
+def build_filter_query(language, date_start=None, date_end=None, troops=None,
+                       table="activeServiceDates", columns=COLUMNS):
+    """
+    Turn the filter selections into SQL and parameters.
+
+    Dates are stored as 'YYYY-MM-DD' text, so string comparison is date comparison.
+    troops=None means no troop filter, an empty list matches nothing.
+    """
+    sql = f"SELECT {', '.join(columns)} FROM {_table(table)} WHERE language = ?"
+    params = [language]
+
+    if date_start is not None:
+        sql += " AND startDate >= ?"
+        params.append(str(date_start))
+
+    if date_end is not None:
+        sql += " AND endDate <= ?"
+        params.append(str(date_end))
+
+    if troops is not None:
+        troops = list(troops)
+        if troops:
+            sql += f" AND troopSchool IN ({', '.join('?' for _ in troops)})"
+            params.extend(troops)
+        else:
+            sql += " AND 0"
+
+    sql += " ORDER BY startDate, endDate, troopSchool"
+    return sql, params
+
+# Run the filter query and return a DataFrame
+def query_service_dates(conn, language, date_start=None, date_end=None, troops=None,
+                        table="activeServiceDates"):
+    sql, params = build_filter_query(language, date_start, date_end, troops, table=table)
+    return pd.read_sql(sql, conn, params=params)
+
+# Distinct languages in a table
+def query_languages(conn, table="activeServiceDates"):
+    return [row[0] for row in conn.execute(f"SELECT DISTINCT language FROM {_table(table)} ORDER BY language")]
+
+# Sorted distinct troops/schools of one language
+def query_troops(conn, language, table="activeServiceDates"):
+    return [row[0] for row in conn.execute(
+        f"SELECT DISTINCT troopSchool FROM {_table(table)} WHERE language = ? ORDER BY troopSchool", (language,)
+    )]
+
+# Turn free text into an FTS5 query: every word must match as a token prefix
+def build_fts_query(text):
+    tokens = re.findall(r"\w+", text or "")
+    return " ".join(f'"{token}"*' for token in tokens)
+
+# Troops/schools of one language matching the search text (via the troopSearch FTS5 index)
+def search_troops(conn, language, text, limit=None):
+    fts_query = build_fts_query(text)
+    if not fts_query:
+        return []
+    sql = "SELECT troopSchool FROM troopSearch WHERE troopSearch MATCH ? AND language = ? ORDER BY rank"
+    params = [fts_query, language]
+    if limit:
+        sql += " LIMIT ?"
+        params.append(limit)
+    return [row[0] for row in conn.execute(sql, params)]
+
+# Columns of the history queries (serviceDateHistory joined with serviceDates)
+HISTORY_COLUMNS = ["language", "troopSchool", "startDate", "endDate", "validFrom", "validTo"]
+
+# Helper for the optional language condition of the history queries
+def _language_filter(language, params):
+    if language is None:
+        return ""
+    params.append(language)
+    return " AND sd.language = ?"
+
+# Records that were on the website on a given date (as-of query over the validity intervals)
+def query_as_of(conn, as_of, language=None):
+    """
+    Intervals are [validFrom, validTo) by scrape date, so a record counts as published on
+    as_of if it was first seen on or before that date and not yet gone by then.
+    """
+    params = [str(as_of), str(as_of)]
+    sql = f"""
+    SELECT {', '.join(HISTORY_COLUMNS)} FROM serviceDateHistory h
+    JOIN serviceDates sd ON sd.id = h.serviceId
+    WHERE h.validFrom <= ? AND (h.validTo IS NULL OR h.validTo > ?)
+    """ + _language_filter(language, params) + " ORDER BY sd.language, sd.startDate, sd.endDate, sd.troopSchool"
+    return pd.read_sql(sql, conn, params=params)
+
+# Records that appeared or disappeared between two dates (inclusive), one row per change
+def query_changes(conn, date_start, date_end, language=None):
+    params = [str(date_start), str(date_end)]
+    appeared = f"""
+    SELECT h.validFrom AS changeDate, 'added' AS change, {', '.join('sd.' + c for c in HISTORY_COLUMNS[:4])}
+    FROM serviceDateHistory h JOIN serviceDates sd ON sd.id = h.serviceId
+    WHERE h.validFrom BETWEEN ? AND ?""" + _language_filter(language, params)
+    params += [str(date_start), str(date_end)]
+    disappeared = f"""
+    SELECT h.validTo AS changeDate, 'removed' AS change, {', '.join('sd.' + c for c in HISTORY_COLUMNS[:4])}
+    FROM serviceDateHistory h JOIN serviceDates sd ON sd.id = h.serviceId
+    WHERE h.validTo BETWEEN ? AND ?""" + _language_filter(language, params)
+    sql = f"{appeared} UNION ALL {disappeared} ORDER BY changeDate, language, troopSchool"
+    return pd.read_sql(sql, conn, params=params)
+
+# All validity intervals of the records of one troop/school (when it was published, with which dates)
+def query_troop_history(conn, language, troop_school):
+    sql = f"""
+    SELECT {', '.join(HISTORY_COLUMNS)} FROM serviceDateHistory h
+    JOIN serviceDates sd ON sd.id = h.serviceId
+    WHERE sd.language = ? AND sd.troopSchool = ?
+    ORDER BY h.validFrom, sd.startDate
+    """
+    return pd.read_sql(sql, conn, params=[language, troop_school])
@@ -0,0 +1,110 @@
+# result_cache.py
+# Process-wide LRU of filter results, shared by all app sessions and bounded by memory
+import sys
+import datetime
+import threading
+from collections import OrderedDict
+import numpy as np
+
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+
+# Helper to turn a date-like value into an ISO string (None stays None)
+def _date_key(value):
+    if value is None:
+        return None
+    if isinstance(value, (datetime.date, np.datetime64)):
+        return str(np.datetime64(value, "D"))
+    return str(value)
+
+# Build the cache key of a filter selection (same selection -> same key, whatever the input order)
+def normalize_key(version, language, date_start=None, date_end=None, troops=None, free_window=None,
+                  exclusion_windows=()):
+    """
+    troops=None (no troop filter) stays distinct from an empty selection. The availability
+    windows are part of the key because they change the result as well.
+    """
+    troop_key = None if troops is None else tuple(sorted(set(troops)))
+    window_key = tuple(_date_key(value) for value in free_window) if free_window else None
+    exclusion_key = tuple(sorted((_date_key(start), _date_key(end)) for start, end in exclusion_windows))
+    return (version, language, _date_key(date_start), _date_key(date_end), troop_key, window_key, exclusion_key)
+
+# Fixed per-object overhead of a numpy array (its header; sys.getsizeof of an array that owns its
+# data would count the buffer again)
+ARRAY_OVERHEAD = sys.getsizeof(np.empty(0))
+
+# Helper to estimate the memory of a cached value (numpy arrays by their buffer plus the header)
+def _size_of(value):
+    if isinstance(value, np.ndarray):
+        return value.nbytes + ARRAY_OVERHEAD
+    return sys.getsizeof(value)
+
+# Estimate the memory a troop selection takes in a cache key (the tuple and its strings; 0 for no filter)
+def troops_size(troops):
+    if troops is None:
+        return 0
+    troops = set(troops)
+    return sys.getsizeof(tuple(troops)) + sum(sys.getsizeof(troop) for troop in troops)
+
+class ResultCache:
+    """
+    LRU memo of filter results keyed on normalize_key(), evicted by total size.
+
+    Results of a data version that is no longer current simply age out. Cached numpy
+    arrays are made read-only, so a caller can't change what other sessions get.
+    """
+
+    def __init__(self, max_bytes=DEFAULT_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()  # key -> (value, size)
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    # Cached value of the key, else compute() and cache it; returns (value, hit)
+    # key_bytes: memory of the key's contents beyond the tuple itself, e.g. troops_size() of the selection
+    def get_or_compute(self, key, compute, key_bytes=0):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[0], True
+            self.misses += 1
+
+        # Compute outside the lock (two sessions may compute the same key once each)
+        value = compute()
+        if isinstance(value, np.ndarray):
+            value.flags.writeable = False
+        size = _size_of(value) + sys.getsizeof(key) + key_bytes
+        if size > self.max_bytes:
+            return value, False  # never cache something that would evict everything
+
+        with self._lock:
+            if key not in self._entries:
+                self._entries[key] = (value, size)
+                self._bytes += size
+            while self._bytes > self.max_bytes:
+                _, (_, evicted_size) = self._entries.popitem(last=False)
+                self._bytes -= evicted_size
+                self.evictions += 1
+        return value, False
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": self.hits / lookups if lookups else None,
+            }
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
@@ -3,12 +3,25 @@
 
 #%%
 import pandas as pd
-import re
 import datetime
 import sqlite3
 import json
 import logging
 import os
+import time
+import hashlib
+import tempfile
+import subprocess
+import urllib.request
+import dataset
+import exports
+import http_scraper
+import linking
+import normalize
+import metrics
+from checkpoint import ScrapeCheckpoint
+from navigation import Paginator
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from selenium import webdriver
 from selenium.webdriver.common.by import By
 from selenium.webdriver.chrome.options import Options
@@ -24,63 +37,174 @@ logging.basicConfig(
     filemode="a"  # Append to the log file
 )
 
+# Structured per-phase metrics (logs/scraper_metrics.jsonl and logs/scraper.prom)
+scrape_metrics = metrics.MetricsRecorder("scraper")
+
 # Today's date for scrapeDate field and JSON filename
 today_date = datetime.date.today().strftime('%Y-%m-%d')
 
+# SQLite database (scraped data, history and the staged pages of a running scrape)
+DB_PATH = "data/service_dates.db"
+
+# Languages and URL paths to scrape (relative to the base URL)
+BASE_URL = "https://www.armee.ch"
+URL_PATHS = {
+    "DE": "/de/aufgebotsdaten",
+    "FR": "/fr/dates-de-convocation",
+    "IT": "/it/date-di-chiamata-in-servizio"
+}
+
+CHROMIUM_BINARY = "/usr/bin/chromium"
+
+# Requests the scraper never needs (CDP Network.setBlockedURLs wildcard patterns): images, fonts, CSS, media
+# and analytics/third-party hosts. The table, the pagination and its JavaScript still load.
+BLOCKED_URL_PATTERNS = [
+    "*.png", "*.jpg", "*.jpeg", "*.gif", "*.webp", "*.avif", "*.svg", "*.ico",
+    "*.woff", "*.woff2", "*.ttf", "*.otf", "*.eot",
+    "*.css", "*.mp4", "*.webm", "*.mp3",
+    "*google-analytics.com*", "*googletagmanager.com*", "*doubleclick.net*", "*google.com/recaptcha*",
+    "*youtube.com*", "*ytimg.com*", "*facebook.net*", "*facebook.com*", "*hotjar.com*",
+    "*matomo*", "*piwik*", "*siteimprove*", "*usercentrics*", "*cookiebot*",
+]
+
+# Address of the kept-alive browser that scheduled runs attach to (run_scraper(keep_browser_alive=True))
+KEEPALIVE_ADDRESS = "127.0.0.1:9222"
+KEEPALIVE_PROFILE = os.path.join(tempfile.gettempdir(), "service-dates-chromium")
+
 #%%
+# Function to block non-essential requests in the current tab (CDP settings apply per tab)
+def block_driver_resources(driver, patterns=BLOCKED_URL_PATTERNS):
+    try:
+        driver.execute_cdp_cmd("Network.enable", {})
+        driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": list(patterns)})
+    except Exception as e:
+        logging.warning(f"Could not enable resource blocking: {e}")
+
 # Function to initialize WebDriver
-def initialize_driver(headless=True):
+def initialize_driver(headless=True, block_resources=True, debugger_address=None, single_process=True):
+    """
+    Args:
+        headless (bool): Run browser in headless mode
+        block_resources (bool): Block images, fonts, CSS and analytics through CDP
+        debugger_address (str): Attach to an already running browser ("host:port") instead of starting one
+        single_process (bool): Start Chromium with --single-process (one language per browser);
+            a browser shared by several tabs needs its renderer processes
+    """
     chrome_options = Options()
-    if headless:
-        chrome_options.add_argument("--headless")
-    
-    # Working options from successful test (but keep JavaScript enabled)
-    chrome_options.add_argument("--no-sandbox")
-    chrome_options.add_argument("--disable-dev-shm-usage")
-    chrome_options.add_argument("--disable-gpu")
-    chrome_options.add_argument("--allow-running-insecure-content")
-    chrome_options.add_argument("--disable-web-security")
-    chrome_options.add_argument("--disable-extensions")
-    chrome_options.add_argument("--disable-plugins")
-    chrome_options.add_argument("--disable-images")  # Keep this - images aren't needed for scraping
-    chrome_options.add_argument("--single-process")
-    chrome_options.add_argument("--no-zygote")
-        
-    # Don't specify user-data-dir - let Chrome handle it
-    chrome_options.binary_location = "/usr/bin/chromium"
-    
+    if debugger_address:
+        chrome_options.debugger_address = debugger_address
+    else:
+        if headless:
+            chrome_options.add_argument("--headless")
+
+        # Working options from successful test (but keep JavaScript enabled)
+        chrome_options.add_argument("--no-sandbox")
+        chrome_options.add_argument("--disable-dev-shm-usage")
+        chrome_options.add_argument("--disable-gpu")
+        chrome_options.add_argument("--allow-running-insecure-content")
+        chrome_options.add_argument("--disable-web-security")
+        chrome_options.add_argument("--disable-extensions")
+        chrome_options.add_argument("--disable-plugins")
+        chrome_options.add_argument("--blink-settings=imagesEnabled=false")  # --disable-images is ignored by current Chromium
+        if single_process:
+            chrome_options.add_argument("--single-process")
+        chrome_options.add_argument("--no-zygote")
+
+        # Don't specify user-data-dir - let Chrome handle it
+        chrome_options.binary_location = CHROMIUM_BINARY
+
     driver = webdriver.Chrome(options=chrome_options)
+    if block_resources:
+        block_driver_resources(driver)
     return driver
 
-# Function to scrape data from the current page
-def scrape_data(driver, language):
-    # Extract all table rows on the current page
-    table_rows = driver.find_elements(By.CSS_SELECTOR, "table tbody tr")
+# Function to open a new tab in a shared driver (with resource blocking, which is set per tab)
+def open_tab(driver, block_resources=True):
+    driver.switch_to.new_window("tab")
+    if block_resources:
+        block_driver_resources(driver)
 
-    # Initialize lists to store the extracted data
-    troop_school = []
-    start_date = []
-    end_date = []
+# Function to close the current tab of a shared driver and switch back to the first one
+def close_tab(driver):
+    try:
+        driver.close()
+        driver.switch_to.window(driver.window_handles[0])
+    except Exception as e:
+        logging.warning(f"Could not close browser tab: {e}")
 
-    # Collect data from each row
-    for row in table_rows:
-        columns = row.find_elements(By.TAG_NAME, "td")
-        
-        if len(columns) == 3:  # Make sure the row has 3 columns
-            troop_school.append(columns[0].text.strip())  # First column: Troop/School
+# Function to start the kept-alive browser unless it is already running (returns its debugger address)
+def ensure_browser(address=KEEPALIVE_ADDRESS, headless=True, startup_timeout=15):
+    """
+    The browser runs detached from the scraper process with remote debugging on localhost,
+    so later scheduled runs attach to it with initialize_driver(debugger_address=...) and
+    skip the browser startup. It keeps its memory between runs; stop it to release it.
+    """
+    version_url = f"http://{address}/json/version"
+    try:
+        urllib.request.urlopen(version_url, timeout=2).close()
+        return address
+    except OSError:
+        pass
 
-            start_date_raw = columns[1].text.strip()  # Second column: Start date
-            start_date.append(datetime.datetime.strptime(start_date_raw, "%d.%m.%Y").strftime("%Y-%m-%d"))
+    port = address.rsplit(":", 1)[1]
+    args = [CHROMIUM_BINARY, f"--remote-debugging-port={port}", f"--user-data-dir={KEEPALIVE_PROFILE}",
+            "--no-sandbox", "--disable-dev-shm-usage", "--disable-gpu", "--disable-extensions",
+            "--blink-settings=imagesEnabled=false", "about:blank"]
+    if headless:
+        args.insert(1, "--headless")
+    subprocess.Popen(args, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, start_new_session=True)
+    logging.info(f"Started kept-alive browser on {address}")
 
-            end_date_raw = columns[2].text.strip()  # Third column: End date
-            end_date.append(datetime.datetime.strptime(end_date_raw, "%d.%m.%Y").strftime("%Y-%m-%d"))
-        
-        else:
-            logging.warning("Row does not have 3 columns.")
+    deadline = time.monotonic() + startup_timeout
+    while time.monotonic() < deadline:
+        try:
+            urllib.request.urlopen(version_url, timeout=2).close()
+            return address
+        except OSError:
+            time.sleep(0.2)
+    raise RuntimeError(f"Browser on {address} did not start within {startup_timeout}s")
+
+# JavaScript returning the cell texts of all table body rows as arrays (one WebDriver round trip per page)
+TABLE_ROWS_SCRIPT = """
+return Array.from(document.querySelectorAll("table tbody tr")).map(
+    row => Array.from(row.querySelectorAll("td")).map(cell => cell.innerText || cell.textContent || "")
+);
+"""
+
+# Function to read all table rows of the current page with a single execute_script call
+def read_table_rows_script(driver):
+    return driver.execute_script(TABLE_ROWS_SCRIPT)
+
+# Function to read all table rows of the current page element by element (fallback, one round trip per cell)
+def read_table_rows_per_element(driver):
+    table_rows = driver.find_elements(By.CSS_SELECTOR, "table tbody tr")
+    return [[column.text for column in row.find_elements(By.TAG_NAME, "td")] for row in table_rows]
+
+# Function to scrape data from the current page
+def scrape_data(driver, language, use_script=True):
+    # Extract all table rows on the current page (as lists of cell texts)
+    rows = None
+    if use_script:
+        try:
+            rows = read_table_rows_script(driver)
+        except Exception as e:
+            logging.warning(f"Script table extraction failed, falling back to per-element extraction: {e}")
+    if rows is None:
+        rows = read_table_rows_per_element(driver)
 
-    # Return the data as a list of dictionaries
-    return [{"language": language, "troopSchool": troop, "startDate": start, "endDate": end}
-            for troop, start, end in zip(troop_school, start_date, end_date)]
+    return capture_rows(rows, language)
+
+# Function to capture raw table rows (lists of cell texts) as records, without parsing (see normalize.py)
+def capture_rows(rows, language):
+    records = []
+    for cells in rows:
+        if len(cells) == 3:
+            records.append({"language": language, "troopSchool": cells[0], "startDate": cells[1], "endDate": cells[2]})
+        else:
+            # Kept for the quarantine: all cell texts in troopSchool, the cell count as reason
+            records.append({"language": language, "troopSchool": " | ".join(cells), "startDate": None,
+                            "endDate": None, "cellCount": len(cells)})
+    return records
 
 # Function to click the second button (next page button)
 def click_next_button(driver):
@@ -162,7 +286,8 @@ def click_next_button(driver):
         return False
 
 # Function to scrape all data across pages
-def scrape_all_data(url, language, headless=True, max_pages=200, show_progress=True):
+def scrape_all_data(url, language, headless=True, max_pages=200, show_progress=True, start_page=1,
+                    checkpoint_db=None, page_size=None, driver=None):
     """
     Scrape data from all pages with safety limits and progress indicators.
     
@@ -172,13 +297,33 @@ def scrape_all_data(url, language, headless=True, max_pages=200, show_progress=T
         headless (bool): Run browser in headless mode
         max_pages (int): Maximum pages to scrape (safety limit / avoid infinite loops)
         show_progress (bool): Show progress messages
+        start_page (int): First page to scrape (earlier pages are skipped, used for sharding)
+        checkpoint_db (str): If set, every page is staged in this database as soon as it is scraped
+            (and not kept in memory), and pages already staged today are skipped
+        page_size (int): Rows per page to request through the URL (if the site supports it)
+        driver (WebDriver): Shared (warm) browser to scrape in a new tab of; the tab is closed
+            afterwards but the browser keeps running. Without it, a browser is started and quit.
+    
+    Returns:
+        list: Scraped records (empty when staging pages with checkpoint_db)
     """
-    driver = initialize_driver(headless=headless)
-    driver.get(url)
+    checkpoint = ScrapeCheckpoint(checkpoint_db) if checkpoint_db else None
+    shared_driver = driver is not None
+    with scrape_metrics.timer("scrape_driver_startup_seconds", language=language,
+                             browser="tab" if shared_driver else "new"):
+        if shared_driver:
+            open_tab(driver)
+        else:
+            driver = initialize_driver(headless=headless)
+    paginator = Paginator(driver, url, page_size=page_size, fallback=click_next_button)
+    with scrape_metrics.timer("scrape_page_load_seconds", language=language):
+        paginator.open()
 
     all_data = []  # Initialize list to store scraped data
+    records_scraped = 0
     pages_scraped = 0
     actual_max_pages = max_pages  # Will be updated with website's total pages
+    total_pages_on_site = None
     
     if show_progress:
         print(f"Starting to scrape {language} data from {url}")
@@ -199,18 +344,11 @@ def scrape_all_data(url, language, headless=True, max_pages=200, show_progress=T
                 EC.presence_of_element_located((By.CSS_SELECTOR, "div.my-5.flex.items-center.justify-center span"))
             )
             
-            page_span = driver.find_element(By.CSS_SELECTOR, "div.my-5.flex.items-center.justify-center span")
-            page_text = page_span.text  # "Seite X von Y" / "Page X de Y" / "Pagina X da Y"
-            
-            if show_progress:
-                print(f"Found pagination text: '{page_text}'")
-            
-            # Use regex to extract current and total page numbers
-            match = re.search(r"\D+\s(\d+)\s\D+\s(\d+)", page_text)
-            if match:
-                total_pages_on_site = int(match.group(2))
-                # Use the smaller of max_pages or actual total pages
-                actual_max_pages = min(max_pages, total_pages_on_site)
+            page_numbers = paginator.read_label()  # "Seite X von Y" / "Page X de Y" / "Pagina X da Y"
+            if page_numbers:
+                total_pages_on_site = page_numbers[1]
+                # Use the smaller of max_pages or actual (remaining) total pages
+                actual_max_pages = min(max_pages, total_pages_on_site - start_page + 1)
                 
                 if show_progress:
                     if total_pages_on_site < max_pages:
@@ -219,10 +357,12 @@ def scrape_all_data(url, language, headless=True, max_pages=200, show_progress=T
                         print(f"Website has {total_pages_on_site} pages - limiting to {max_pages} pages")
                         
                 logging.info(f"Total pages available: {total_pages_on_site}, will scrape: {actual_max_pages}")
+                if checkpoint:
+                    checkpoint.set_site_total(language, total_pages_on_site)
             else:
                 if show_progress:
-                    print(f"Could not parse pagination text: '{page_text}'")
-                logging.warning(f"Could not parse pagination text: '{page_text}'")
+                    print("Could not parse pagination text")
+                logging.warning("Could not parse pagination text")
                 
         except Exception as e:
             if show_progress:
@@ -240,6 +380,28 @@ def scrape_all_data(url, language, headless=True, max_pages=200, show_progress=T
             logging.error(f"Error finding table: {e}")
             return all_data
         
+        # Resume after the pages that are already staged from an earlier (failed) run today
+        first_page = start_page
+        if checkpoint:
+            first_page = checkpoint.first_missing_page(language, start_page, start_page + actual_max_pages - 1)
+            pages_scraped = first_page - start_page
+            if pages_scraped >= actual_max_pages:
+                if show_progress:
+                    print(f"All pages of {language} from page {start_page} are already staged")
+                return all_data
+            if first_page > start_page:
+                logging.info(f"Resuming {language} at page {first_page} from checkpoint")
+
+        # Go to the first page of this shard (direct jump if the site supports it, else click through)
+        if first_page > 1:
+            if show_progress:
+                print(f"Skipping ahead to page {first_page}...")
+            with scrape_metrics.timer("scrape_page_load_seconds", language=language):
+                skipped_ahead = paginator.goto(first_page)
+            if not skipped_ahead:
+                logging.error(f"Could not skip ahead to page {first_page} - stopping")
+                return all_data
+        
         while pages_scraped < actual_max_pages:
             try:
                 # Wait for the page to load and for the table body to be visible
@@ -248,54 +410,61 @@ def scrape_all_data(url, language, headless=True, max_pages=200, show_progress=T
                 )
                 
                 # Scrape data from the current page
-                page_data = scrape_data(driver, language)
+                with scrape_metrics.timer("scrape_extract_seconds", language=language):
+                    page_data = scrape_data(driver, language)
+                scrape_metrics.observe("scrape_page_records", len(page_data), language=language)
                 
                 if show_progress:
                     print(f"Scraped {len(page_data)} records from current page")
                 
-                all_data.extend(page_data)  # Append the scraped data to the list
+                # The paginator counts pages itself; the label is only needed if the total is unknown
+                current_page = paginator.page
+                total_pages = total_pages_on_site
+                if total_pages is None:
+                    page_numbers = paginator.read_label()
+                    if not page_numbers:
+                        logging.warning("Could not extract page numbers.")
+                        break
+                    current_page, total_pages = page_numbers
                 
-                # Get the current page and total pages from the page span text
-                page_span = driver.find_element(By.CSS_SELECTOR, "div.my-5.flex.items-center.justify-center span")
-                page_text = page_span.text  # "Seite X von Y" / "Page X de Y" / "Pagina X da Y"
+                # Stage the page right away (checkpoint) or append it to the list
+                if checkpoint:
+                    with scrape_metrics.timer("scrape_db_write_seconds", language=language, stage="checkpoint"):
+                        checkpoint.save_page(language, current_page, page_data)
+                else:
+                    all_data.extend(page_data)
+                records_scraped += len(page_data)
                 
-                # Use regex to extract current and total page numbers
-                match = re.search(r"\D+\s(\d+)\s\D+\s(\d+)", page_text)
-                if match:
-                    current_page = int(match.group(1))
-                    total_pages = int(match.group(2))
-                    
+                if show_progress:
+                    print(f"Scraped page {current_page}/{total_pages} - {len(page_data)} records (Total: {records_scraped})")
+                
+                logging.info(f"Page {current_page}/{total_pages}: {len(page_data)} records scraped")
+                
+                # Check if we should continue
+                if current_page < total_pages and pages_scraped < actual_max_pages - 1:
                     if show_progress:
-                        print(f"Scraped page {current_page}/{total_pages} - {len(page_data)} records (Total: {len(all_data)})")
+                        print(f"Attempting to navigate to page {current_page + 1}...")
                     
-                    logging.info(f"Page {current_page}/{total_pages}: {len(page_data)} records scraped")
-                    
-                    # Check if we should continue
-                    if current_page < total_pages and pages_scraped < actual_max_pages - 1:
+                    with scrape_metrics.timer("scrape_navigation_wait_seconds", language=language):
+                        navigated = paginator.next_page()
+                    if navigated:
+                        pages_scraped += 1
                         if show_progress:
-                            print(f"Attempting to navigate to page {current_page + 1}...")
-                        
-                        if click_next_button(driver):
-                            pages_scraped += 1
-                            if show_progress:
-                                print(f"Successfully navigated to next page")
-                        else:
-                            if show_progress:
-                                print("Failed to navigate to next page - stopping")
-                            logging.error("Navigation failed - stopping scraper")
-                            break
+                            print(f"Successfully navigated to next page")
                     else:
-                        if current_page >= total_pages:
-                            if show_progress:
-                                print("Reached the last page.")
-                            logging.info("Reached the last page.")
-                        else:
-                            if show_progress:
-                                print(f"Reached page limit ({actual_max_pages} pages).")
-                            logging.info(f"Reached page limit ({actual_max_pages} pages).")
+                        if show_progress:
+                            print("Failed to navigate to next page - stopping")
+                        logging.error("Navigation failed - stopping scraper")
                         break
                 else:
-                    logging.warning("Could not extract page numbers.")
+                    if current_page >= total_pages:
+                        if show_progress:
+                            print("Reached the last page.")
+                        logging.info("Reached the last page.")
+                    else:
+                        if show_progress:
+                            print(f"Reached page limit ({actual_max_pages} pages).")
+                        logging.info(f"Reached page limit ({actual_max_pages} pages).")
                     break
                     
             except Exception as e:
@@ -309,18 +478,143 @@ def scrape_all_data(url, language, headless=True, max_pages=200, show_progress=T
         if show_progress:
             print(f"Error during scraping initialization: {e}")
     finally:
-        driver.quit()
+        if shared_driver:
+            close_tab(driver)
+        else:
+            driver.quit()
+        if checkpoint:
+            checkpoint.close()
+        scrape_metrics.increment("scrape_retries_total", paginator.retries, language=language, kind="navigation")
 
     if show_progress:
-        print(f"Completed {language}: {len(all_data)} total records from {pages_scraped + 1} pages")
+        print(f"Completed {language}: {records_scraped} total records from {pages_scraped + 1} pages")
     
     return all_data
+# Function to read the total number of pages from the first page of a language
+def get_total_pages(url, headless=True, page_size=None):
+    driver = initialize_driver(headless=headless)
+    try:
+        paginator = Paginator(driver, url, page_size=page_size)
+        paginator.open()
+        WebDriverWait(driver, 15).until(
+            EC.presence_of_element_located((By.CSS_SELECTOR, "div.my-5.flex.items-center.justify-center span"))
+        )
+        numbers = paginator.read_label()
+        return numbers[1] if numbers else None
+    except Exception as e:
+        logging.warning(f"Could not determine total pages for {url}: {e}")
+        return None
+    finally:
+        driver.quit()
 
-# Function to insert into and update database
-def update_database(data):
-    # Connect to database
-    conn = sqlite3.connect("data/service_dates.db") # creates DB if it doesn't exist
+# Function to split pages 1..total_pages into contiguous (start_page, page_count) shards
+def split_page_range(total_pages, workers):
+    workers = max(1, min(workers, total_pages))
+    shard_size, remainder = divmod(total_pages, workers)
+    shards = []
+    start_page = 1
+    for i in range(workers):
+        page_count = shard_size + (1 if i < remainder else 0)
+        shards.append((start_page, page_count))
+        start_page += page_count
+    return shards
+
+# Function to scrape one language, optionally with the page range split across several drivers
+def scrape_language(url, language, headless=True, max_pages=200, show_progress=True, page_workers=1,
+                    backend="selenium", http_workers=4, checkpoint_db=None, page_size=None, driver=None):
+    """
+    Scrape all pages of one language, sharding the page range across drivers if requested.
+    
+    Each shard runs its own browser and clicks through to its first page before scraping,
+    so later shards pay some navigation time but no extraction time for the skipped pages.
+    Records are returned in page order, exactly as scrape_all_data returns them.
+    
+    Args:
+        url (str): URL to scrape
+        language (str): Language code (DE, FR, IT)
+        headless (bool): Run browser in headless mode
+        max_pages (int): Maximum pages to scrape
+        show_progress (bool): Show progress messages
+        page_workers (int): Number of browsers to split the page range across
+        backend (str): "selenium" or "http" (browserless, falls back to Selenium on failure)
+        http_workers (int): Number of concurrent page requests for the HTTP backend
+        checkpoint_db (str): Stage pages in this database instead of returning them (see scrape_all_data)
+        page_size (int): Rows per page to request through the URL (Selenium backend, if the site supports it)
+        driver (WebDriver): Shared browser to scrape in (one tab, single page worker only)
+    """
+    if backend == "http":
+        try:
+            with scrape_metrics.timer("scrape_http_fetch_seconds", language=language):
+                rows = http_scraper.fetch_table_rows(url, max_pages=max_pages, workers=http_workers)
+            with scrape_metrics.timer("scrape_extract_seconds", language=language):
+                language_data = capture_rows(rows, language)
+            if show_progress:
+                print(f"Fetched {language} over HTTP: {len(language_data)} records")
+            if checkpoint_db:
+                # All pages arrive at once: stage them as one batch and mark the language complete
+                checkpoint = ScrapeCheckpoint(checkpoint_db)
+                with scrape_metrics.timer("scrape_db_write_seconds", language=language, stage="checkpoint"):
+                    checkpoint.save_page(language, 1, language_data)
+                checkpoint.mark_completed(language)
+                checkpoint.close()
+                return []
+            return language_data
+        except Exception as e:
+            logging.warning(f"HTTP backend failed for {language}, falling back to Selenium: {e}")
+            scrape_metrics.increment("scrape_retries_total", language=language, kind="http_fallback")
+            if show_progress:
+                print(f"HTTP backend failed for {language} ({e}) - falling back to Selenium")
+
+    if page_workers <= 1:
+        return scrape_all_data(url, language, headless=headless, max_pages=max_pages, show_progress=show_progress,
+                               checkpoint_db=checkpoint_db, page_size=page_size, driver=driver)
+
+    total_pages = get_total_pages(url, headless=headless, page_size=page_size)
+    if not total_pages:
+        logging.warning(f"Falling back to a single driver for {language}: total pages unknown")
+        return scrape_all_data(url, language, headless=headless, max_pages=max_pages, show_progress=show_progress,
+                               checkpoint_db=checkpoint_db, page_size=page_size)
+
+    shards = split_page_range(min(max_pages, total_pages), page_workers)
+    logging.info(f"Scraping {language} with {len(shards)} page workers: {shards}")
+
+    with ThreadPoolExecutor(max_workers=len(shards)) as executor:
+        futures = [
+            executor.submit(scrape_all_data, url, language, headless=headless, max_pages=page_count,
+                            show_progress=show_progress, start_page=start_page, checkpoint_db=checkpoint_db,
+                            page_size=page_size)
+            for start_page, page_count in shards
+        ]
+        shard_results = [future.result() for future in futures]  # keep shard (= page) order
+
+    return [record for shard_data in shard_results for record in shard_data]
 
+# Function to create the active table (also used for the shadow table that replaces it)
+def create_active_table(conn, table):
+    conn.execute(f"""
+    CREATE TABLE IF NOT EXISTS {table} (
+        language TEXT NOT NULL,
+        troopSchool TEXT NOT NULL,
+        startDate TEXT,
+        endDate TEXT,
+        scrapeDate TEXT NOT NULL,
+        active BOOLEAN NOT NULL DEFAULT TRUE
+    )
+    """)
+
+# Function to create the indexes of activeServiceDates (again after each shadow table swap)
+def create_active_indexes(conn):
+    conn.execute("""
+    CREATE UNIQUE INDEX IF NOT EXISTS idx_activeServiceDates_key
+    ON activeServiceDates(language, troopSchool, startDate, endDate)
+    """)
+    conn.execute("""
+    CREATE INDEX IF NOT EXISTS idx_activeServiceDates_lang_dates
+    ON activeServiceDates(language, startDate, endDate)
+    """)
+
+# Function to create the database tables (and migrate older databases)
+def create_tables(conn):
     conn.execute("""
     CREATE TABLE IF NOT EXISTS serviceDates (
         id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -328,42 +622,336 @@ def update_database(data):
         troopSchool TEXT NOT NULL,
         startDate TEXT,     -- can be NULL if date not yet decided
         endDate TEXT,       -- can be NULL if date not yet decided
-        scrapeDate TEXT NOT NULL,
+        scrapeDate TEXT NOT NULL,   -- last scrape that contained the record
+        firstSeen TEXT,             -- first scrape that contained the record
         active BOOLEAN NOT NULL DEFAULT FALSE,
         UNIQUE(language, troopSchool, startDate, endDate)
     )
     """)
 
+    # Databases created before firstSeen existed: use the last scrape date as best guess
+    columns = [row[1] for row in conn.execute("PRAGMA table_info(serviceDates)")]
+    if "firstSeen" not in columns:
+        conn.execute("ALTER TABLE serviceDates ADD COLUMN firstSeen TEXT")
+        conn.execute("UPDATE serviceDates SET firstSeen = scrapeDate WHERE firstSeen IS NULL")
+
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_serviceDates_active ON serviceDates(active)")
+    # App filter queries: language =, startDate >=, endDate <= (troop filters use the unique key index)
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_serviceDates_lang_dates ON serviceDates(language, startDate, endDate)")
+
+    # Validity intervals of every record: [validFrom, validTo), validTo is NULL while the record is on the website.
+    # A row is only written when a record appears or disappears, so the table grows with changes, not with days.
+    history_exists = conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'serviceDateHistory'").fetchone()
+    conn.execute("""
+    CREATE TABLE IF NOT EXISTS serviceDateHistory (
+        serviceId INTEGER NOT NULL REFERENCES serviceDates(id),
+        validFrom TEXT NOT NULL,    -- first scrape that contained the record
+        validTo TEXT                -- first scrape that no longer contained it (NULL = still valid)
+    )
+    """)
+    if not history_exists:
+        # Databases created before the history existed: one interval per record, from firstSeen to the last scrape
+        conn.execute("""
+        INSERT INTO serviceDateHistory (serviceId, validFrom, validTo)
+        SELECT id, COALESCE(firstSeen, scrapeDate), CASE WHEN active THEN NULL ELSE scrapeDate END
+        FROM serviceDates
+        """)
+    # As-of queries (validFrom <= X < validTo), changes between dates (validFrom / validTo in a range)
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_serviceDateHistory_from ON serviceDateHistory(validFrom, validTo)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_serviceDateHistory_to ON serviceDateHistory(validTo)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_serviceDateHistory_serviceId ON serviceDateHistory(serviceId, validTo)")
+
+    create_active_table(conn, "activeServiceDates")
+    create_active_indexes(conn)
+
+    # Cross-language events: one row per service with its DE/FR/IT names, and the links to the language rows
+    conn.execute("""
+    CREATE TABLE IF NOT EXISTS serviceEvents (
+        eventId TEXT PRIMARY KEY,
+        startDate TEXT,
+        endDate TEXT,
+        nameDE TEXT,
+        nameFR TEXT,
+        nameIT TEXT,
+        label TEXT NOT NULL     -- all names joined with " / " for display and search
+    )
+    """)
+    conn.execute("""
+    CREATE TABLE IF NOT EXISTS serviceEventLinks (
+        language TEXT NOT NULL,
+        troopSchool TEXT NOT NULL,
+        startDate TEXT,
+        endDate TEXT,
+        eventId TEXT NOT NULL REFERENCES serviceEvents(eventId)
+    )
+    """)
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_serviceEventLinks_eventId ON serviceEventLinks(eventId)")
+    conn.execute("""
+    CREATE UNIQUE INDEX IF NOT EXISTS idx_serviceEventLinks_key
+    ON serviceEventLinks(language, troopSchool, startDate, endDate)
+    """)
+
+    # Full-text index over the active troop/school names (accent-insensitive, with prefix indexes)
+    try:
+        conn.execute("""
+        CREATE VIRTUAL TABLE IF NOT EXISTS troopSearch USING fts5(
+            troopSchool,
+            language UNINDEXED,
+            tokenize = "unicode61 remove_diacritics 2",
+            prefix = '2 3'
+        )
+        """)
+    except sqlite3.OperationalError as e:
+        logging.warning(f"FTS5 not available, troop search index disabled: {e}")
+
+    # Scraped rows that failed normalization (raw cell texts and the reasons), per scrape date
+    conn.execute("""
+    CREATE TABLE IF NOT EXISTS scrapeQuarantine (
+        scrapeDate TEXT NOT NULL,
+        language TEXT NOT NULL,
+        troopSchool TEXT,
+        startDate TEXT,
+        endDate TEXT,
+        reason TEXT NOT NULL
+    )
+    """)
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_scrapeQuarantine_date ON scrapeQuarantine(scrapeDate)")
+
+    # Key/value metadata, e.g. the data version the app uses to invalidate its cache
+    conn.execute("""
+    CREATE TABLE IF NOT EXISTS metadata (
+        key TEXT PRIMARY KEY,
+        value TEXT
+    )
+    """)
+
+    conn.commit()  # schema changes and migrations are committed on their own
+
+# Function to read the linked rows of the database ((language, troopSchool, startDate, endDate) -> eventId)
+def read_event_links(conn):
+    return {(language, troop, start_date, end_date): event
+            for language, troop, start_date, end_date, event in conn.execute(
+                "SELECT language, troopSchool, startDate, endDate, eventId FROM serviceEventLinks")}
+
+# Function to read the data version (None before the first update)
+def read_data_version(conn):
+    row = conn.execute("SELECT value FROM metadata WHERE key = 'dataVersion'").fetchone()
+    return row[0] if row else None
+
+# Function to link the DE/FR/IT rows of the date groups a scrape changed (no write lock needed)
+def link_changed_events(conn, data):
+    """
+    Returns:
+        tuple: (links, groups, events) - the current links, the changed (startDate, endDate)
+            groups and the new events of those groups
+    """
+    links = read_event_links(conn)
+    groups = linking.changed_groups(data, set(links))
+    return links, groups, linking.link_events(data, groups)
+
+# Function to replace the events of the changed date groups (inside the write transaction)
+def update_event_tables(conn, links, groups, events):
+    stale = [(event,) for event in {event for (_, _, start_date, end_date), event in links.items()
+                                    if (start_date, end_date) in groups}]
+    conn.executemany("DELETE FROM serviceEventLinks WHERE eventId = ?", stale)
+    conn.executemany("DELETE FROM serviceEvents WHERE eventId = ?", stale)
+    conn.executemany(
+        "INSERT INTO serviceEvents (eventId, startDate, endDate, nameDE, nameFR, nameIT, label) VALUES (?, ?, ?, ?, ?, ?, ?)",
+        [(event["eventId"], event["startDate"], event["endDate"],
+          event["names"].get("DE"), event["names"].get("FR"), event["names"].get("IT"),
+          " / ".join(dict.fromkeys(event["names"].values())))
+         for event in events]
+    )
+    conn.executemany(
+        "INSERT INTO serviceEventLinks (language, troopSchool, startDate, endDate, eventId) VALUES (?, ?, ?, ?, ?)",
+        [(language, name, event["startDate"], event["endDate"], event["eventId"])
+         for event in events for language, name in event["names"].items()]
+    )
+
+    total = conn.execute("SELECT COUNT(*) FROM serviceEvents").fetchone()[0]
+    logging.info(f"Relinked {len(groups)} changed date groups into {len(events)} events ({total} events in total)")
+    return total
+
+# Function to insert into and update database
+def update_database(data, db_path=DB_PATH, scrape_date=None, quarantine=None):
+    """
+    Apply a scrape to the database as a diff against the current state.
+    
+    The scrape is loaded into an indexed staging table and compared with indexed joins,
+    so only inserted, reactivated and removed rows are written (plus the scrapeDate of
+    re-seen rows). Existing rows keep their id and firstSeen date. Appearing and
+    disappearing records open and close their interval in serviceDateHistory. activeServiceDates is
+    rebuilt in a shadow table and swapped in; everything is committed in one transaction.
+    Cross-language events are only relinked for the date groups with inserted or removed
+    rows, and they are computed before the write lock is taken.
+    
+    Args:
+        data (list): Scraped records (dicts with language, troopSchool, startDate, endDate)
+        db_path (str): SQLite database file
+        scrape_date (str): Date of the scrape (YYYY-MM-DD, default today; e.g. when replaying exports)
+        quarantine (list): Rows that failed normalization (dicts with the raw texts and a reason),
+            stored in scrapeQuarantine for the scrape date
+    
+    Returns:
+        dict: Number of inserted, reactivated, removed and unchanged rows, and of events
+    """
+    scrape_date = scrape_date or today_date
+
+    # Connect to database (WAL: the app keeps reading the last committed data while we write)
+    conn = sqlite3.connect(db_path, timeout=30) # creates DB if it doesn't exist
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    create_tables(conn)
+
     # Conversion to df
-    df = pd.DataFrame(data)
+    df = pd.DataFrame(data, columns=["language", "troopSchool", "startDate", "endDate"])
     df = df.drop_duplicates()  # Deduplicate (based on all columns)
-    df["scrapeDate"] = today_date  # Set scrapeDate as today
-    df["active"] = True  # Mark all scraped data as active
+    df = df.astype(object).where(df.notna(), None)  # NaN -> NULL
+
+    # Link the languages of the changed date groups before taking the write lock
+    records = [dict(zip(df.columns, row)) for row in df.itertuples(index=False, name=None)]
+    version = read_data_version(conn)
+    links, groups, linked = link_changed_events(conn, records)
 
-    # Transform df to SQL format and add to activeServiceDates table (creates it if not exists)
-    df.to_sql("activeServiceDates", conn, if_exists="replace", index=False)
+    # All changes below happen in one transaction, committed at the end
+    conn.execute("BEGIN IMMEDIATE")
+    if read_data_version(conn) != version:  # another writer got in between: link again under the lock
+        links, groups, linked = link_changed_events(conn, records)
 
-    # Insert new records or update the historical serviceDates table
+    # Load the scrape into an indexed staging table
+    conn.execute("DROP TABLE IF EXISTS temp.stagingServiceDates")
     conn.execute("""
-    INSERT OR REPLACE INTO serviceDates (language, troopSchool, startDate, endDate, scrapeDate, active)
-    SELECT language, troopSchool, startDate, endDate, scrapeDate, active
-    FROM activeServiceDates
+    CREATE TEMP TABLE stagingServiceDates (
+        language TEXT NOT NULL,
+        troopSchool TEXT NOT NULL,
+        startDate TEXT,
+        endDate TEXT,
+        serviceId INTEGER   -- matching serviceDates.id, NULL for new records
+    )
     """)
+    conn.executemany(
+        "INSERT INTO stagingServiceDates (language, troopSchool, startDate, endDate) VALUES (?, ?, ?, ?)",
+        df.itertuples(index=False, name=None)
+    )
+    conn.execute("CREATE INDEX temp.idx_staging_key ON stagingServiceDates(language, troopSchool, startDate, endDate)")
+    conn.execute("CREATE INDEX temp.idx_staging_serviceId ON stagingServiceDates(serviceId)")
 
-    # "Deactivate" old records in the historical table that are not in activeServiceDates
+    # Match staged rows to existing records (one unique-index lookup per staged row, IS matches NULL dates)
     conn.execute("""
-    UPDATE serviceDates
-    SET active = false
-    WHERE (language, troopSchool, startDate, endDate) NOT IN (
-        SELECT language, troopSchool, startDate, endDate
-        FROM activeServiceDates
+    UPDATE stagingServiceDates
+    SET serviceId = (
+        SELECT sd.id FROM serviceDates sd
+        WHERE sd.language = stagingServiceDates.language
+          AND sd.troopSchool = stagingServiceDates.troopSchool
+          AND sd.startDate IS stagingServiceDates.startDate
+          AND sd.endDate IS stagingServiceDates.endDate
     )
     """)
 
-    # Commit changes and close the connection
-    conn.commit()
+    # "Deactivate" active records that are no longer on the website
+    removed = conn.execute("""
+    UPDATE serviceDates
+    SET active = FALSE
+    WHERE active AND id NOT IN (SELECT serviceId FROM stagingServiceDates WHERE serviceId IS NOT NULL)
+    """).rowcount
+
+    # Records that are still on the website: refresh their scrapeDate
+    unchanged = conn.execute("""
+    UPDATE serviceDates
+    SET scrapeDate = ?
+    WHERE active AND id IN (SELECT serviceId FROM stagingServiceDates)
+    """, (scrape_date,)).rowcount
+
+    # Records that disappeared earlier and are back again
+    reactivated = conn.execute("""
+    UPDATE serviceDates
+    SET active = TRUE, scrapeDate = ?
+    WHERE NOT active AND id IN (SELECT serviceId FROM stagingServiceDates)
+    """, (scrape_date,)).rowcount
+
+    # New records
+    inserted = conn.execute("""
+    INSERT INTO serviceDates (language, troopSchool, startDate, endDate, scrapeDate, firstSeen, active)
+    SELECT language, troopSchool, startDate, endDate, ?, ?, TRUE
+    FROM stagingServiceDates
+    WHERE serviceId IS NULL
+    """, (scrape_date, scrape_date)).rowcount
+
+    # Close the intervals of records that disappeared and open one for new and reactivated records
+    conn.execute("""
+    UPDATE serviceDateHistory
+    SET validTo = ?
+    WHERE validTo IS NULL AND serviceId IN (SELECT id FROM serviceDates WHERE NOT active)
+    """, (scrape_date,))
+    conn.execute("DELETE FROM serviceDateHistory WHERE validFrom = validTo")  # appeared and disappeared on the same day
+    conn.execute("""
+    INSERT INTO serviceDateHistory (serviceId, validFrom)
+    SELECT id, ? FROM serviceDates
+    WHERE active AND id NOT IN (SELECT serviceId FROM serviceDateHistory WHERE validTo IS NULL)
+    """, (scrape_date,))
+
+    # Build the new active data in a shadow table and swap it in (same transaction, readers see old or new)
+    conn.execute("DROP TABLE IF EXISTS activeServiceDates_new")
+    create_active_table(conn, "activeServiceDates_new")
+    conn.execute("""
+    INSERT INTO activeServiceDates_new (language, troopSchool, startDate, endDate, scrapeDate, active)
+    SELECT language, troopSchool, startDate, endDate, ?, TRUE
+    FROM stagingServiceDates
+    """, (scrape_date,))
+    conn.execute("DROP TABLE activeServiceDates")
+    conn.execute("ALTER TABLE activeServiceDates_new RENAME TO activeServiceDates")
+    create_active_indexes(conn)
+
+    # Replace the events of the changed date groups
+    events = update_event_tables(conn, links, groups, linked)
+
+    # Rebuild the troop search index from the distinct active names of every language (and the event labels as "ALL")
+    if conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'troopSearch'").fetchone():
+        conn.execute("DELETE FROM troopSearch")
+        conn.execute("""
+        INSERT INTO troopSearch (troopSchool, language)
+        SELECT DISTINCT troopSchool, language FROM activeServiceDates
+        UNION ALL
+        SELECT DISTINCT label, 'ALL' FROM serviceEvents
+        """)
+
+    # Rows that failed normalization in this scrape (replaces those of an earlier run on the same day)
+    if quarantine is not None:
+        conn.execute("DELETE FROM scrapeQuarantine WHERE scrapeDate = ?", (scrape_date,))
+        conn.executemany(
+            "INSERT INTO scrapeQuarantine (scrapeDate, language, troopSchool, startDate, endDate, reason) VALUES (?, ?, ?, ?, ?, ?)",
+            [(scrape_date, row["language"], row["troopSchool"], row["startDate"], row["endDate"], row["reason"])
+             for row in quarantine]
+        )
+
+    # New data version (committed together with the data, the app reloads when it changes)
+    data_version = datetime.datetime.now().isoformat(timespec="microseconds")
+    conn.execute("INSERT OR REPLACE INTO metadata (key, value) VALUES ('dataVersion', ?)", (data_version,))
+
+    # Write the Arrow snapshot the app memory-maps from this transaction (the connection reads its own
+    # uncommitted rows), so it is ready under the new version the moment the version is committed
+    snapshot = dataset.snapshot_path(db_path)
+    try:
+        dataset.write_snapshot(conn, snapshot, data_version, publish=False)
+        snapshot_written = True
+    except Exception as e:
+        logging.warning(f"Arrow snapshot not written, the app loads from SQLite: {e}")
+        snapshot_written = False
+
+    # Commit changes, publish the snapshot, and close the connection
+    try:
+        conn.commit()
+    except BaseException:
+        dataset.discard_snapshot(snapshot)
+        raise
+    if snapshot_written:
+        dataset.publish_snapshot(snapshot)
     conn.close()
-    logging.info("Database updated successfully.")
+
+    summary = {"inserted": inserted, "reactivated": reactivated, "removed": removed, "unchanged": unchanged,
+               "events": events}
+    logging.info(f"Database updated successfully: {summary}")
+    return summary
 
 # Function to save data to a JSON file
 def save_data_to_json(data, filename=f"latest_service_dates_{today_date}.json"):
@@ -377,9 +965,142 @@ def save_data_to_json(data, filename=f"latest_service_dates_{today_date}.json"):
     except Exception as e:
         logging.error(f"Error saving data to JSON: {e}")
 
+# Function to hash the raw rows of one page
+def rows_hash(rows):
+    return hashlib.sha256(json.dumps(rows, ensure_ascii=False).encode("utf-8")).hexdigest()
+
+class PageJumpError(Exception):
+    """Raised if the Selenium fingerprint can't jump to the last page (the site ignores ?page=N)."""
+
+# Function to fingerprint one language: total pages plus hash and row count of the first and last page
+def fingerprint_language(url, backend="selenium", headless=True, page_size=None, selenium=True):
+    """
+    Cheap change check for one language (two page loads instead of a full scrape).
+    
+    The HTTP backend requests page 1 and the last page directly, Selenium jumps to the
+    last page. New services are usually added at the end, so a fingerprint without the
+    last page could miss them: if the last page can't be reached, there is no fingerprint
+    and the run does a full scrape. With selenium=False no browser is started (only the
+    HTTP backend can produce a fingerprint then).
+    
+    Returns:
+        dict: totalPages, first/last page hash and row count (None if it could not be computed)
+
+    Raises:
+        PageJumpError: If Selenium reached the site but the direct jump to the last page didn't work
+    """
+    if backend == "http":
+        session = http_scraper.create_session(workers=1)
+        try:
+            first = http_scraper.fetch_page(session, url, 1)
+            numbers = http_scraper.parse_page_numbers(first.page_text)
+            if first.rows and numbers:
+                last = http_scraper.fetch_page(session, url, numbers[1]) if numbers[1] > 1 else first
+                if http_scraper.parse_page_numbers(last.page_text) == (numbers[1], numbers[1]):
+                    return {"totalPages": numbers[1],
+                            "first": [rows_hash(first.rows), len(first.rows)],
+                            "last": [rows_hash(last.rows), len(last.rows)]}
+        except Exception as e:
+            logging.warning(f"HTTP fingerprint failed for {url}, trying Selenium: {e}")
+        finally:
+            session.close()
+
+    if not selenium:
+        return None
+    driver = initialize_driver(headless=headless)
+    try:
+        paginator = Paginator(driver, url, page_size=page_size)
+        paginator.open()
+        WebDriverWait(driver, 15).until(
+            EC.presence_of_element_located((By.CSS_SELECTOR, "table tbody tr"))
+        )
+        WebDriverWait(driver, 15).until(
+            EC.presence_of_element_located((By.CSS_SELECTOR, "div.my-5.flex.items-center.justify-center span"))
+        )
+        numbers = paginator.read_label()
+        if not numbers:
+            return None
+        first_rows = read_table_rows_script(driver)
+        fingerprint = {"totalPages": numbers[1], "first": [rows_hash(first_rows), len(first_rows)]}
+        if numbers[1] == 1:
+            fingerprint["last"] = fingerprint["first"]
+        elif paginator.jump_to(numbers[1]):
+            last_rows = read_table_rows_script(driver)
+            fingerprint["last"] = [rows_hash(last_rows), len(last_rows)]
+        else:
+            raise PageJumpError(f"Could not jump to the last page of {url}")
+        return fingerprint
+    except PageJumpError:
+        raise
+    except Exception as e:
+        logging.warning(f"Could not fingerprint {url}: {e}")
+        return None
+    finally:
+        driver.quit()
+
+# Function to fingerprint all languages (None if any language fails)
+def compute_fingerprint(urls, max_pages=200, backend="selenium", headless=True, page_size=None, selenium=True):
+    fingerprint = {"maxPages": max_pages, "pageSize": page_size}
+    for language, url in urls.items():
+        language_fingerprint = fingerprint_language(url, backend=backend, headless=headless, page_size=page_size,
+                                                    selenium=selenium)
+        if language_fingerprint is None:
+            return None
+        fingerprint[language] = language_fingerprint
+    return fingerprint
+
+# Function to read the fingerprint and date of the last full run from the metadata table
+def load_last_run(db_path=DB_PATH):
+    if not os.path.exists(db_path):
+        return None, None
+    conn = sqlite3.connect(db_path)
+    try:
+        rows = dict(conn.execute("SELECT key, value FROM metadata WHERE key IN ('scrapeFingerprint', 'lastFullRun')"))
+    except sqlite3.OperationalError:
+        return None, None  # no metadata table yet
+    finally:
+        conn.close()
+    fingerprint = json.loads(rows["scrapeFingerprint"]) if rows.get("scrapeFingerprint") else None
+    last_full_run = datetime.date.fromisoformat(rows["lastFullRun"]) if rows.get("lastFullRun") else None
+    return fingerprint, last_full_run
+
+# Function to store the fingerprint of a successful full run
+def save_last_run(fingerprint, db_path=DB_PATH):
+    conn = sqlite3.connect(db_path, timeout=30)
+    with conn:
+        conn.execute("INSERT OR REPLACE INTO metadata (key, value) VALUES ('scrapeFingerprint', ?)",
+                     (json.dumps(fingerprint) if fingerprint else None,))
+        conn.execute("INSERT OR REPLACE INTO metadata (key, value) VALUES ('lastFullRun', ?)", (today_date,))
+    conn.close()
+
+# Function to read the date on which the Selenium fingerprint found no direct page jumps (None if they worked)
+def load_no_page_jumps(db_path=DB_PATH):
+    if not os.path.exists(db_path):
+        return None
+    conn = sqlite3.connect(db_path)
+    try:
+        row = conn.execute("SELECT value FROM metadata WHERE key = 'noPageJumps'").fetchone()
+    except sqlite3.OperationalError:
+        return None  # no metadata table yet
+    finally:
+        conn.close()
+    return datetime.date.fromisoformat(row[0]) if row and row[0] else None
+
+# Function to store (date of the check) or clear (None) the "no direct page jumps" flag
+def save_no_page_jumps(date, db_path=DB_PATH):
+    conn = sqlite3.connect(db_path, timeout=30)
+    with conn:
+        create_tables(conn)
+        conn.execute("INSERT OR REPLACE INTO metadata (key, value) VALUES ('noPageJumps', ?)",
+                     (date.isoformat() if date else None,))
+    conn.close()
+
 # Function to start scraping, updating the database, and optionally save data as JSON file
 def run_scraper(save_as_json=False, json_filename=f"latest_service_dates_{today_date}.json", 
-                hide_scraping_browser=True, max_pages=200, show_progress=True):
+                hide_scraping_browser=True, max_pages=200, show_progress=True,
+                parallel=False, page_workers=1, backend="selenium", base_url=BASE_URL,
+                checkpoint=True, page_size=None, skip_unchanged=True, force_full_every_days=7,
+                export_format=None, export_dir=exports.EXPORT_DIR, reuse_browser=False, keep_browser_alive=False):
     """
     Run the scraper with configurable page limits.
     
@@ -389,37 +1110,143 @@ def run_scraper(save_as_json=False, json_filename=f"latest_service_dates_{today_
         hide_scraping_browser (bool): Run browser in headless mode
         max_pages (int): Maximum pages to scrape per language
         show_progress (bool): Show progress messages
+        parallel (bool): Scrape all languages at the same time in separate worker processes
+        page_workers (int): Number of browsers per language to split the page range across
+        backend (str): "selenium" or "http" (browserless, falls back to Selenium on failure)
+        base_url (str): Site to scrape (e.g. the local fixture server for offline runs)
+        checkpoint (bool): Stage every page in the database as it is scraped; a rerun on the
+            same day resumes where a failed run stopped, and the database is only updated
+            once all languages are complete
+        page_size (int): Rows per page to request through the URL (if the site supports it)
+        skip_unchanged (bool): Fingerprint the site first and skip the full scrape if it matches
+            the fingerprint of the last full run (without browsers while the site is known to ignore
+            direct page jumps, rechecked on every forced full run)
+        force_full_every_days (int): Always do a full run if the last one is this many days old
+        export_format (str): If set, export the run to export_dir ("ndjson", "ndjson.gz", "ndjson.zst"
+            or "parquet"): a full base export the first time, afterwards only the day's added and removed rows
+        export_dir (str): Directory for the base and delta exports
+        reuse_browser (bool): Scrape the languages one after another in tabs of one warm browser
+            (shared cache, one startup) instead of one browser per language (not with parallel/page_workers)
+        keep_browser_alive (bool): With reuse_browser, attach to a browser that keeps running between
+            scheduled runs (started on KEEPALIVE_ADDRESS if it isn't running yet)
     """
     # Languages and URLs to scrape
-    urls = {
-        "DE": "https://www.armee.ch/de/aufgebotsdaten",
-        "FR": "https://www.armee.ch/fr/dates-de-convocation",
-        "IT": "https://www.armee.ch/it/date-di-chiamata-in-servizio"
-    }
+    urls = {language: base_url.rstrip("/") + path for language, path in URL_PATHS.items()}
+
+    # New metrics run id (worker processes inherit it and write to the same JSON lines file)
+    scrape_metrics.begin_run()
+    run_started = time.perf_counter()
 
     all_scraped_data = [] # List to store all scraped data
 
+    # Staged pages of today's run (rows of earlier days are discarded)
+    checkpoints = ScrapeCheckpoint(DB_PATH) if checkpoint else None
+    if checkpoints:
+        checkpoints.clear_older()
+
+    scrape_options = {
+        "headless": hide_scraping_browser,
+        "max_pages": max_pages,
+        "show_progress": show_progress,
+        "page_workers": page_workers,
+        "backend": backend,
+        "checkpoint_db": DB_PATH if checkpoint else None,
+        "page_size": page_size,
+    }
+
+    shared_driver = None
     try:
+        # Cheap pre-check: skip the full run if the site looks exactly like at the last full run
+        fingerprint = None
+        if skip_unchanged:
+            last_fingerprint, last_full_run = load_last_run()
+            full_run_due = (last_full_run is None
+                            or (datetime.date.today() - last_full_run).days >= force_full_every_days)
+
+            # Without direct page jumps the browsers can't fingerprint the last page: don't start them
+            # for nothing on every run, only check again when a full run is due anyway
+            no_page_jumps = load_no_page_jumps()
+            use_selenium = no_page_jumps is None or full_run_due
+            if not use_selenium:
+                logging.info(f"No direct page jumps on {no_page_jumps} - change check without browsers")
+            try:
+                fingerprint = compute_fingerprint(urls, max_pages=max_pages, backend=backend,
+                                                  headless=hide_scraping_browser, page_size=page_size,
+                                                  selenium=use_selenium)
+                if fingerprint is not None and no_page_jumps is not None:
+                    save_no_page_jumps(None)
+            except PageJumpError as e:
+                logging.info(f"{e} - no change check until the next forced full run")
+                save_no_page_jumps(datetime.date.today())
+            if fingerprint is not None and fingerprint == last_fingerprint and not full_run_due:
+                message = f"Source unchanged since the full run on {last_full_run} - skipped scraping and database update."
+                logging.info(message)
+                if show_progress:
+                    print(message)
+                return {"status": "success", "message": message}
+
         if show_progress:
             print(f"Starting scraper with max {max_pages} pages per language")
+
+        # Languages that a previous run today already finished
+        pending = {language: url for language, url in urls.items()
+                   if not (checkpoints and checkpoints.is_completed(language, max_pages))}
+        for language in urls.keys() - pending.keys():
+            logging.info(f"{language} already staged today - skipping")
+
+        # One warm browser for all languages (a tab each), optionally kept alive for the next run
+        if reuse_browser and backend == "selenium" and not parallel and page_workers <= 1 and pending:
+            with scrape_metrics.timer("scrape_driver_startup_seconds", browser="shared"):
+                address = ensure_browser(headless=hide_scraping_browser) if keep_browser_alive else None
+                shared_driver = initialize_driver(headless=hide_scraping_browser, debugger_address=address,
+                                                  single_process=False)
+            scrape_options["driver"] = shared_driver
             
-        # Scraping the data
-        for language, url in urls.items():
-            try:
-                logging.info(f"Scraping data for {language} (max {max_pages} pages)...")
-                language_data = scrape_all_data(url, language, 
-                                              headless=hide_scraping_browser, 
-                                              max_pages=max_pages,
-                                              show_progress=show_progress)
-                all_scraped_data.extend(language_data)
-                
-                if show_progress:
-                    print(f"Completed {language}: {len(language_data)} records")
+        # Scraping the data (in parallel: one worker process per language)
+        executor = ProcessPoolExecutor(max_workers=len(pending)) if parallel and pending else None
+        try:
+            futures = {}
+            if executor:
+                for language, url in pending.items():
+                    logging.info(f"Submitting {language} scraping worker (max {max_pages} pages)...")
+                    futures[language] = executor.submit(scrape_language, url, language, **scrape_options)
+
+            # Collect results in the fixed language order so the output is the same as a sequential run
+            for language, url in pending.items():
+                try:
+                    if executor:
+                        language_data = futures[language].result()
+                    else:
+                        logging.info(f"Scraping data for {language} (max {max_pages} pages)...")
+                        language_data = scrape_language(url, language, **scrape_options)
+                    all_scraped_data.extend(language_data)
                     
-            except Exception as e:
-                logging.error(f"Error scraping {language} ({url}): {e}")
-                if show_progress:
-                    print(f"Error scraping {language}: {e}")
+                    if show_progress:
+                        record_count = checkpoints.count(language) if checkpoints else len(language_data)
+                        print(f"Completed {language}: {record_count} records")
+                        
+                except Exception as e:
+                    logging.error(f"Error scraping {language} ({url}): {e}")
+                    if show_progress:
+                        print(f"Error scraping {language}: {e}")
+        finally:
+            if executor:
+                executor.shutdown()
+
+        # With checkpoints, only complete scrapes are applied (a rerun resumes the missing pages)
+        if checkpoints:
+            incomplete = [language for language in urls if not checkpoints.is_completed(language, max_pages)]
+            if incomplete:
+                message = f"Scrape incomplete for {', '.join(incomplete)}. Staged pages are kept, rerun to resume."
+                logging.warning(message)
+                return {"status": "warning", "message": message}
+            all_scraped_data = list(checkpoints.records(urls))
+
+        # Second stage: normalize the raw cell texts of the whole scrape at once (failed rows go to the quarantine)
+        with scrape_metrics.timer("scrape_normalize_seconds"):
+            all_scraped_data, quarantined = normalize.normalize_records(all_scraped_data)
+        if quarantined and show_progress:
+            print(f"Quarantined {len(quarantined)} rows (see table scrapeQuarantine)")
 
         # Update database if we have data
         if all_scraped_data: # if not empty
@@ -427,13 +1254,29 @@ def run_scraper(save_as_json=False, json_filename=f"latest_service_dates_{today_
                 print(f"Total records scraped: {len(all_scraped_data)}")
                 print("Updating database...")
                 
-            update_database(all_scraped_data)
+            with scrape_metrics.timer("scrape_db_write_seconds", stage="update"):
+                summary = update_database(all_scraped_data, quarantine=quarantined)
+            if show_progress:
+                print(f"Database changes: {summary}")
 
             # Save data to JSON if requested (if True)
             if save_as_json:
                 save_data_to_json(all_scraped_data, filename=json_filename)
                 if show_progress:
                     print(f"Data saved to {json_filename}")
+
+            # Streamed base/delta exports (exports.rebuild_database restores the DB from them)
+            if export_format:
+                written = exports.export_run(DB_PATH, today_date, export_dir, export_format)
+                if show_progress:
+                    print(f"Exported {', '.join(written)}")
+
+            # The staged pages are applied, the next run starts from page 1
+            if checkpoints:
+                checkpoints.clear()
+
+            # Remember this full run for the next change check
+            save_last_run(fingerprint)
             
             logging.info(f"Scraper completed successfully. {len(all_scraped_data)} records processed.")
             return {"status": "success", "message": f"Scraping completed successfully. {len(all_scraped_data)} records processed."}
@@ -445,6 +1288,18 @@ def run_scraper(save_as_json=False, json_filename=f"latest_service_dates_{today_
     except Exception as e:
         logging.error(f"An error occurred while running the scraper: {e}")
         return {"status": "error", "message": f"An error occurred: {e}"}
+    finally:
+        if checkpoints:
+            checkpoints.close()
+        if shared_driver:
+            shared_driver.quit()  # an attached (kept-alive) browser keeps running
+        # Prometheus text file with the totals of this run (all processes)
+        scrape_metrics.observe("scrape_run_seconds", round(time.perf_counter() - run_started, 6))
+        try:
+            scrape_metrics.collect_run()
+            scrape_metrics.write_prometheus()
+        except OSError as e:
+            logging.warning(f"Could not write metrics file: {e}")
 
 #%%
 # Make script importable and callable
@@ -464,3 +1319,6 @@ if __name__ == "__main__":
         print("SUCCESS:", result["message"])
 
 # Example call: run_scraper(save_as_json=True, hide_scraping_browser=True, max_pages=50, show_progress=True)
+# Parallel call: run_scraper(parallel=True, page_workers=2) # 3 language processes x 2 browsers each
+# Warm browser: run_scraper(reuse_browser=True, keep_browser_alive=True) # later runs attach to the running browser
+# Daily delta exports: run_scraper(export_format="ndjson.gz") # restore: python exports.py rebuild data/service_dates.db
@@ -0,0 +1,35 @@
+# Shared test setup: the modules live in the repository root, scrape.py logs to logs/ on import
+import os
+import sys
+import types
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.makedirs("logs", exist_ok=True)
+
+# Dates of three consecutive daily scrapes
+SCRAPE_DATES = ["2026-01-05", "2026-01-06", "2026-01-07"]
+
+
+# Scraped record (YYYY-MM-DD dates, None for a date not decided yet; extra keys e.g. cellCount)
+def _record(name, start="2026-03-02", end="2026-06-19", language="DE", **extra):
+    return {"language": language, "troopSchool": name, "startDate": start, "endDate": end, **extra}
+
+
+@pytest.fixture
+def make_record():
+    return _record
+
+
+@pytest.fixture
+def sample():
+    """Four records and three daily scrapes: b is gone on the second day and back on the third, d is new on the second."""
+    a, b = _record("Inf RS 14"), _record("Pz RS 21")
+    c, d = _record("Stab Bat 5", start=None), _record("ER inf 14", end=None, language="FR")
+    return types.SimpleNamespace(a=a, b=b, c=c, d=d, days=SCRAPE_DATES, scrapes=[[a, b, c], [a, c, d], [a, b, c, d]])
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    return str(tmp_path / "service_dates.db")
@@ -0,0 +1,81 @@
+import os
+import gzip
+import json
+import shutil
+import tempfile
+import tornado.testing
+
+import api
+import scrape
+
+
+def service_rows():
+    rows = []
+    for i in range(60):
+        rows.append({"language": "DE", "troopSchool": f"Inf RS {i}", "startDate": f"2026-{i % 12 + 1:02d}-01",
+                     "endDate": f"2026-{i % 12 + 1:02d}-20"})
+    rows.append({"language": "DE", "troopSchool": "Pz RS 21", "startDate": "2026-03-02", "endDate": "2026-06-19"})
+    rows.append({"language": "FR", "troopSchool": "ER inf 14", "startDate": "2026-01-05", "endDate": "2026-05-01"})
+    return rows
+
+
+class ApiTest(tornado.testing.AsyncHTTPTestCase):
+    def setUp(self):
+        self.workdir = tempfile.mkdtemp()
+        self.db_path = os.path.join(self.workdir, "service_dates.db")
+        scrape.update_database(service_rows(), self.db_path, scrape_date="2026-01-01")
+        super().setUp()
+
+    def tearDown(self):
+        super().tearDown()
+        shutil.rmtree(self.workdir, ignore_errors=True)
+
+    def get_app(self):
+        return api.create_app(self.db_path)
+
+    def get_json(self, path, **kwargs):
+        response = self.fetch(path, **kwargs)
+        return response, json.loads(response.body) if response.body else None
+
+    def test_service_dates(self):
+        response, body = self.get_json("/api/service-dates?language=DE&start=2026-03-01&end=2026-03-31")
+        self.assertEqual(response.code, 200)
+        self.assertEqual(body["count"], 5)
+        self.assertTrue(all(record["startDate"] >= "2026-03-01" for record in body["records"]))
+
+    def test_search_filter(self):
+        _, body = self.get_json("/api/service-dates?language=DE&search=pz")
+        self.assertEqual([record["troopSchool"] for record in body["records"]], ["Pz RS 21"])
+        _, body = self.get_json("/api/troops?language=DE&search=pz")
+        self.assertEqual(body["troops"], ["Pz RS 21"])
+        _, body = self.get_json("/api/service-dates?language=DE&search=pz&troop=Inf+RS+1")
+        self.assertEqual(body["count"], 0)  # selected troops outside the search matches are dropped
+
+    def test_etag_not_modified(self):
+        response = self.fetch("/api/service-dates?language=DE")
+        etag = response.headers["Etag"]
+        response = self.fetch("/api/service-dates?language=DE", headers={"If-None-Match": etag})
+        self.assertEqual(response.code, 304)
+        response = self.fetch("/api/service-dates?language=FR", headers={"If-None-Match": etag})
+        self.assertEqual(response.code, 200)
+
+    def test_gzip(self):
+        response = self.fetch("/api/service-dates?language=DE", headers={"Accept-Encoding": "gzip"},
+                              decompress_response=False)
+        self.assertEqual(response.headers.get("Content-Encoding"), "gzip")
+        self.assertEqual(json.loads(gzip.decompress(response.body))["count"], 61)
+
+    def test_limit_and_offset(self):
+        _, body = self.get_json("/api/service-dates?language=DE&limit=10&offset=55")
+        self.assertEqual((body["count"], len(body["records"])), (61, 6))
+        _, body = self.get_json(f"/api/service-dates?language=DE&limit={api.MAX_LIMIT + 1}")
+        self.assertEqual(body["limit"], api.MAX_LIMIT)
+
+    def test_bad_requests(self):
+        for query in ("limit=-3", "limit=0", "limit=abc", "offset=-1", "start=2026-13-01"):
+            response, body = self.get_json(f"/api/service-dates?language=DE&{query}")
+            self.assertEqual(response.code, 400, query)
+            self.assertEqual(body["status"], 400)
+        response, body = self.get_json("/api/service-dates")
+        self.assertEqual(response.code, 400)
+        self.assertIn("language", body["error"])
@@ -0,0 +1,81 @@
+import os
+import sqlite3
+import pytest
+
+import backup
+import dataset
+import db
+import scrape
+
+
+def troops(db_path):
+    conn = sqlite3.connect(db_path)
+    try:
+        return sorted(row[0] for row in conn.execute("SELECT troopSchool FROM activeServiceDates"))
+    finally:
+        conn.close()
+
+
+def test_create_restore_round_trip(db_path, tmp_path, make_record):
+    backup_dir, safety_dir = str(tmp_path / "backups"), str(tmp_path / "before_restore")
+    scrape.update_database([make_record("Inf RS 14")], db_path, scrape_date="2026-01-05")
+    path = backup.create_backup(db_path, backup_dir, pages=1, sleep=0)
+    assert [item[1] for item in backup.list_backups(backup_dir)] == [path]
+    assert not [name for name in os.listdir(backup_dir) if name.endswith(".tmp")]
+
+    scrape.update_database([make_record("Pz RS 21")], db_path, scrape_date="2026-01-06")
+    previous = backup.restore_backup(path, db_path, backup_dir=safety_dir)
+
+    assert troops(db_path) == ["Inf RS 14"]
+    conn = sqlite3.connect(db_path)
+    assert conn.execute("PRAGMA integrity_check").fetchall() == [("ok",)]
+    conn.close()
+    assert os.path.dirname(previous) == safety_dir  # the replaced data is kept where the caller asked
+    assert [item[1] for item in backup.list_backups(backup_dir)] == [path]
+    backup.restore_backup(previous, db_path, backup_current=False)
+    assert troops(db_path) == ["Pz RS 21"]
+
+
+def test_restore_publishes_a_snapshot_for_the_restored_data(db_path, tmp_path, make_record):
+    pytest.importorskip("pyarrow")
+    scrape.update_database([make_record("Inf RS 14")], db_path, scrape_date="2026-01-05")
+    path = backup.create_backup(db_path, str(tmp_path / "backups"))
+    scrape.update_database([make_record("Pz RS 21")], db_path, scrape_date="2026-01-06")
+    pool = db.ReadOnlyPool(db_path)
+    version = dataset.read_data_version(pool)
+
+    backup.restore_backup(path, db_path, backup_current=False)
+    restored_version = dataset.read_data_version(pool)
+    assert restored_version != version  # the app reloads
+    data = dataset.load_snapshot(dataset.snapshot_path(db_path), restored_version)
+    assert data is not None
+    assert data["partitions"]["DE"].troops == ["Inf RS 14"]
+
+
+def test_corrupt_backup_is_not_restored(db_path, tmp_path, make_record):
+    scrape.update_database([make_record("Inf RS 14")], db_path, scrape_date="2026-01-05")
+    broken = tmp_path / "broken.db"
+    broken.write_bytes(b"SQLite format 3\0" + b"\0" * 100)
+    with pytest.raises(backup.BackupError):
+        backup.restore_backup(str(broken), db_path, backup_current=False)
+    assert troops(db_path) == ["Inf RS 14"]
+
+
+def test_retention_keeps_newest_per_day_week_and_month(tmp_path):
+    backup_dir = tmp_path / "backups"
+    backup_dir.mkdir()
+    stamps = ["20260105-010000", "20260105-020000",  # two on one day: the older goes
+              "20260106-010000", "20260112-010000", "20260201-010000", "20260301-010000"]
+    for stamp in stamps:
+        (backup_dir / f"service_dates_{stamp}.db.gz").write_bytes(b"")
+    (backup_dir / "notes.txt").write_text("not a backup")
+
+    deleted = backup.apply_retention(str(backup_dir), keep_daily=2, keep_weekly=2, keep_monthly=2)
+    kept = sorted(os.path.basename(path)[14:29] for _, path in backup.list_backups(str(backup_dir)))
+    # last 2 days, ISO weeks (W05, W09) and months all point to the same two backups
+    assert kept == ["20260201-010000", "20260301-010000"]
+    assert len(deleted) == 4
+    assert (backup_dir / "notes.txt").exists()
+
+    assert backup.apply_retention(str(backup_dir), keep_daily=0, keep_weekly=0, keep_monthly=0) == \
+        [str(backup_dir / "service_dates_20260201-010000.db.gz")]  # the newest is always kept
@@ -0,0 +1,161 @@
+import os
+import sqlite3
+import pytest
+
+import scrape
+from checkpoint import ScrapeCheckpoint
+
+TOTAL_PAGES = 5
+ROWS_PER_PAGE = 2
+
+
+def page_records(language, page):
+    return [{"language": language, "troopSchool": f"{language} {page}.{row}", "startDate": "05.01.2026",
+             "endDate": "01.05.2026"} for row in range(ROWS_PER_PAGE)]
+
+
+@pytest.fixture
+def checkpoint(db_path):
+    checkpoint = ScrapeCheckpoint(db_path, scrape_date="2026-01-05")
+    yield checkpoint
+    checkpoint.close()
+
+
+def test_first_missing_page_and_completion(checkpoint):
+    assert not checkpoint.is_completed("DE", max_pages=200)  # nothing known yet
+    checkpoint.set_site_total("DE", TOTAL_PAGES)
+    for page in (1, 2, 4):
+        checkpoint.save_page("DE", page, page_records("DE", page))
+
+    assert checkpoint.first_missing_page("DE", 1, TOTAL_PAGES) == 3
+    assert checkpoint.first_missing_page("DE", 4, TOTAL_PAGES) == 5  # a shard starting at page 4
+    assert checkpoint.first_missing_page("DE", 4, 4) == 5  # shard done
+    assert not checkpoint.is_completed("DE", max_pages=200)
+    assert checkpoint.is_completed("DE", max_pages=2)  # capped by max_pages
+
+    for page in (3, 5):  # the pages of a second shard
+        checkpoint.save_page("DE", page, page_records("DE", page))
+    assert checkpoint.is_completed("DE", max_pages=200)
+    assert checkpoint.count("DE") == TOTAL_PAGES * ROWS_PER_PAGE
+    assert [record["troopSchool"] for record in checkpoint.records(["DE"])][:3] == ["DE 1.0", "DE 1.1", "DE 2.0"]
+
+
+def test_saving_a_page_again_replaces_it(checkpoint):
+    checkpoint.save_page("DE", 1, page_records("DE", 1))
+    checkpoint.save_page("DE", 1, page_records("DE", 1)[:1])
+    assert checkpoint.count("DE") == 1 and len(list(checkpoint.records(["DE"]))) == 1
+
+
+def test_mark_completed_and_clear_older(db_path, checkpoint):
+    checkpoint.save_page("FR", 1, page_records("FR", 1))
+    checkpoint.mark_completed("FR")
+    assert checkpoint.is_completed("FR", max_pages=200)
+
+    next_day = ScrapeCheckpoint(db_path, scrape_date="2026-01-06")
+    try:
+        next_day.clear_older()
+        assert not next_day.is_completed("FR", max_pages=200)
+        assert checkpoint.count("FR") == 0
+    finally:
+        next_day.close()
+
+
+class FakeDriver:
+    title = "Synthetic fixture"
+    page = 1
+    language = None
+
+    def find_elements(self, by, value):
+        return [object()] * ROWS_PER_PAGE
+
+    def quit(self):
+        pass
+
+
+class FakePaginator:
+    """Clicks through TOTAL_PAGES pages; next_page fails when it would reach a page in fail_at."""
+    fail_at = set()
+    launches = 0
+    gotos = []
+
+    def __init__(self, driver, url, page_size=None, fallback=None):
+        self.driver, self.retries = driver, 0
+        driver.language = {path: language for language, path in scrape.URL_PATHS.items()}[url[len("http://site"):]]
+        FakePaginator.launches += 1
+
+    @property
+    def page(self):
+        return self.driver.page
+
+    def open(self):
+        self.driver.page = 1
+
+    def read_label(self):
+        return (self.driver.page, TOTAL_PAGES)
+
+    def next_page(self):
+        if (self.driver.language, self.driver.page + 1) in self.fail_at:
+            return False
+        self.driver.page += 1
+        return True
+
+    def goto(self, page):
+        FakePaginator.gotos.append((self.driver.language, page))
+        self.driver.page = page
+        return True
+
+
+class FakeWait:
+    def __init__(self, driver, timeout):
+        pass
+
+    def until(self, condition):
+        return True
+
+
+@pytest.fixture
+def fake_site(monkeypatch, tmp_path):
+    monkeypatch.chdir(tmp_path)
+    os.makedirs("data")
+    FakePaginator.fail_at, FakePaginator.launches, FakePaginator.gotos = set(), 0, []
+    monkeypatch.setattr(scrape, "initialize_driver", lambda **kwargs: FakeDriver())
+    monkeypatch.setattr(scrape, "Paginator", FakePaginator)
+    monkeypatch.setattr(scrape, "WebDriverWait", FakeWait)
+    monkeypatch.setattr(scrape, "read_table_rows_script", lambda driver: [
+        [record["troopSchool"], record["startDate"], record["endDate"]]
+        for record in page_records(driver.language, driver.page)])
+    return FakePaginator
+
+
+def active_rows():
+    conn = sqlite3.connect(scrape.DB_PATH)
+    try:
+        return dict(conn.execute("SELECT language, COUNT(*) FROM activeServiceDates GROUP BY language"))
+    except sqlite3.OperationalError:
+        return {}  # no update yet
+    finally:
+        conn.close()
+
+
+def test_failed_run_resumes_and_applies_only_when_complete(fake_site):
+    def run():
+        return scrape.run_scraper(show_progress=False, skip_unchanged=False, base_url="http://site")
+
+    fake_site.fail_at = {("DE", 3)}
+    result = run()
+    assert result["status"] == "warning" and "DE" in result["message"]
+    assert active_rows() == {}  # FR and IT are complete, but nothing is applied before DE is
+    assert fake_site.launches == 3
+
+    fake_site.fail_at = set()
+    result = run()
+    assert result["status"] == "success", result["message"]
+    assert fake_site.launches == 4  # only DE is scraped again
+    assert fake_site.gotos == [("DE", 3)]  # from the first missing page
+    assert active_rows() == {language: TOTAL_PAGES * ROWS_PER_PAGE for language in ("DE", "FR", "IT")}
+
+    checkpoint = ScrapeCheckpoint(scrape.DB_PATH)
+    try:
+        assert checkpoint.count("DE") == 0  # staged pages are cleared once applied
+    finally:
+        checkpoint.close()
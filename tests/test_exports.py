@@ -0,0 +1,61 @@
+import sqlite3
+import pytest
+
+import exports
+import scrape
+
+
+def history(db_path):
+    conn = sqlite3.connect(db_path)
+    try:
+        return sorted(conn.execute("""
+        SELECT sd.language, sd.troopSchool, sd.startDate, sd.endDate, h.validFrom, h.validTo
+        FROM serviceDateHistory h JOIN serviceDates sd ON sd.id = h.serviceId
+        """).fetchall(), key=repr)
+    finally:
+        conn.close()
+
+
+def same_records(first, second):
+    return sorted(map(repr, first)) == sorted(map(repr, second))
+
+
+@pytest.mark.parametrize("export_format", ["ndjson", "ndjson.gz", "parquet"])
+def test_export_rebuild_round_trip(db_path, tmp_path, sample, export_format):
+    if export_format == "parquet":
+        pytest.importorskip("pyarrow")
+    rebuilt_path, export_dir = str(tmp_path / "rebuilt.db"), str(tmp_path / "exports")
+
+    for day, records in zip(sample.days, sample.scrapes):
+        scrape.update_database(records, db_path, scrape_date=day)
+        exports.export_run(db_path, day, export_dir, export_format)
+
+    assert [(kind, date) for kind, date, _ in exports.list_exports(export_dir)] == \
+        [("base", sample.days[0]), ("delta", sample.days[1]), ("delta", sample.days[2])]
+
+    states = list(exports.replay_exports(export_dir))
+    assert [date for date, _ in states] == sample.days
+    assert all(same_records(records, scraped) for (_, records), scraped in zip(states, sample.scrapes))
+
+    assert len(exports.rebuild_database(rebuilt_path, export_dir)) == 3
+    assert history(rebuilt_path) == history(db_path)
+
+
+def test_removed_and_readded_on_the_same_day_stays_present(db_path, tmp_path, sample):
+    export_dir = str(tmp_path / "exports")
+    day1, day2, _ = sample.days
+    scrape.update_database([sample.a, sample.b], db_path, scrape_date=day1)
+    exports.export_run(db_path, day1, export_dir, "ndjson")
+    scrape.update_database([sample.a], db_path, scrape_date=day2)
+    scrape.update_database([sample.a, sample.b], db_path, scrape_date=day2)  # second run the same day
+    exports.export_run(db_path, day2, export_dir, "ndjson")
+
+    delta = list(exports.read_rows(exports.list_exports(export_dir)[-1][2]))
+    assert [row["change"] for row in delta] == ["removed", "added"]
+    _, records = list(exports.replay_exports(export_dir))[-1]
+    assert same_records(records, [sample.a, sample.b])
+
+
+def test_rebuild_without_base_fails(tmp_path):
+    with pytest.raises(exports.ExportError):
+        exports.rebuild_database(str(tmp_path / "rebuilt.db"), str(tmp_path))
@@ -0,0 +1,86 @@
+import datetime
+import os
+import pytest
+
+import scrape
+
+
+class FakeDriver:
+    def quit(self):
+        pass
+
+
+class FakePaginator:
+    supports_jumps = True
+
+    def __init__(self, driver, url, page_size=None):
+        self.rows = [["Inf RS 14", "05.01.2026", "01.05.2026"]]
+
+    def open(self):
+        pass
+
+    def read_label(self):
+        return (1, 5)
+
+    def jump_to(self, page):
+        return self.supports_jumps
+
+
+class FakeWait:
+    def __init__(self, driver, timeout):
+        pass
+
+    def until(self, condition):
+        return True
+
+
+@pytest.fixture
+def fake_browser(monkeypatch):
+    FakePaginator.launches = 0
+
+    def initialize_driver(**kwargs):
+        FakePaginator.launches += 1
+        return FakeDriver()
+    monkeypatch.setattr(scrape, "initialize_driver", initialize_driver)
+    monkeypatch.setattr(scrape, "Paginator", FakePaginator)
+    monkeypatch.setattr(scrape, "WebDriverWait", FakeWait)
+    monkeypatch.setattr(scrape, "read_table_rows_script", lambda driver: [["Inf RS 14", "05.01.2026", "01.05.2026"]])
+    return FakePaginator
+
+
+def test_selenium_fingerprint_covers_the_last_page(fake_browser):
+    fingerprint = scrape.fingerprint_language("http://fixture/de")
+    assert fingerprint["totalPages"] == 5
+    assert fingerprint["last"] == fingerprint["first"]
+
+
+def test_no_fingerprint_without_direct_page_jumps(fake_browser, monkeypatch):
+    monkeypatch.setattr(fake_browser, "supports_jumps", False)
+    with pytest.raises(scrape.PageJumpError):
+        scrape.fingerprint_language("http://fixture/de")
+    assert scrape.compute_fingerprint({"DE": "http://fixture/de"}, selenium=False) is None
+    assert fake_browser.launches == 1
+
+
+def test_no_browsers_for_the_change_check_while_jumps_are_unsupported(fake_browser, monkeypatch, tmp_path):
+    monkeypatch.chdir(tmp_path)
+    os.makedirs("data")
+    monkeypatch.setattr(fake_browser, "supports_jumps", False)
+    monkeypatch.setattr(scrape, "scrape_language", lambda url, language, **options: [
+        {"language": language, "troopSchool": "Inf RS 14", "startDate": "05.01.2026", "endDate": "01.05.2026"}])
+
+    def run(force_full_every_days=7):
+        result = scrape.run_scraper(show_progress=False, checkpoint=False, force_full_every_days=force_full_every_days)
+        assert result["status"] == "success", result["message"]
+
+    run()  # the check finds out that jumps don't work
+    assert fake_browser.launches == 1
+    assert scrape.load_no_page_jumps() == datetime.date.today()
+
+    run()  # no browser for the check, full scrape as before
+    assert fake_browser.launches == 1
+
+    monkeypatch.setattr(fake_browser, "supports_jumps", True)
+    run(force_full_every_days=0)  # a full run is due: checked again, the flag is cleared
+    assert fake_browser.launches == 4
+    assert scrape.load_no_page_jumps() is None
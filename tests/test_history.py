@@ -0,0 +1,54 @@
+import sqlite3
+import pytest
+
+import queries
+import scrape
+
+
+@pytest.fixture
+def conn(db_path, sample):
+    for day, records in zip(sample.days, sample.scrapes):
+        scrape.update_database(records, db_path, scrape_date=day)
+    conn = sqlite3.connect(db_path)
+    yield conn
+    conn.close()
+
+
+def as_of(conn, date, language=None):
+    return set(queries.query_as_of(conn, date, language)["troopSchool"])
+
+
+def test_as_of(conn, sample):
+    day1, day2, day3 = sample.days
+    assert as_of(conn, "2026-01-04") == set()
+    assert as_of(conn, day1) == {"Inf RS 14", "Pz RS 21", "Stab Bat 5"}
+    assert as_of(conn, day2) == {"Inf RS 14", "Stab Bat 5", "ER inf 14"}
+    assert as_of(conn, day3) == as_of(conn, "2026-12-31") == {"Inf RS 14", "Pz RS 21", "Stab Bat 5", "ER inf 14"}
+    assert as_of(conn, day2, language="FR") == {"ER inf 14"}
+
+
+def test_changes(conn, sample):
+    day1, day2, day3 = sample.days
+    changes = queries.query_changes(conn, day2, day2)
+    assert set(zip(changes["change"], changes["troopSchool"])) == {("removed", "Pz RS 21"), ("added", "ER inf 14")}
+    changes = queries.query_changes(conn, day2, day3, language="DE")
+    assert list(zip(changes["changeDate"], changes["change"])) == [(day2, "removed"), (day3, "added")]
+
+
+def test_troop_history(conn, sample):
+    day1, day2, day3 = sample.days
+    history = queries.query_troop_history(conn, "DE", "Pz RS 21")
+    assert list(zip(history["validFrom"], history["validTo"])) == [(day1, day2), (day3, None)]
+    assert queries.query_troop_history(conn, "DE", "Unknown").empty
+
+
+def test_record_gone_on_the_day_it_appeared_leaves_no_interval(db_path, sample):
+    day1, day2, _ = sample.days
+    scrape.update_database([sample.a], db_path, scrape_date=day1)
+    scrape.update_database([sample.a, sample.b], db_path, scrape_date=day2)
+    scrape.update_database([sample.a], db_path, scrape_date=day2)  # second run the same day
+    conn = sqlite3.connect(db_path)
+    try:
+        assert queries.query_troop_history(conn, "DE", "Pz RS 21").empty
+    finally:
+        conn.close()
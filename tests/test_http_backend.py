@@ -0,0 +1,73 @@
+import os
+import sqlite3
+import pytest
+
+import fixture_server
+import http_scraper
+import scrape
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "fixtures")
+
+
+@pytest.fixture
+def site():
+    server, base_url = fixture_server.start_fixture_server(FIXTURES_DIR)
+    yield base_url
+    server.shutdown()
+
+
+def test_payload_is_used_when_present(site):
+    session = http_scraper.create_session(workers=1)
+    try:
+        for path, expected in (("/de/aufgebotsdaten", None), ("/fr/dates-de-convocation", "__NUXT_DATA__"),
+                               ("/it/date-di-chiamata-in-servizio", "_payload.json")):
+            url = site + path
+            first = http_scraper.fetch_page(session, url, 1)
+            rows = http_scraper.fetch_payload_rows(session, url, first, total_pages=2)
+            if expected is None:
+                assert rows is None
+            else:
+                assert len(rows) == 4 and first.rows[0] in rows, expected
+    finally:
+        session.close()
+
+
+def test_payload_rows_with_iso_and_missing_dates():
+    data = {"services": [{"id": "a", "name": "Inf RS 14", "from": "2025-01-13T00:00:00Z", "to": "2025-05-09"},
+                         {"id": "b", "name": "Stab Bat 5", "from": None, "to": "2025-06-01"}]}
+    rows = http_scraper.find_payload_rows(data, [["Inf RS 14", "13.01.2025", "09.05.2025"]])
+    assert rows == [["Inf RS 14", "13.01.2025", "09.05.2025"], ["Stab Bat 5", "", "01.06.2025"]]
+
+
+def test_fetch_table_rows_pages_through_html(site):
+    rows = http_scraper.fetch_table_rows(site + "/de/aufgebotsdaten", workers=2)
+    assert [row[0] for row in rows] == ["Inf RS 14", "Pz RS 21", "Log RS 45", "Spital RS 42"]
+
+
+def test_run_scraper_http_backend_offline(site, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    os.makedirs("data")
+
+    def no_selenium(*args, **kwargs):
+        raise AssertionError("fell back to Selenium")
+    monkeypatch.setattr(scrape, "scrape_all_data", no_selenium)
+    monkeypatch.setattr(scrape, "initialize_driver", no_selenium)
+
+    result = scrape.run_scraper(backend="http", base_url=site, show_progress=False, max_pages=10)
+    assert result["status"] == "success", result["message"]
+
+    conn = sqlite3.connect(scrape.DB_PATH)
+    counts = dict(conn.execute("SELECT language, COUNT(*) FROM activeServiceDates GROUP BY language"))
+    rows = set(conn.execute("SELECT troopSchool, startDate, endDate FROM activeServiceDates WHERE language = 'FR'"))
+    events = conn.execute("SELECT COUNT(*) FROM serviceEvents WHERE nameDE IS NOT NULL AND nameFR IS NOT NULL AND nameIT IS NOT NULL").fetchone()[0]
+    conn.close()
+    assert counts == {"DE": 4, "FR": 4, "IT": 4}
+    assert ("ER hôp 42", "2025-06-30", "2025-10-31") in rows
+    assert events == 4  # every service linked across the three languages
+
+
+def test_page_numbers_of_all_languages():
+    for label in ("Seite 3 von 12", "Page 3 de 12", "Pagina 3 da 12"):
+        assert http_scraper.parse_page_numbers(label) == (3, 12)
+    assert http_scraper.parse_page_numbers("") is None
+    assert http_scraper.parse_page_numbers(None) is None
@@ -0,0 +1,64 @@
+import numpy as np
+import pytest
+
+from intervals import IntervalIndex, merge_windows, parse_windows
+
+STARTS = ["2026-03-02", "2026-01-05", "2026-07-06", None, "2026-02-02"]
+ENDS = ["2026-06-19", "2026-01-23", "2026-11-13", "2026-05-01", None]
+
+
+@pytest.fixture
+def index():
+    return IntervalIndex(np.array(STARTS, dtype="datetime64[D]"), np.array(ENDS, dtype="datetime64[D]"))
+
+
+def test_within(index):
+    assert sorted(index.within("2026-01-01", "2026-06-30")) == [0, 1]
+    assert sorted(index.within("2026-03-02", "2026-06-19")) == [0]  # bounds are inclusive
+    assert sorted(index.within("2026-03-03", "2026-06-19")) == []
+    assert sorted(index.within("2026-01-01", "2026-12-31")) == [0, 1, 2]  # NaT rows never match
+
+
+def test_overlapping(index):
+    assert sorted(index.overlapping("2026-06-19", "2026-07-06")) == [0, 2]  # touching ends count
+    assert sorted(index.overlapping("2026-06-20", "2026-07-05")) == []
+    assert sorted(index.overlapping("2026-04-01", "2026-04-02")) == [0]  # window inside a long service
+    assert sorted(index.overlapping("2025-01-01", "2027-01-01")) == [0, 1, 2]
+
+
+def test_conflicting_and_mask(index):
+    assert sorted(index.conflicting([("2026-01-10", "2026-01-12"), ("2026-08-01", "2026-08-02")])) == [1, 2]
+    assert len(index.conflicting([])) == 0
+    assert index.mask().tolist() == [True, True, True, False, False]
+    assert index.mask(("2026-01-01", "2026-06-30"), [("2026-01-20", "2026-01-20")]).tolist() == \
+        [True, False, False, False, False]
+
+
+def test_empty_index():
+    index = IntervalIndex(np.array([], dtype="datetime64[D]"), np.array([], dtype="datetime64[D]"))
+    assert len(index.within("2026-01-01", "2026-12-31")) == 0
+    assert len(index.overlapping("2026-01-01", "2026-12-31")) == 0
+
+
+def test_merge_and_parse_windows():
+    windows = parse_windows("2026-01-01 - 2026-01-10\n\n2026-01-11 bis 2026-01-20\n2026-03-01 2026-03-02")
+    assert len(merge_windows(windows)) == 2  # touching windows are merged
+    with pytest.raises(ValueError):
+        parse_windows("2026-01-10 - 2026-01-01")
+    with pytest.raises(ValueError):
+        parse_windows("next week")
+
+
+def test_matches_a_full_scan_on_random_services():
+    rng = np.random.default_rng(8)
+    starts = np.datetime64("2026-01-01") + rng.integers(0, 365, 2000).astype("timedelta64[D]")
+    ends = starts + rng.integers(0, 120, 2000).astype("timedelta64[D]")
+    starts[rng.integers(0, 2000, 50)] = np.datetime64("NaT")
+    index = IntervalIndex(starts.astype("datetime64[ns]"), ends.astype("datetime64[ns]"))  # as in the partitions
+
+    valid = ~(np.isnat(starts) | np.isnat(ends))
+    for _ in range(50):
+        a = np.datetime64("2026-01-01") + int(rng.integers(0, 400))
+        b = a + int(rng.integers(0, 90))
+        assert sorted(index.within(a, b)) == list(np.flatnonzero(valid & (starts >= a) & (ends <= b)))
+        assert sorted(index.overlapping(a, b)) == list(np.flatnonzero(valid & (starts <= b) & (ends >= a)))
@@ -0,0 +1,67 @@
+import time
+import pytest
+
+import linking
+
+START, END = "2026-03-02", "2026-06-19"
+
+
+@pytest.fixture
+def record(make_record):
+    return lambda language, name, start=START, end=END: make_record(name, start, end, language)
+
+
+def names(events):
+    return sorted(tuple(sorted(event["names"].items())) for event in events)
+
+
+def test_rows_with_same_dates_and_numbers_are_linked(record):
+    data = [record("DE", "Inf RS 14"), record("FR", "ER inf 14"), record("IT", "SR fant 14"),
+            record("DE", "Inf RS 15"), record("FR", "ER inf 15")]
+    events = linking.link_events(data)
+    assert names(events) == [
+        (("DE", "Inf RS 14"), ("FR", "ER inf 14"), ("IT", "SR fant 14")),
+        (("DE", "Inf RS 15"), ("FR", "ER inf 15")),
+    ]
+
+
+def test_different_dates_or_numbers_are_not_linked(record):
+    data = [record("DE", "Inf RS 14"), record("FR", "ER inf 14", end="2026-01-30"), record("IT", "SR fant 16")]
+    assert len(linking.link_events(data)) == 3
+
+
+def test_names_without_numbers_pair_by_table_rank(record):
+    data = [record("DE", "Stab A"), record("DE", "Stab B"), record("FR", "EM A"), record("FR", "EM B")]
+    assert names(linking.link_events(data)) == [(("DE", "Stab A"), ("FR", "EM A")), (("DE", "Stab B"), ("FR", "EM B"))]
+
+
+def test_event_ids_are_stable(record):
+    data = [record("DE", "Inf RS 14"), record("FR", "ER inf 14")]
+    assert [e["eventId"] for e in linking.link_events(data)] == [e["eventId"] for e in linking.link_events(list(data))]
+
+
+def test_changed_groups_only_contain_groups_with_inserted_or_removed_rows(record):
+    linked = {("DE", "Inf RS 14", START, END), ("DE", "Inf RS 15", "2026-02-02", "2026-02-20")}
+    data = [record("DE", "Inf RS 14"), record("DE", "Inf RS 16", "2026-03-02", "2026-03-20")]
+    assert linking.changed_groups(data, linked) == {("2026-02-02", "2026-02-20"), ("2026-03-02", "2026-03-20")}
+    events = linking.link_events(data, {("2026-03-02", "2026-03-20")})
+    assert [event["names"] for event in events] == [{"DE": "Inf RS 16"}]
+
+
+def test_large_date_group_links_in_linear_time(record):
+    def data(size):
+        return [record(language, f"{prefix} {i}") for language, prefix in
+                (("DE", "Inf RS"), ("FR", "ER inf"), ("IT", "SR fant")) for i in range(size)]
+
+    def seconds(rows):
+        runs = []
+        for _ in range(3):  # best of three, so a busy machine doesn't decide
+            started = time.perf_counter()
+            linking.link_events(rows)
+            runs.append(time.perf_counter() - started)
+        return min(runs)
+
+    small, large = data(2000), data(8000)
+    events = linking.link_events(large)
+    assert len(events) == 8000 and all(len(event["names"]) == 3 for event in events)
+    assert seconds(large) < 8 * seconds(small)  # 4x the rows: about 4x the time (quadratic would be 16x)
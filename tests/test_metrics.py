@@ -0,0 +1,50 @@
+import os
+import time
+
+import metrics
+
+
+def read_prom(path):
+    with open(path, encoding="utf-8") as f:
+        return f.read()
+
+
+def test_collect_run_only_reads_the_current_run(tmp_path):
+    recorder = metrics.MetricsRecorder("scraper", metrics_dir=str(tmp_path))
+    recorder.begin_run()
+    recorder.observe("scrape_run_seconds", 5)
+    recorder.begin_run()
+    recorder.observe("scrape_run_seconds", 2)
+    recorder.increment("scrape_retries_total", language="DE")
+    recorder.collect_run()
+    prom = read_prom(recorder.write_prometheus())
+    assert "scrape_run_seconds_sum 2\n" in prom and "scrape_run_seconds_count 1\n" in prom
+    assert 'scrape_retries_total{language="DE"} 1\n' in prom
+
+
+def test_jsonl_is_rotated_and_run_survives_rotation(tmp_path):
+    recorder = metrics.MetricsRecorder("scraper", metrics_dir=str(tmp_path), max_bytes=4000)
+    recorder.begin_run()
+    for _ in range(40):  # about 6 kB: rotated once
+        recorder.observe("scrape_extract_seconds", 1, language="DE")
+    assert os.path.getsize(recorder.jsonl_path) <= 4000
+    assert os.path.exists(recorder.jsonl_path + ".1")
+    recorder.collect_run()
+    assert 'scrape_extract_seconds_count{language="DE"} 40\n' in read_prom(recorder.write_prometheus())
+
+
+def test_per_process_prometheus_file(tmp_path):
+    recorder = metrics.MetricsRecorder("app", metrics_dir=str(tmp_path), per_process=True)
+    recorder.observe("app_filter_seconds", 0.5)
+    assert os.path.basename(recorder.prom_path) == f"app_{recorder.process}.prom"
+    stale = tmp_path / f"app_{recorder.process.rsplit('-', 1)[0]}-999999999.prom"
+    stale.write_text("old")
+
+    recorder.start_prometheus_writer(interval=60)
+    for _ in range(50):
+        if os.path.exists(recorder.prom_path):
+            break
+        time.sleep(0.05)
+    prom = read_prom(recorder.prom_path)
+    assert f'app_filter_seconds_sum{{process="{recorder.process}"}} 0.5' in prom
+    assert not stale.exists()
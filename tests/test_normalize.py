@@ -0,0 +1,53 @@
+import functools
+import pytest
+
+from normalize import normalize_records
+
+
+@pytest.fixture
+def raw(make_record):
+    return functools.partial(make_record, name="Inf RS 14", start="02.03.2026", end="19.06.2026")
+
+
+def reasons(*rows):
+    _, quarantined = normalize_records(rows)
+    return [row["reason"] for row in quarantined]
+
+
+def test_dates_names_and_nulls_are_normalized(raw):
+    records, quarantined = normalize_records([
+        raw(name="  Inf RS   14​ "),
+        raw(name="Pz RS 21", start="offen", end=" - "),
+    ])
+    assert quarantined == []
+    assert records == [
+        {"language": "DE", "troopSchool": "Inf RS 14", "startDate": "2026-03-02", "endDate": "2026-06-19"},
+        {"language": "DE", "troopSchool": "Pz RS 21", "startDate": None, "endDate": None},
+    ]
+
+
+def test_duplicates_keep_first_occurrence_order(raw):
+    records, _ = normalize_records([raw(name="B"), raw(name="A"), raw(name="B")])
+    assert [record["troopSchool"] for record in records] == ["B", "A"]
+
+
+def test_quarantine_reasons(raw):
+    assert reasons(raw(cellCount=2)) == ["expected 3 cells, got 2"]
+    assert reasons(raw(name="  ")) == ["missing troopSchool"]
+    assert reasons(raw(name=None)) == ["missing troopSchool"]
+    assert reasons(raw(start="31.02.2026")) == ["invalid startDate"]
+    assert reasons(raw(end="2026-06-19")) == ["invalid endDate"]
+    assert reasons(raw(start="19.06.2026", end="02.03.2026")) == ["endDate before startDate"]
+    assert reasons(raw(name="", start="x", end="y", cellCount=4)) == \
+        ["expected 3 cells, got 4; missing troopSchool; invalid startDate; invalid endDate"]
+
+
+def test_quarantined_rows_keep_raw_texts_and_others_are_kept(raw):
+    records, quarantined = normalize_records([raw(), raw(name="Pz RS 21", start="bald")])
+    assert [record["troopSchool"] for record in records] == ["Inf RS 14"]
+    assert quarantined == [{"language": "DE", "troopSchool": "Pz RS 21", "startDate": "bald",
+                            "endDate": "19.06.2026", "reason": "invalid startDate"}]
+
+
+def test_empty_input():
+    assert normalize_records([]) == ([], [])
@@ -0,0 +1,36 @@
+import numpy as np
+
+import result_cache
+
+
+def test_masks_are_counted_once():
+    cache = result_cache.ResultCache(max_bytes=10_000)
+    key = result_cache.normalize_key("v1", "DE")
+    mask, hit = cache.get_or_compute(key, lambda: np.ones(4000, dtype=bool))
+    assert not hit and not mask.flags.writeable
+    size = cache.stats()["bytes"]
+    assert 4000 < size < 4000 + 1000  # buffer plus a fixed overhead, not the buffer twice
+    assert cache.get_or_compute(key, lambda: None) == (mask, True)
+
+
+def test_troop_selection_counts_its_strings():
+    troops = [f"Infanterie Rekrutenschule {number}" for number in range(1000)]
+    assert result_cache.troops_size(None) == 0
+    assert result_cache.troops_size(troops) > sum(len(troop) for troop in troops)
+
+    cache = result_cache.ResultCache(max_bytes=10_000)
+    key = result_cache.normalize_key("v1", "DE", troops=troops)
+    cache.get_or_compute(key, lambda: np.ones(10, dtype=bool), result_cache.troops_size(troops))
+    assert cache.stats()["entries"] == 0  # the key alone is over budget, so it isn't cached
+
+
+def test_least_recently_used_is_evicted():
+    cache = result_cache.ResultCache(max_bytes=3000)
+    keys = [result_cache.normalize_key("v1", language) for language in ("DE", "FR", "IT")]
+    for key in keys[:2]:
+        cache.get_or_compute(key, lambda: np.ones(1000, dtype=bool))
+    cache.get_or_compute(keys[0], lambda: None)  # DE is used again
+    cache.get_or_compute(keys[2], lambda: np.ones(1000, dtype=bool))
+    assert cache.stats()["evictions"] == 1
+    assert cache.get_or_compute(keys[0], lambda: None)[1]
+    assert not cache.get_or_compute(keys[1], lambda: np.ones(1000, dtype=bool))[1]
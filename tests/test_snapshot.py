@@ -0,0 +1,79 @@
+import os
+import sqlite3
+import pandas as pd
+import pytest
+
+pytest.importorskip("pyarrow")
+
+import db
+import dataset
+import scrape
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    path = str(tmp_path / "service_dates.db")
+    data = [
+        {"language": "DE", "troopSchool": "Inf RS 14", "startDate": "2026-01-05", "endDate": "2026-05-01"},
+        {"language": "DE", "troopSchool": "Stab", "startDate": None, "endDate": "2026-03-01"},
+        {"language": "FR", "troopSchool": "ER inf 14", "startDate": "2026-01-05", "endDate": "2026-05-01"},
+        {"language": "IT", "troopSchool": "SR fant 14", "startDate": "2026-01-05", "endDate": "2026-05-01"},
+    ]
+    scrape.update_database(data, path, scrape_date="2026-01-01")
+    return path
+
+
+def test_snapshot_matches_sqlite_load(db_path):
+    pool = db.ReadOnlyPool(db_path)
+    version = dataset.read_data_version(pool)
+    from_sqlite = dataset.load_active_dataset(pool)
+    from_snapshot = dataset.load_snapshot(dataset.snapshot_path(db_path), version)
+
+    assert from_snapshot is not None
+    assert list(from_snapshot["partitions"]) == list(from_sqlite["partitions"]) == ["DE", "FR", "IT", "ALL"]
+    assert from_snapshot["last_updated"] == from_sqlite["last_updated"] == "2026-01-01"
+    for language, partition in from_sqlite["partitions"].items():
+        snapshot_partition = from_snapshot["partitions"][language]
+        pd.testing.assert_frame_equal(snapshot_partition.frame, partition.frame)
+        assert snapshot_partition.troops == partition.troops
+
+
+def test_snapshot_frames_are_not_copied(db_path):
+    pool = db.ReadOnlyPool(db_path)
+    data = dataset.load_snapshot(dataset.snapshot_path(db_path), dataset.read_data_version(pool))
+    frame = data["partitions"]["DE"].frame
+    for column in (frame["startDate"].to_numpy(), frame["troopSchool"].cat.codes.to_numpy()):
+        assert not column.flags.owndata and not column.flags.writeable
+
+
+def test_stale_or_broken_snapshot_falls_back_to_sqlite(db_path):
+    pool = db.ReadOnlyPool(db_path)
+    path = dataset.snapshot_path(db_path)
+    assert dataset.load_snapshot(path, "another version") is None
+
+    with open(path, "wb") as f:
+        f.write(b"not arrow")
+    version = dataset.read_data_version(pool)
+    assert dataset.load_snapshot(path, version) is None
+    assert list(dataset.load_active_dataset(pool, version)["partitions"]) == ["DE", "FR", "IT", "ALL"]
+
+    os.remove(path)
+    assert dataset.load_snapshot(path, version) is None
+
+
+def test_snapshot_is_written_before_publishing(db_path):
+    pool = db.ReadOnlyPool(db_path)
+    path = dataset.snapshot_path(db_path)
+    version = dataset.read_data_version(pool)
+    assert dataset.load_snapshot(path, version) is not None  # published by update_database for its version
+    assert not any(name.endswith(".tmp") for name in os.listdir(os.path.dirname(path)))
+
+    conn = sqlite3.connect(db_path)
+    try:
+        dataset.write_snapshot(conn, path, "next version", publish=False)
+        assert dataset.load_snapshot(path, version) is not None  # the published file is untouched
+        dataset.publish_snapshot(path)
+    finally:
+        conn.close()
+    assert dataset.load_snapshot(path, "next version") is not None
+    assert not any(name.endswith(".tmp") for name in os.listdir(os.path.dirname(path)))
@@ -0,0 +1,62 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import dataset
+
+
+def partition(troops, starts, ends):
+    frame = pd.DataFrame({
+        "language": pd.Categorical(["DE"] * len(troops)),
+        "troopSchool": pd.Categorical(troops, categories=sorted({t for t in troops if t is not None})),
+        "startDate": pd.to_datetime(starts),
+        "endDate": pd.to_datetime(ends),
+    })
+    return dataset.make_partition(frame)
+
+
+@pytest.fixture
+def small():
+    return partition(["Pz RS 21", "Inf RS 14", "Log RS 45", "Inf RS 14", None],
+                     ["2026-03-02", None, "2026-01-05", "2026-03-02", "2026-01-05"],
+                     ["2026-06-19", "2026-05-01", "2026-05-01", "2026-05-01", None])
+
+
+def test_missing_values_sort_last_in_both_directions(small):
+    assert list(dataset.sort_order(small, "startDate")) == [2, 4, 3, 0, 1]  # ties: endDate, NaT last
+    assert list(dataset.sort_order(small, "startDate", descending=True)) == [3, 0, 2, 4, 1]
+    assert list(dataset.sort_order(small, "troopSchool")) == [3, 1, 2, 0, 4]  # categorical codes, None last
+    assert list(dataset.sort_order(small, "troopSchool", descending=True)) == [0, 2, 3, 1, 4]
+    assert list(dataset.sort_order(small, "endDate"))[-1] == 4
+
+
+def test_secondary_keys_break_ties_in_column_order():
+    same_start = partition(["B", "A", "A"], ["2026-01-05"] * 3, ["2026-02-01", "2026-03-01", "2026-02-01"])
+    assert list(dataset.sort_order(same_start, "startDate")) == [2, 0, 1]  # then endDate, then troopSchool
+    assert list(dataset.sort_order(same_start, "startDate", descending=True)) == [2, 0, 1]  # ties stay ascending
+
+
+def test_matches_pandas_sort_on_random_data():
+    rng = np.random.default_rng(21)
+    size = 500
+    troops = [f"Troop {number}" for number in rng.integers(0, 40, size)]
+    starts = np.datetime64("2026-01-01") + rng.integers(0, 60, size).astype("timedelta64[D]")
+    ends = starts + rng.integers(0, 30, size).astype("timedelta64[D]")
+    starts[rng.integers(0, size, 20)] = np.datetime64("NaT")
+    part = partition(troops, starts, ends)
+
+    for sort_by in dataset.SORT_COLUMNS:
+        for descending in (False, True):
+            columns = [sort_by] + [column for column in dataset.SORT_COLUMNS if column != sort_by]
+            expected = part.frame.sort_values(columns, ascending=[not descending, True, True],
+                                              na_position="last", kind="stable").index
+            assert list(dataset.sort_order(part, sort_by, descending)) == list(expected), (sort_by, descending)
+
+
+def test_page_positions(small):
+    order = dataset.sort_order(small, "startDate")  # [2, 4, 3, 0, 1]
+    mask = np.array([True, True, False, True, True])
+    assert list(dataset.page_positions(order, mask, 0, 2)) == [4, 3]
+    assert list(dataset.page_positions(order, mask, 2, 2)) == [0, 1]
+    assert list(dataset.page_positions(order, mask, 4, 2)) == []
+    assert list(dataset.page_positions(order, np.zeros(5, dtype=bool), 0, 10)) == []
@@ -0,0 +1,62 @@
+import sqlite3
+
+import scrape
+
+
+def rows(db_path, sql, params=()):
+    conn = sqlite3.connect(db_path)
+    try:
+        return conn.execute(sql, params).fetchall()
+    finally:
+        conn.close()
+
+
+def services(db_path):
+    return {name: (service_id, first_seen, scrape_date, bool(active))
+            for service_id, name, first_seen, scrape_date, active in
+            rows(db_path, "SELECT id, troopSchool, firstSeen, scrapeDate, active FROM serviceDates")}
+
+
+def active(db_path):
+    return set(rows(db_path, "SELECT language, troopSchool, startDate, endDate FROM activeServiceDates"))
+
+
+def keys(*records):
+    return {(r["language"], r["troopSchool"], r["startDate"], r["endDate"]) for r in records}
+
+
+def test_diff_inserts_removes_and_reactivates(db_path, sample):
+    (day1, day2, day3), (a, b, c, d) = sample.days, (sample.a, sample.b, sample.c, sample.d)
+    assert scrape.update_database([a, b, c], db_path, scrape_date=day1) == \
+        {"inserted": 3, "reactivated": 0, "removed": 0, "unchanged": 0, "events": 3}
+    first = services(db_path)
+
+    summary = scrape.update_database([a, c, d], db_path, scrape_date=day2)
+    assert (summary["inserted"], summary["removed"], summary["unchanged"], summary["reactivated"]) == (1, 1, 2, 0)
+    second = services(db_path)
+    assert second["Inf RS 14"] == (first["Inf RS 14"][0], day1, day2, True)  # same id and firstSeen
+    assert second["Stab Bat 5"][:2] == first["Stab Bat 5"][:2]  # NULL start date matched, not inserted again
+    assert second["Pz RS 21"] == (first["Pz RS 21"][0], day1, day1, False)
+    assert active(db_path) == keys(a, c, d)
+
+    summary = scrape.update_database([a, b, c, d], db_path, scrape_date=day3)
+    assert (summary["inserted"], summary["removed"], summary["unchanged"], summary["reactivated"]) == (0, 0, 3, 1)
+    assert services(db_path)["Pz RS 21"] == (first["Pz RS 21"][0], day1, day3, True)
+    assert active(db_path) == keys(a, b, c, d)
+    assert rows(db_path, "SELECT COUNT(*) FROM serviceDates") == [(4,)]
+
+
+def test_same_scrape_twice_and_duplicates(db_path, sample):
+    day = sample.days[0]
+    scrape.update_database([sample.a, sample.b, sample.b], db_path, scrape_date=day)
+    summary = scrape.update_database([sample.a, sample.b], db_path, scrape_date=day)
+    assert (summary["inserted"], summary["removed"], summary["unchanged"]) == (0, 0, 2)
+    assert rows(db_path, "SELECT COUNT(*) FROM activeServiceDates") == [(2,)]
+
+
+def test_data_version_changes_with_every_update(db_path, sample):
+    versions = []
+    for day in sample.days[:2]:
+        scrape.update_database([sample.a], db_path, scrape_date=day)
+        versions += rows(db_path, "SELECT value FROM metadata WHERE key = 'dataVersion'")
+    assert len(versions) == 2 and versions[0] != versions[1]